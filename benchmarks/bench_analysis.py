@@ -0,0 +1,34 @@
+'''
+Benchmark the perceptual uniformity report of the bundled colormaps: analyzed in the calling process, in a
+pool of processes and served from the cache file of a previous run.
+
+Run from the repository root with:
+    python benchmarks/bench_analysis.py [n_colors]
+'''
+import os
+import sys
+import tempfile
+import timeit
+from colorella import analysis
+from colorella.analysis import report
+
+
+if __name__ == '__main__':
+    n_colors = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    cache_file = os.path.join(tempfile.mkdtemp(), 'analysis.json')
+
+    def uncached(n_workers):
+        analysis._cache.clear()
+        return report(n_colors=n_colors, n_workers=n_workers)
+
+    t_serial = min(timeit.repeat(lambda: uncached(1), number=1, repeat=3))
+    t_parallel = min(timeit.repeat(lambda: uncached(None), number=1, repeat=3))
+    rows, _ = report(n_colors=n_colors, cache_file=cache_file)
+    analysis._cache.clear()
+    t_cached = min(timeit.repeat(lambda: report(n_colors=n_colors, n_workers=1, cache_file=cache_file),
+                                 number=1, repeat=3))
+    print("{0} colormaps".format(len(rows)))
+    print("serial   : {:8.1f} ms".format(t_serial * 1e3))
+    print("parallel : {:8.1f} ms".format(t_parallel * 1e3))
+    print("cached   : {:8.1f} ms".format(t_cached * 1e3))
+    os.remove(cache_file)
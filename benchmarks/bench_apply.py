@@ -0,0 +1,40 @@
+'''
+Benchmark colorizing a large grid with ColorMap.apply against matplotlib's colormap call.
+Peak memory is measured with tracemalloc and reported together with the size of the output array.
+
+Run from the repository root with:
+    python benchmarks/bench_apply.py [size]
+'''
+import sys
+import time
+import tracemalloc
+import numpy as np
+import matplotlib.colors as col
+from colorella.colormap import ColorMap
+
+
+def measure(func):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    data = np.random.default_rng(42).uniform(0., 1., (size, size)).astype(np.float32)
+    cmap = ColorMap('cl:vik')
+    mpl_cm = cmap.to_matplotlib()
+    out_mb = size * size * 4 / 2 ** 20
+
+    print("grid {0}x{0}, output {1:.0f} MB".format(size, out_mb))
+    _, t, peak = measure(lambda: mpl_cm(col.Normalize(0., 1.)(data), bytes=True))
+    print("matplotlib:     {:7.2f} s  peak {:7.0f} MB".format(t, peak / 2 ** 20))
+    _, t, peak = measure(lambda: cmap.apply(data, vmin=0., vmax=1.))
+    print("ColorMap.apply: {:7.2f} s  peak {:7.0f} MB".format(t, peak / 2 ** 20))
+    for n_threads in (2, 4, 8):
+        _, t, peak = measure(lambda: cmap.apply(data, vmin=0., vmax=1., n_threads=n_threads, chunk_size=256))
+        print("{:d} threads:      {:7.2f} s  peak {:7.0f} MB".format(n_threads, t, peak / 2 ** 20))
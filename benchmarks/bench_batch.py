@@ -0,0 +1,34 @@
+'''
+Benchmark importing a palette library with load_colormaps, one process against a process pool.
+The library is generated from copies of the bundled colormaps and the test data.
+
+Run from the repository root with:
+    python benchmarks/bench_batch.py [n_files]
+'''
+import os
+import shutil
+import sys
+import tempfile
+import time
+from colorella.catalog import COLORMAP_DIR, load_colormaps
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), os.pardir, 'tests', 'test_data')
+
+
+def build_library(dirpath, n_files):
+    sources = [os.path.join(COLORMAP_DIR, f) for f in os.listdir(COLORMAP_DIR) if f.endswith('.json')]
+    sources += [os.path.join(TEST_DATA, f) for f in ('ETOPO1.cpt', 'sgrt_ct_cont_ssm.ct')]
+    for i in range(n_files):
+        source = sources[i % len(sources)]
+        shutil.copy(source, os.path.join(dirpath, 'palette_{0:05d}{1}'.format(i, os.path.splitext(source)[1])))
+
+
+if __name__ == '__main__':
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        build_library(tmpdir, n_files)
+        for n_workers in (1, os.cpu_count()):
+            t0 = time.perf_counter()
+            colormaps, errors = load_colormaps(tmpdir, n_workers=n_workers)
+            print("{:3d} workers: {:7.2f} s for {} files ({} errors)".format(
+                n_workers, time.perf_counter() - t0, len(colormaps), len(errors)))
@@ -0,0 +1,23 @@
+'''
+Benchmark classifying data with ClassifiedColorMap.apply (searchsorted into a uint8 lookup table) against
+matplotlib's BoundaryNorm and colormap call with bytes=True.
+
+Run from the repository root with:
+    python benchmarks/bench_classified.py [size]
+'''
+import sys
+import timeit
+import numpy as np
+from colorella.colormap import ColorMap, ClassifiedColorMap
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    data = np.random.uniform(-1.2, 1.2, (size, size)).astype(np.float32)
+    cmap = ClassifiedColorMap.from_colormap(ColorMap('cl:vik'), np.linspace(-1, 1, 13))
+    mpl_cm, norm = cmap.to_matplotlib()
+
+    t_classified = min(timeit.repeat(lambda: cmap.apply(data), number=1, repeat=5))
+    t_mpl = min(timeit.repeat(lambda: mpl_cm(norm(data), bytes=True), number=1, repeat=5))
+    print("ClassifiedColorMap: {:8.1f} ms".format(t_classified * 1e3))
+    print("BoundaryNorm      : {:8.1f} ms".format(t_mpl * 1e3))
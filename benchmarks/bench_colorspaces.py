@@ -0,0 +1,32 @@
+'''
+Benchmark the throughput of the vectorized color space conversions in float32 and float64, and against
+colorspacious if it is installed.
+
+Run from the repository root with:
+    python benchmarks/bench_colorspaces.py [n_colors]
+'''
+import sys
+import timeit
+import numpy as np
+from colorella.colorspaces import convert
+
+
+if __name__ == '__main__':
+    n_colors = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    colors = np.random.uniform(0, 1, (n_colors, 3))
+    try:
+        from colorspacious import cspace_convert
+    except ImportError:
+        cspace_convert = None
+    spacious_names = {'linear': 'sRGB1-linear', 'xyz': 'XYZ1', 'lab': 'CIELab', 'cam02ucs': 'CAM02-UCS'}
+
+    for dst in ('linear', 'xyz', 'lab', 'cam02ucs'):
+        line = "srgb -> {0:9s}".format(dst)
+        for dtype in (np.float32, np.float64):
+            data = colors.astype(dtype)
+            t = min(timeit.repeat(lambda: convert(data, 'srgb', dst), number=1, repeat=3))
+            line += "  {0}: {1:6.1f} Mcolors/s".format(np.dtype(dtype).name, n_colors / t / 1e6)
+        if cspace_convert is not None:
+            t = min(timeit.repeat(lambda: cspace_convert(colors, 'sRGB1', spacious_names[dst]), number=1, repeat=3))
+            line += "  colorspacious: {0:6.1f} Mcolors/s".format(n_colors / t / 1e6)
+        print(line)
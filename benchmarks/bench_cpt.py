@@ -0,0 +1,79 @@
+'''
+Benchmark the vectorized .cpt parser against the previous line by line parser on a large palette.
+
+Run from the repository root with:
+    python benchmarks/bench_cpt.py [n_segments]
+'''
+import colorsys
+import os
+import sys
+import tempfile
+import timeit
+import numpy as np
+from colorella.conversions import cptfile2dict
+
+
+def cptfile2dict_legacy(filepath):
+    """ line by line parser of colorella <= 0.0.1 """
+    with open(filepath) as file:
+        lines = file.readlines()
+    x, r, g, b = [], [], [], []
+    color_model = "RGB"
+    for l in lines:
+        ls = l.split()
+        if l.strip():
+            if l[0] == "#":
+                if ls[-1] == "HSV":
+                    color_model = "HSV"
+                continue
+            if ls[0] in ("B", "F", "N"):
+                continue
+            x.append(float(ls[0]))
+            r.append(float(ls[1]))
+            g.append(float(ls[2]))
+            b.append(float(ls[3]))
+            xtemp, rtemp, gtemp, btemp = (float(v) for v in ls[4:8])
+    x.append(xtemp)
+    r.append(rtemp)
+    g.append(gtemp)
+    b.append(btemp)
+    x, r, g, b = (np.array(v, dtype=np.float64) for v in (x, r, g, b))
+    if color_model == "HSV":
+        for i in range(r.shape[0]):
+            r[i], g[i], b[i] = colorsys.hsv_to_rgb(r[i] / 360., g[i], b[i])
+    else:
+        r, g, b = r / 255, g / 255, b / 255
+    x_norm = (x - x[0]) / (x[-1] - x[0])
+    col_list = [(r[i], g[i], b[i]) for i in range(len(r))]
+    red, green, blue = [], [], []
+    for i in range(len(x)):
+        red.append([x_norm[i], r[i], r[i]])
+        green.append([x_norm[i], g[i], g[i]])
+        blue.append([x_norm[i], b[i], b[i]])
+    return col_list, {"red": red, "green": green, "blue": blue}
+
+
+def write_cpt(filepath, n_segments, color_model):
+    rng = np.random.default_rng(0)
+    x = np.linspace(-11000., 8500., n_segments + 1)
+    if color_model == "HSV":
+        colors = np.c_[rng.uniform(0, 360, n_segments + 1), rng.uniform(0, 1, (n_segments + 1, 2))]
+        fmt = "%.6f %.3f %.4f %.4f %.6f %.3f %.4f %.4f"
+    else:
+        colors = rng.integers(0, 256, (n_segments + 1, 3)).astype(float)
+        fmt = "%.6f %3d %3d %3d %.6f %3d %3d %3d"
+    table = np.c_[x[:-1], colors[:-1], x[1:], colors[1:]]
+    np.savetxt(filepath, table, fmt=fmt, header="# COLOR_MODEL = " + color_model,
+               footer="B 0 0 0\nF 255 255 255\nN 128 128 128", comments="")
+
+
+if __name__ == '__main__':
+    n_segments = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for color_model in ("RGB", "HSV"):
+            filepath = os.path.join(tmpdir, "large_" + color_model + ".cpt")
+            write_cpt(filepath, n_segments, color_model)
+            t_legacy = min(timeit.repeat(lambda: cptfile2dict_legacy(filepath), number=5, repeat=3)) / 5
+            t_new = min(timeit.repeat(lambda: cptfile2dict(filepath), number=5, repeat=3)) / 5
+            print("{} {} segments: legacy {:8.2f} ms, vectorized {:8.2f} ms, speedup {:.1f}x".format(
+                color_model, n_segments, t_legacy * 1e3, t_new * 1e3, t_legacy / t_new))
@@ -0,0 +1,18 @@
+'''
+Benchmark converting all bundled colormaps to greyscale one by one against a single batch call.
+
+Run from the repository root with:
+    python benchmarks/bench_greyscale.py
+'''
+import timeit
+from colorella.catalog import default_catalog
+from colorella.colormap import ColorMap
+
+
+if __name__ == '__main__':
+    cmaps = {name: ColorMap('cl:' + name) for name in default_catalog}
+    one_by_one = lambda: [cmap.convert2greyscale(weights=1, inplace=False, gamma='srgb') for cmap in cmaps.values()]
+    batch = lambda: ColorMap.batch_greyscale(cmaps, weights=1, gamma='srgb')
+    t_single = min(timeit.repeat(one_by_one, number=5, repeat=3)) / 5
+    t_batch = min(timeit.repeat(batch, number=5, repeat=3)) / 5
+    print("{} colormaps: one by one {:8.2f} ms, batch {:8.2f} ms".format(len(cmaps), t_single * 1e3, t_batch * 1e3))
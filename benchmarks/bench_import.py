@@ -0,0 +1,30 @@
+'''
+Benchmark the import time of colorella. Each import is timed in a fresh interpreter; the eager imports
+of the previous versions (pyplot, colorcet and gdal at module load) are timed for comparison.
+
+Run from the repository root with:
+    python benchmarks/bench_import.py
+'''
+import subprocess
+import sys
+
+STATEMENTS = {
+    'colorella': 'import colorella',
+    'colorella.colormap': 'import colorella.colormap',
+    'colorella.colormap + eager imports': 'import colorella.colormap, matplotlib.pyplot, matplotlib.cm, colorcet\n'
+                                          'try:\n    from osgeo import gdal\nexcept ImportError:\n    pass',
+}
+TIMER = 'import time; t0 = time.perf_counter()\n{0}\nprint(time.perf_counter() - t0)'
+
+
+def time_import(statement, repeat=5):
+    times = []
+    for _ in range(repeat):
+        out = subprocess.check_output([sys.executable, '-c', TIMER.format(statement)])
+        times.append(float(out.decode().strip().splitlines()[-1]))
+    return min(times)
+
+
+if __name__ == '__main__':
+    for label, statement in STATEMENTS.items():
+        print("{:40s} {:8.1f} ms".format(label, time_import(statement) * 1e3))
@@ -0,0 +1,27 @@
+'''
+Benchmark recovering data values from a rendered scene with InverseColorMap, for exactly rendered and
+noisy (e.g. lossy compressed) images, with the lookup grid in RGB and CIELAB.
+
+Run from the repository root with:
+    python benchmarks/bench_inverse.py [size]
+'''
+import sys
+import timeit
+import numpy as np
+from colorella.colormap import ColorMap
+from colorella.inverse import InverseColorMap
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    cmap = ColorMap('cl:swi_ascat')
+    image = cmap.apply(np.random.uniform(0, 100, (size, size)), vmin=0, vmax=100, alpha=False)
+    noisy = np.clip(image + np.random.randint(-2, 3, image.shape), 0, 255).astype(np.uint8)
+
+    for space in ('rgb', 'lab'):
+        t_build = min(timeit.repeat(lambda: InverseColorMap.from_colormap(cmap, space=space), number=1, repeat=3))
+        inverse = InverseColorMap.from_colormap(cmap, space=space)
+        t_exact = min(timeit.repeat(lambda: inverse(image), number=1, repeat=3))
+        t_noisy = min(timeit.repeat(lambda: inverse(noisy), number=1, repeat=3))
+        print("{0}: build {1:6.1f} ms, exact {2:6.1f} Mpx/s, noisy {3:6.1f} Mpx/s".format(
+            space, t_build * 1e3, size * size / t_exact / 1e6, size * size / t_noisy / 1e6))
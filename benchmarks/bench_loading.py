@@ -0,0 +1,31 @@
+'''
+Benchmark loading the bundled colormaps from .json files and from the compiled .npy file.
+
+Run from the repository root with:
+    python benchmarks/bench_loading.py
+'''
+import os
+import timeit
+import colorella
+from colorella.conversions import json2list, npy2dict
+
+COLORMAP_DIR = os.path.join(os.path.dirname(colorella.__file__), "colormaps")
+
+
+def load_json():
+    for filename in os.listdir(COLORMAP_DIR):
+        if filename.endswith('.json'):
+            json2list(os.path.join(COLORMAP_DIR, filename))
+
+
+def load_npy():
+    npy2dict(os.path.join(COLORMAP_DIR, 'colormaps.npy'))
+
+
+if __name__ == '__main__':
+    n = 20
+    t_json = min(timeit.repeat(load_json, number=n, repeat=3)) / n
+    t_npy = min(timeit.repeat(load_npy, number=n, repeat=3)) / n
+    print("json: {:8.3f} ms for all colormaps".format(t_json * 1e3))
+    print("npy:  {:8.3f} ms for all colormaps".format(t_npy * 1e3))
+    print("speedup: {:.1f}x".format(t_json / t_npy))
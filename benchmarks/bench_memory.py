@@ -0,0 +1,36 @@
+'''
+Benchmark the memory of a registry of colormaps, ColorMap objects against the matplotlib colormap objects
+holding the same colors (after their lookup table was built by a first call).
+
+Run from the repository root with:
+    python benchmarks/bench_memory.py [n_copies]
+'''
+import sys
+import tracemalloc
+import numpy as np
+from colorella.catalog import default_catalog
+from colorella.colormap import ColorMap
+
+
+def registry_size(create, n_copies):
+    tracemalloc.start()
+    registry = [create(name) for _ in range(n_copies) for name in default_catalog]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(registry)
+
+
+def create_colormap(name):
+    return ColorMap('cl:' + name)
+
+
+def create_matplotlib(name):
+    mpl_cm = ColorMap('cl:' + name).to_matplotlib()
+    mpl_cm(np.arange(mpl_cm.N))
+    return mpl_cm
+
+
+if __name__ == '__main__':
+    n_copies = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for label, create in (('ColorMap', create_colormap), ('matplotlib', create_matplotlib)):
+        print("{:10s}: {:8.1f} kB per colormap".format(label, registry_size(create, n_copies) / 1024))
@@ -0,0 +1,41 @@
+'''
+Benchmark ColorMap.reverse against the previous implementation, which rebuilt the segments of a
+LinearSegmented colormap node by node and sorted them, for a bundled colormap (256 nodes), a
+gradient with many nodes (e.g. derived from a large .cpt file) and a Listed colormap.
+
+Run from the repository root with:
+    python benchmarks/bench_reverse.py [n_nodes]
+'''
+import sys
+import timeit
+import numpy as np
+from colorella.colormap import ColorMap
+
+
+def reverse_legacy(cmap):
+    """ node by node reversal of colorella <= 0.0.1 """
+    reverse = {}
+    for key, channel in cmap.to_dict().items():
+        data = []
+        for c in channel:
+            data.append((1 - c[0], c[2], c[1]))
+        reverse[key] = sorted(data)
+    return ColorMap.from_dict(reverse, name=cmap.name + '_reversed')
+
+
+if __name__ == '__main__':
+    n_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    colormaps = {'segmented, bundled vik': ColorMap('cl:vik'),
+                 'segmented, {} nodes'.format(n_nodes): ColorMap.from_list(
+                     np.random.uniform(0, 1, (n_nodes, 3)), gradient=True)}
+    for label, cmap in colormaps.items():
+        for a, b in zip(reverse_legacy(cmap).to_dict().values(), cmap.reverse(inplace=False).to_dict().values()):
+            assert a == b
+        t_legacy = min(timeit.repeat(lambda: reverse_legacy(cmap), number=20, repeat=3)) / 20
+        t_new = min(timeit.repeat(lambda: cmap.reverse(inplace=False), number=20, repeat=3)) / 20
+        print("{:28s}: legacy {:8.3f} ms, vectorized {:8.3f} ms, speedup {:.1f}x".format(
+            label, t_legacy * 1e3, t_new * 1e3, t_legacy / t_new))
+
+    cmap = ColorMap('mpl:viridis')
+    t_listed = min(timeit.repeat(lambda: cmap.reverse(inplace=False), number=20, repeat=3)) / 20
+    print("{:28s}: {:8.3f} ms".format('listed, viridis', t_listed * 1e3))
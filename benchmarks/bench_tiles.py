@@ -0,0 +1,49 @@
+'''
+Benchmark rendering tiles and serving cached tiles, directly from the TileRenderer and over HTTP from a
+local TileServer (one keep-alive connection per client thread).
+
+Run from the repository root with:
+    python benchmarks/bench_tiles.py [n_clients]
+'''
+import http.client
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from colorella.tiles import TileRenderer, TileServer
+
+
+def fetch(address, paths):
+    connection = http.client.HTTPConnection(*address)
+    for path in paths:
+        connection.request('GET', path)
+        connection.getresponse().read()
+    connection.close()
+
+
+if __name__ == '__main__':
+    n_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    data = np.random.default_rng(42).uniform(0., 1., (4096, 4096)).astype(np.float32)
+    renderer = TileRenderer(data, cmap='cl:vik')
+    tiles = [(z, x, y) for z in range(renderer.native_zoom + 1) for x in range(2 ** z) for y in range(2 ** z)]
+
+    t0 = time.perf_counter()
+    for tile in tiles:
+        renderer.tile(*tile)
+    elapsed = time.perf_counter() - t0
+    print("render:       {:8.0f} tiles/s ({} tiles)".format(len(tiles) / elapsed, len(tiles)))
+
+    t0 = time.perf_counter()
+    for _ in range(20):
+        for tile in tiles:
+            renderer.tile(*tile)
+    print("cached:       {:8.0f} tiles/s".format(20 * len(tiles) / (time.perf_counter() - t0)))
+
+    paths = ['/{}/{}/{}.png'.format(*tile) for tile in tiles] * 5
+    with TileServer(renderer) as server:
+        address = server._server.server_address[:2]
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(n_clients) as executor:
+            list(executor.map(lambda _: fetch(address, paths), range(n_clients)))
+        elapsed = time.perf_counter() - t0
+    print("HTTP cached:  {:8.0f} tiles/s ({} clients)".format(n_clients * len(paths) / elapsed, n_clients))
@@ -0,0 +1,181 @@
+'''
+asyncio interface of colorella for event loop based applications, e.g. web backends.
+
+Loading, colorizing and saving colormaps run in an executor (the default executor of the event loop
+or a configurable thread or process pool), so the event loop is never blocked. The number of jobs
+running in the executor is bounded (backpressure): further requests wait in the event loop until a
+job has finished. Concurrent loads of the same colormap are coalesced into a single load.
+Large arrays are colorized in chunks of rows. Cancelling apply stops submitting chunks, chunks that
+have not started are cancelled, so a cancelled request does not keep the executor busy.
+An AsyncColorMaps object can be used from several event loops (e.g. successive asyncio.run calls),
+the concurrency is bounded per event loop.
+
+'''
+import asyncio
+import functools
+import os
+import weakref
+import numpy as np
+from colorella.colorize import block_rows, split_mask, CHUNK_SIZE
+from colorella.colormap import ColorMap
+from colorella.norms import Normalize
+
+SAVERS = {'.cpt': 'save_as_cpt', '.ct': 'save_as_ct', '.json': 'save_as_json', '.npy': 'save_as_npy'}
+
+
+class AsyncColorMaps:
+    """Runs colormap loading, colorization and saving in an executor with bounded concurrency
+        """
+
+    def __init__(self, executor=None, max_concurrency=4):
+        """
+        Constructor of the asyncio interface class.
+
+        Parameters
+        ----------
+        executor : concurrent.futures.Executor, optional
+            executor running the jobs, default is the default executor of the event loop
+        max_concurrency : int, optional
+            maximum number of jobs of an event loop running in the executor at once, default = 4
+        """
+        if max_concurrency < 1:
+            raise ValueError('Argument max_concurrency must be at least 1')
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._loads = {}
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Runs a function in the executor, waiting for a free slot if max_concurrency jobs are running
+
+        Parameters
+        ----------
+        func: callable
+            function to run
+        args, kwargs:
+            arguments of the function
+
+        Returns
+        -------
+        the return value of the function
+        """
+        loop = asyncio.get_running_loop()
+        # a semaphore is bound to the event loop it is used in, so every loop gets its own
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def load(self, spec, **kwargs):
+        """
+        Loads a colormap, concurrent loads of the same colormap are coalesced and return the same object,
+        which must not be modified in place
+
+        Parameters
+        ----------
+        spec: str
+            'mpl:name', 'cc:name' or 'cl:name' as for ColorMap, else the filepath of a colormap file
+        kwargs:
+            keyword arguments of ColorMap.from_file
+
+        Returns
+        -------
+        ColorMap object
+        """
+        key = (spec, tuple(sorted(kwargs.items())))
+        if key not in self._loads:
+            if spec.split(':')[0] in ('mpl', 'cc', 'cl'):
+                load = self.run(ColorMap, spec)
+            else:
+                load = self.run(ColorMap.from_file, spec, **kwargs)
+            task = asyncio.ensure_future(load)
+            self._loads[key] = task
+            task.add_done_callback(lambda _: self._loads.pop(key, None))
+        # a cancelled caller must not cancel the load of the other callers
+        return await asyncio.shield(self._loads[key])
+
+    async def apply(self, cmap, data, vmin=None, vmax=None, alpha=True, nodata=None, mask=None, norm=None,
+                    chunk_size=None):
+        """
+        Maps data to uint8 colors of a colormap (see ColorMap.apply). The norm is scaled on the whole data,
+        then chunks of rows are colorized in the executor.
+
+        Parameters
+        ----------
+        cmap: ColorMap or str
+            colormap object or a specification loaded with load
+        data: numpy.ndarray or numpy.ma.MaskedArray
+            data array with at least one dimension
+        vmin, vmax: number, optional
+            data range mapped to the colors, default are the limits of the norm, else the minimum and maximum of
+            the valid data
+        alpha: bool, optional
+            if True RGBA colors are returned, if False RGB colors
+        nodata: number, optional
+            value marking invalid data, which is colored like NaN
+        mask: numpy.ndarray, optional
+            boolean array broadcastable to the shape of the data, True marks invalid data colored like NaN
+        norm: norms.Normalize, optional
+            normalization of the data, default is the linear normalization between vmin and vmax
+        chunk_size: int, optional
+            number of rows (first axis of data) per job, default are rows of about 4 million values
+
+        Returns
+        -------
+        numpy.ndarray
+            uint8 array of shape data.shape + (4,) or data.shape + (3,)
+        """
+        if isinstance(cmap, str):
+            cmap = await self.load(cmap)
+        data, mask = split_mask(data, mask)
+        if data.ndim == 0:
+            raise ValueError('Data must have at least one dimension')
+        norm = Normalize() if norm is None else norm
+        norm = await self.run(norm.autoscaled, data, vmin, vmax, nodata=nodata, mask=mask)
+        out = np.empty(data.shape + (4 if alpha else 3,), dtype=np.uint8)
+        if chunk_size is None:
+            chunk_size = block_rows(data, CHUNK_SIZE)
+
+        starts = range(0, data.shape[0], chunk_size)
+        jobs = [asyncio.ensure_future(self.run(
+            cmap.apply, data[start:start + chunk_size], out=out[start:start + chunk_size], alpha=alpha,
+            nodata=nodata, mask=None if mask is None else mask[start:start + chunk_size], norm=norm))
+            for start in starts]
+        try:
+            results = await asyncio.gather(*jobs)
+        except BaseException:
+            for job in jobs:
+                job.cancel()
+            raise
+        for start, colors in zip(starts, results):
+            # a process pool returns copies of the chunks instead of writing into out
+            if not np.may_share_memory(colors, out):
+                out[start:start + chunk_size] = colors
+        return out
+
+    async def save(self, cmap, outpath, **kwargs):
+        """
+        Saves a colormap, the file format is given by the extension of outpath (.cpt, .ct, .json or .npy)
+
+        Parameters
+        ----------
+        cmap: ColorMap
+            colormap object
+        outpath: str
+            filepath of the colormap file
+        kwargs:
+            keyword arguments of the save method
+
+        Returns
+        -------
+        str
+            outpath
+        """
+        extension = os.path.splitext(outpath)[1].lower()
+        if extension not in SAVERS:
+            raise ValueError('Unknown colormap file format {0}, use one of {1}'.format(
+                extension, ', '.join(SAVERS)))
+        await self.run(getattr(cmap, SAVERS[extension]), outpath, **kwargs)
+        return outpath
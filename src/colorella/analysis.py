@@ -0,0 +1,317 @@
+'''
+Perceptual analysis of colormaps: lightness profiles, perceptual uniformity, monotonicity and the
+separability of the colors for color vision deficiencies.
+
+All metrics are computed in CAM02-UCS (see colorspaces) on the lookup table of a colormap:
+- the lightness profile J' of the lookup table entries and its shape (increasing, decreasing,
+  diverging or non-monotonic)
+- the color differences (delta E) between neighbouring entries, a perceptually uniform colormap has
+  equal differences, i.e. a small coefficient of variation. As the differences of neighbouring entries
+  are sensitive to the rounding of colors to 8 bits, the uniformity error measures the largest deviation
+  of the cumulative color difference (normalized to [0, 1]) from a linear ramp
+- the perceptual length of the colormap under simulated protanopia, deuteranopia and tritanopia
+  (Machado et al. 2009) relative to the normal perceptual length, small values mean that the colors
+  collapse for viewers with this color vision deficiency
+
+report analyzes all colormaps of a directory in a pool of processes. Results are cached by a hash of
+the lookup table, so unchanged colormaps are not analyzed again, also across runs if a cache file is
+given. The rows of the report are written as CSV or JSON table with write_table.
+
+'''
+import csv
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from colorella.catalog import COLORMAP_DIR, load_colormaps
+from colorella.colorspaces import linear2srgb, srgb2cam02ucs, srgb2linear
+
+# version of the metrics, part of the cache keys
+METRICS_VERSION = 1
+
+# simulation of dichromacy in linear sRGB (Machado et al. 2009, severity 1)
+CVD_MATRICES = {'protan': np.array([[0.152286, 1.052583, -0.204868],
+                                    [0.114503, 0.786281, 0.099216],
+                                    [-0.003882, -0.048116, 1.051998]]),
+                'deutan': np.array([[0.367322, 0.860646, -0.227968],
+                                    [0.280085, 0.672501, 0.047413],
+                                    [-0.011820, 0.042940, 0.968881]]),
+                'tritan': np.array([[1.255528, -0.076749, -0.178779],
+                                    [-0.078411, 0.930809, 0.147602],
+                                    [0.004733, 0.691367, 0.303900]])}
+
+COLUMNS = ('name', 'n_colors', 'hash', 'lightness_min', 'lightness_max', 'lightness_start', 'lightness_end',
+           'lightness_shape', 'lightness_reversals', 'delta_e_mean', 'delta_e_min', 'delta_e_max', 'delta_e_cv',
+           'uniformity_error', 'perceptual_length', 'protan_separability', 'deutan_separability', 'tritan_separability')
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def simulate_cvd(colors, deficiency='deutan'):
+    """
+    Simulates the appearance of colors for a color vision deficiency
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        sRGB colors between 0 and 1 of shape (..., 3), an alpha channel is ignored
+    deficiency: str, optional
+        'protan' (protanopia), 'deutan' (deuteranopia) or 'tritan' (tritanopia), default = 'deutan'
+
+    Returns
+    -------
+    numpy.ndarray
+        simulated sRGB colors between 0 and 1 of shape (..., 3)
+    """
+    if deficiency not in CVD_MATRICES:
+        raise ValueError('Unknown color vision deficiency {0}, use one of {1}'.format(
+            deficiency, ', '.join(CVD_MATRICES)))
+    linear = srgb2linear(np.asarray(colors)[..., :3])
+    return linear2srgb(linear @ CVD_MATRICES[deficiency].T.astype(linear.dtype))
+
+
+def lightness(cmap, n_colors=256):
+    """
+    Returns the lightness profile of a colormap
+
+    Parameters
+    ----------
+    cmap: ColorMap
+        colormap object
+    n_colors: int, optional
+        number of lookup table entries, default = 256
+
+    Returns
+    -------
+    numpy.ndarray
+        CAM02-UCS lightness J' of the n_colors entries
+    """
+    return srgb2cam02ucs(cmap.lut(n_colors))[:, 0]
+
+
+def delta_e(colors):
+    """
+    Returns the color differences between neighbouring colors
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        sRGB colors between 0 and 1 of shape (N, 3) or (N, 4)
+
+    Returns
+    -------
+    numpy.ndarray
+        CAM02-UCS distances of the N - 1 pairs of neighbouring colors
+    """
+    return np.linalg.norm(np.diff(srgb2cam02ucs(colors), axis=0), axis=-1)
+
+
+def _lightness_shape(j, tolerance):
+    """
+    Returns the shape of a lightness profile and the number of reversals of its direction, steps smaller than
+    tolerance are ignored
+    """
+    steps = np.diff(j)
+    signs = np.sign(steps[np.abs(steps) > tolerance])
+    reversals = int(np.count_nonzero(signs[1:] != signs[:-1]))
+    if j.max() - j.min() <= 1. or signs.size == 0:
+        shape = 'flat'
+    elif reversals == 0:
+        shape = 'increasing' if signs[0] > 0 else 'decreasing'
+    elif reversals == 1:
+        shape = 'diverging'
+    else:
+        shape = 'non-monotonic'
+    return shape, reversals
+
+
+def lut_metrics(lut, tolerance=0.05):
+    """
+    Returns the perceptual metrics of a lookup table
+
+    Parameters
+    ----------
+    lut: numpy.ndarray
+        sRGB colors between 0 and 1 of shape (N, 3) or (N, 4), N > 1
+    tolerance: float, optional
+        lightness steps smaller than tolerance are ignored by the lightness shape, default = 0.05
+
+    Returns
+    -------
+    dict
+        the metrics of COLUMNS except name and hash
+    """
+    lut = np.asarray(lut, dtype=np.float64)
+    if lut.ndim != 2 or lut.shape[0] < 2 or lut.shape[1] not in (3, 4):
+        raise ValueError('Lookup table must be an array of at least two RGB or RGBA colors')
+    lut = lut[:, :3]
+    jab = srgb2cam02ucs(lut)
+    j = jab[:, 0]
+    steps = np.linalg.norm(np.diff(jab, axis=0), axis=-1)
+    length = steps.sum()
+    if length > 0:
+        cumulative = np.concatenate(([0.], np.cumsum(steps))) / length
+        uniformity_error = np.abs(cumulative - np.linspace(0., 1., lut.shape[0])).max()
+    else:
+        uniformity_error = 0.
+    shape, reversals = _lightness_shape(j, tolerance)
+    metrics = {'n_colors': lut.shape[0], 'lightness_min': j.min(), 'lightness_max': j.max(),
+               'lightness_start': j[0], 'lightness_end': j[-1], 'lightness_shape': shape,
+               'lightness_reversals': reversals, 'delta_e_mean': steps.mean(), 'delta_e_min': steps.min(),
+               'delta_e_max': steps.max(), 'delta_e_cv': steps.std() / steps.mean() if length > 0 else 0.,
+               'uniformity_error': uniformity_error, 'perceptual_length': length}
+    for deficiency in CVD_MATRICES:
+        simulated = delta_e(simulate_cvd(lut, deficiency)).sum()
+        metrics[deficiency + '_separability'] = simulated / length if length > 0 else 1.
+    return {key: value.item() if isinstance(value, np.generic) else value for key, value in metrics.items()}
+
+
+def lut_hash(lut):
+    """
+    Returns the hash of the content of a lookup table, which identifies the results of lut_metrics
+
+    Parameters
+    ----------
+    lut: numpy.ndarray
+        colors of the lookup table
+
+    Returns
+    -------
+    str
+        hexadecimal digest
+    """
+    lut = np.ascontiguousarray(lut, dtype=np.float64)
+    digest = hashlib.blake2b(lut.tobytes(), digest_size=16)
+    digest.update(repr((lut.shape, METRICS_VERSION)).encode())
+    return digest.hexdigest()
+
+
+def analyze(cmap, n_colors=256):
+    """
+    Returns the perceptual metrics of a colormap, cached by the hash of its lookup table
+
+    Parameters
+    ----------
+    cmap: ColorMap
+        colormap object
+    n_colors: int, optional
+        number of lookup table entries, default = 256
+
+    Returns
+    -------
+    dict
+        column name -> value, see COLUMNS
+    """
+    lut = cmap.lut(n_colors)
+    key = lut_hash(lut)
+    with _cache_lock:
+        metrics = _cache.get(key)
+    if metrics is None:
+        metrics = lut_metrics(lut)
+        with _cache_lock:
+            _cache[key] = metrics
+    return dict(metrics, name=cmap.name, hash=key)
+
+
+def _analyze_lut(args):
+    """
+    Computes the metrics of a lookup table in a worker process
+    """
+    key, lut = args
+    return key, lut_metrics(lut)
+
+
+def report(path=None, n_colors=256, n_workers=None, cache_file=None):
+    """
+    Analyzes all colormaps of a directory, the lookup tables are analyzed in a pool of processes. Results are
+    cached by the hash of the lookup table.
+
+    Parameters
+    ----------
+    path: str or dict, optional
+        directory or glob pattern of .cpt, .ct and .json colormaps (see catalog.load_colormaps) or a dict
+        mapping names to ColorMap objects, default is the colormap directory of colorella
+    n_colors: int, optional
+        number of lookup table entries, default = 256
+    n_workers: int, optional
+        number of worker processes, if None the number of CPUs is used, if 1 the colormaps are analyzed in
+        the calling process
+    cache_file: str, optional
+        JSON file of cached results, which is read before and updated after the analysis
+
+    Returns
+    -------
+    list
+        rows of the report (dicts with the keys COLUMNS), sorted by name
+    dict
+        filepath -> error message of every colormap file that could not be loaded
+    """
+    if isinstance(path, dict):
+        colormaps, errors = path, {}
+    else:
+        colormaps, errors = load_colormaps(COLORMAP_DIR if path is None else path, n_workers=n_workers)
+
+    stored = {}
+    if cache_file is not None and os.path.exists(cache_file):
+        with open(cache_file) as file:
+            stored = json.load(file)
+    with _cache_lock:
+        for key, metrics in stored.items():
+            _cache.setdefault(key, metrics)
+
+    luts = {name: cmap.lut(n_colors) for name, cmap in colormaps.items()}
+    keys = {name: lut_hash(lut) for name, lut in luts.items()}
+    with _cache_lock:
+        tasks = {keys[name]: lut for name, lut in luts.items() if keys[name] not in _cache}
+    tasks = list(tasks.items())
+
+    n_workers = os.cpu_count() if n_workers is None else n_workers
+    if n_workers > 1 and len(tasks) > 1:
+        chunksize = max(1, len(tasks) // (n_workers * 4))
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as executor:
+            results = list(executor.map(_analyze_lut, tasks, chunksize=chunksize))
+    else:
+        results = [_analyze_lut(task) for task in tasks]
+
+    with _cache_lock:
+        _cache.update(results)
+        rows = [dict(_cache[keys[name]], name=name, hash=keys[name]) for name in sorted(colormaps)]
+        if cache_file is not None and (results or not stored):
+            stored.update((row['hash'], _cache[row['hash']]) for row in rows)
+            with open(cache_file, 'w') as file:
+                json.dump(stored, file)
+    return rows, errors
+
+
+def write_table(rows, filepath):
+    """
+    Writes the rows of a report as table, the format is given by the extension of filepath: .csv or .json
+    (a list of records)
+
+    Parameters
+    ----------
+    rows: list
+        rows of the report (dicts with the keys COLUMNS)
+    filepath: str
+        filepath of the table
+
+    Returns
+    -------
+    str
+        filepath of the table
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension == '.csv':
+        with open(filepath, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+    elif extension == '.json':
+        with open(filepath, 'w') as file:
+            json.dump([{column: row[column] for column in COLUMNS} for row in rows], file, indent=1)
+    else:
+        raise ValueError('Unknown table format {0}, use .csv or .json'.format(extension))
+    return filepath
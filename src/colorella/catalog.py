@@ -0,0 +1,254 @@
+'''
+Catalog of the colormaps shipped in a Colorella colormap directory.
+
+The directory is scanned once and an index of the available colormaps (name, file format and
+file size) is kept in memory. Parsed colormaps are memoized in a bounded LRU cache, so that
+creating the same colormap repeatedly does not re-read and re-parse its file.
+Colormaps compiled to a .npy file (see conversions.compile_colormaps) take precedence over the
+source files and are memory mapped instead of parsed, unless the source file was modified after
+compiling: then the source file is loaded and a warning asks to compile the directory again.
+Whole palette libraries of .cpt, .ct and .json files are imported in parallel with
+load_colormaps.
+
+'''
+import os
+import glob
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from colorella.conversions import json2list, npy2dict, read_npy_index
+
+COLORMAP_DIR = os.path.join(os.path.dirname(__file__), "colormaps")
+FILE_EXTENSIONS = ('.cpt', '.ct', '.json')
+# seconds a source file may be newer than its compiled colormap, e.g. when both are written by a git checkout
+MTIME_TOLERANCE = 2.
+
+
+class ColorMapCatalog:
+    """Indexed colormap directory with a bounded cache of parsed colormaps
+        """
+
+    loaders = {'json': json2list}
+
+    def __init__(self, dirpath=None, maxsize=64):
+        """
+        Constructor of the catalog class. The directory is not scanned before the index is
+        accessed for the first time.
+
+        Parameters
+        ----------
+        dirpath : str, optional
+            directory containing the colormap files, default is the colormap directory of colorella
+        maxsize : int, optional
+            maximum number of parsed colormaps kept in the cache, default = 64
+        """
+        if maxsize < 1:
+            raise ValueError('Argument maxsize must be at least 1')
+        self.dirpath = dirpath if dirpath is not None else COLORMAP_DIR
+        self.maxsize = maxsize
+        self._index = None
+        self._bundles = {}
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def index(self):
+        """
+        Returns the index of the catalog, scanning the directory if this has not been done yet
+
+        Returns
+        ---------
+        dict
+            colormap name -> dictionary with the keys 'path', 'format' and 'size' (in bytes),
+            for compiled colormaps 'size' is the size of the colormap within the .npy file
+        """
+        with self._lock:
+            if self._index is None:
+                self.scan()
+            return self._index
+
+    def scan(self):
+        """
+        (Re-)scans the directory and rebuilds the index. The cache is cleared. Compiled colormaps older than
+        their source file are ignored with a warning.
+        """
+        index = {}
+        mtimes = {}
+        compiled = {}
+        compiled_mtimes = {}
+        for entry in sorted(os.scandir(self.dirpath), key=lambda e: e.name):
+            name, extension = os.path.splitext(entry.name)
+            fmt = extension[1:].lower()
+            if fmt in self.loaders and entry.is_file() and name not in index:
+                stat = entry.stat()
+                index[name] = {'path': entry.path, 'format': fmt, 'size': stat.st_size}
+                mtimes[name] = stat.st_mtime
+            elif fmt == 'npy' and os.path.exists(os.path.join(self.dirpath, name + '.idx')):
+                mtime = min(entry.stat().st_mtime, os.path.getmtime(os.path.join(self.dirpath, name + '.idx')))
+                for key, npy_entry in read_npy_index(entry.path).items():
+                    size = sum(rows * cols for _, _, rows, cols in npy_entry['Blocks']) * 8
+                    compiled[key] = {'path': entry.path, 'format': 'npy', 'size': size}
+                    compiled_mtimes[key] = mtime
+
+        stale = sorted(key for key in compiled
+                       if key in mtimes and mtimes[key] > compiled_mtimes[key] + MTIME_TOLERANCE)
+        if stale:
+            warnings.warn('Compiled colormaps {0} are older than their source files, the source files are loaded. '
+                          'Run compile_colormaps on {1} to update them.'.format(', '.join(stale), self.dirpath))
+        index.update((key, entry) for key, entry in compiled.items() if key not in stale)
+        with self._lock:
+            self._index = index
+            self._bundles.clear()
+            self._cache.clear()
+
+    def names(self):
+        """
+        Returns a sorted list of all colormap names in the catalog
+        """
+        return sorted(self.index)
+
+    def load(self, name):
+        """
+        Returns the parsed colormap data, served from the cache if available. The returned
+        colors are shared between all callers and must not be modified.
+
+        Parameters
+        ----------
+        name: str
+            name of the colormap (filename without extension)
+
+        Returns
+        -------
+        colormap name, dictionary or list containing all colors, gradient defining colormap type
+        """
+        with self._lock:
+            if name in self._cache:
+                self._cache.move_to_end(name)
+                return self._cache[name]
+            if name not in self.index:
+                raise KeyError('Colormap {0} not found in {1}'.format(name, self.dirpath))
+            entry = self._index[name]
+
+        if entry['format'] == 'npy':
+            parsed = self._bundle(entry['path'])[name]
+        else:
+            parsed = self.loaders[entry['format']](entry['path'])
+
+        with self._lock:
+            self._cache[name] = parsed
+            self._cache.move_to_end(name)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return parsed
+
+    def _bundle(self, filepath):
+        """
+        Returns all colormaps of a compiled .npy file, the file is only mapped once
+        """
+        with self._lock:
+            if filepath not in self._bundles:
+                self._bundles[filepath] = npy2dict(filepath)
+            return self._bundles[filepath]
+
+    def invalidate(self, name=None):
+        """
+        Removes colormaps from the cache
+
+        Parameters
+        ----------
+        name: str, optional
+            name of the colormap to be removed, if None the whole cache is cleared
+        """
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(name, None)
+
+    def cache_info(self):
+        """
+        Returns the number of cached colormaps and the cache size limit
+        """
+        with self._lock:
+            return {'currsize': len(self._cache), 'maxsize': self.maxsize}
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.names())
+
+
+default_catalog = ColorMapCatalog()
+
+
+def _load_file(args):
+    """
+    Loads a single colormap file in a worker process
+
+    Returns
+    -------
+    filepath, ColorMap object or None, error message or None
+    """
+    from colorella.colormap import ColorMap
+
+    filepath, gradient = args
+    try:
+        return filepath, ColorMap.from_file(filepath, gradient=gradient), None
+    except Exception as e:
+        return filepath, None, '{0}: {1}'.format(type(e).__name__, e)
+
+
+def load_colormaps(path, n_workers=None, gradient=True):
+    """
+    Loads all .cpt, .ct and .json colormaps of a directory or a glob pattern with a pool of processes
+
+    Parameters
+    ----------
+    path: str
+        directory or glob pattern (e.g. '/palettes/**/*.cpt')
+    n_workers: int, optional
+        number of worker processes, if None the number of CPUs is used, if 1 the files are loaded in
+        the calling process
+    gradient: bool, optional
+        passed to ColorMap.from_file for .cpt and .ct files, default = True
+
+    Returns
+    -------
+    dict
+        colormap name (filename without extension) -> ColorMap object
+    dict
+        filepath -> error message of every file that could not be loaded
+    """
+    if os.path.isdir(path):
+        filepaths = [os.path.join(path, filename) for filename in os.listdir(path)]
+    else:
+        filepaths = glob.glob(path, recursive=True)
+    filepaths = sorted(f for f in filepaths if os.path.splitext(f)[1].lower() in FILE_EXTENSIONS and
+                       os.path.isfile(f))
+
+    n_workers = os.cpu_count() if n_workers is None else n_workers
+    tasks = [(filepath, gradient) for filepath in filepaths]
+    if n_workers > 1 and len(tasks) > 1:
+        chunksize = max(1, len(tasks) // (n_workers * 4))
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(_load_file, tasks, chunksize=chunksize))
+    else:
+        results = [_load_file(task) for task in tasks]
+
+    colormaps = {}
+    errors = {}
+    for filepath, cmap, error in results:
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        if error is not None:
+            errors[filepath] = error
+        elif name in colormaps:
+            errors[filepath] = 'Colormap {0} has already been loaded from another file'.format(name)
+        else:
+            colormaps[name] = cmap
+
+    return colormaps, errors
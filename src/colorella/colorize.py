@@ -0,0 +1,600 @@
+'''
+Colorization of data arrays through a precomputed uint8 lookup table (LUT).
+
+Data are normalized and mapped to LUT indices in a single pass over blocks of rows, the colors
+are gathered from the LUT directly into the uint8 output array. Temporary arrays are bounded by
+the block size, no full-size float image is created.
+Chunks of rows can be processed in a thread pool, numpy releases the GIL while computing the
+indices and gathering the colors. Every chunk writes into its own rows of the shared output, so
+the result is identical to single-threaded processing.
+Arrays larger than memory are colorized from memory maps (.npy or raw binary files) chunk by
+chunk into a memory-mapped output file, see colorize_file.
+Instead of colors, data can be mapped to uint8 or uint16 indices of a palette (quantize), which
+needs a quarter of the memory of RGBA colors and can be written as paletted PNG or GeoTIFF.
+Classified colormaps bin the data with np.searchsorted on their class boundaries (classify).
+Data can be normalized linearly or with the non-linear norms of the norms module.
+Invalid values are given as nodata value, as boolean mask or as masked array. The data and the
+mask of a masked array are used as views in the same block-wise pass, the input is never copied.
+
+'''
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+BLOCK_SIZE = 2 ** 16
+CHUNK_SIZE = 2 ** 22
+
+
+def build_lut(colors, bad=(0., 0., 0., 0.), alpha=True, under=None, over=None):
+    """
+    Creates a uint8 lookup table from the colors of a colormap. Float colors are quantized as in matplotlib
+    (colormap(x, bytes=True)), the color for invalid values (NaN) is appended after the N colors. If under or
+    over is given, the under and over colors are appended after the bad color (extended lookup table).
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        RGBA colors of shape (N, 4), either uint8 or float with values between 0 and 1
+    bad: tuple, optional
+        float RGBA color for invalid values, default is transparent black
+    alpha: bool, optional
+        if True the lookup table contains RGBA colors, if False RGB colors
+    under, over: tuple, optional
+        float RGBA colors for values below and above the data range, if only one is given the other one is
+        the first or last color
+
+    Returns
+    -------
+    numpy.ndarray
+        lookup table of shape (N + 1, 4) or (N + 1, 3), (N + 3, 4) or (N + 3, 3) if under or over is given
+    """
+    n = colors.shape[0]
+    extended = under is not None or over is not None
+    lut = np.empty((n + 3 if extended else n + 1, 4), dtype=np.uint8)
+    lut[:n] = colors if colors.dtype == np.uint8 else (colors * 255).astype(np.uint8)
+    lut[n] = (np.asarray(bad, dtype=np.float64) * 255).astype(np.uint8)
+    if extended:
+        lut[n + 1] = lut[0] if under is None else (np.asarray(under, dtype=np.float64) * 255).astype(np.uint8)
+        lut[n + 2] = lut[n - 1] if over is None else (np.asarray(over, dtype=np.float64) * 255).astype(np.uint8)
+    if not alpha:
+        lut = np.ascontiguousarray(lut[:, :3])
+    return lut
+
+
+def block_rows(data, size=BLOCK_SIZE):
+    """
+    Returns the number of rows (first axis) of data blocks containing about size elements
+    """
+    if data.ndim == 0:
+        return 1
+    return max(1, size // max(1, data[0].size))
+
+
+def split_mask(data, mask=None):
+    """
+    Returns the data of a masked array and its mask combined with mask, both without copying the data
+
+    Parameters
+    ----------
+    data: numpy.ndarray or numpy.ma.MaskedArray
+        data array
+    mask: numpy.ndarray, optional
+        boolean array broadcastable to the shape of the data, True marks invalid values
+
+    Returns
+    -------
+    numpy.ndarray
+        data array, the data of a masked array as view
+    numpy.ndarray or None
+        boolean mask of the shape of the data (a broadcast view), None if no value is masked
+    """
+    if isinstance(data, np.ma.MaskedArray):
+        data_mask = np.ma.getmask(data)
+        data = data.data
+        if data_mask is not np.ma.nomask:
+            mask = data_mask if mask is None else np.logical_or(mask, data_mask)
+    else:
+        data = np.asarray(data)
+    if mask is not None:
+        mask = np.broadcast_to(np.asarray(mask, dtype=bool), data.shape)
+    return data, mask
+
+
+def valid_values(data, nodata=None, mask=None, valid=None):
+    """
+    Yields the valid values of the data block by block, so memory mapped arrays are never loaded as a whole
+
+    Parameters
+    ----------
+    data: numpy.ndarray
+        data array
+    nodata: number, optional
+        value marking invalid data
+    mask: numpy.ndarray, optional
+        boolean array of the shape of the data, True marks invalid data
+    valid: callable, optional
+        function returning a boolean array of the valid values of a block, e.g. of the positive values
+
+    Yields
+    ------
+    numpy.ndarray
+        1-D array of the valid values of a block
+    """
+    blocks = data.reshape(1) if data.ndim == 0 else data
+    rows = block_rows(blocks)
+    for start in range(0, blocks.shape[0], rows):
+        block = np.asarray(blocks[start:start + rows])
+        if mask is not None:
+            block = block[~mask.reshape(blocks.shape)[start:start + rows]]
+        if nodata is not None:
+            block = block[block != nodata]
+        if block.dtype.kind == 'f':
+            block = block[~np.isnan(block)]
+        if valid is not None:
+            block = block[valid(block)]
+        yield block.ravel()
+
+
+def data_range(data, vmin=None, vmax=None, nodata=None, mask=None, valid=None):
+    """
+    Returns the normalization range, missing limits are taken from the minimum and maximum of the data.
+    The data is reduced block by block, so memory mapped arrays are never loaded as a whole.
+
+    Parameters
+    ----------
+    data: numpy.ndarray
+        data array
+    vmin, vmax: number, optional
+        lower and upper limit of the data range
+    nodata: number, optional
+        value excluded from the minimum and maximum
+    mask: numpy.ndarray, optional
+        boolean array of the shape of the data, True marks values excluded from the minimum and maximum
+    valid: callable, optional
+        function returning a boolean array of the values of a block included in the minimum and maximum
+
+    Returns
+    -------
+    float, float
+        vmin and vmax
+    """
+    if vmin is None or vmax is None:
+        minima = []
+        maxima = []
+        for block in valid_values(data, nodata=nodata, mask=mask, valid=valid):
+            if block.size:
+                minima.append(block.min())
+                maxima.append(block.max())
+        if not minima:
+            raise ValueError('Data contains no valid values to determine vmin and vmax')
+        if vmin is None:
+            vmin = min(minima)
+        if vmax is None:
+            vmax = max(maxima)
+    # python floats, differences of integer limits overflow in the dtype of the data
+    vmin, vmax = float(vmin), float(vmax)
+    if vmin > vmax:
+        raise ValueError("Argument vmin must be less than or equal to vmax")
+    return vmin, vmax
+
+
+def lut_indices(block, vmin, vmax, n, nodata=None, mask=None, extended=False, norm=None):
+    """
+    Maps a block of data to indices of a lookup table with n colors. Values below vmin (above vmax) are
+    mapped to the first (last) color, NaN, nodata and masked values are mapped to index n. For an extended
+    lookup table values below vmin are mapped to index n + 1 and values above vmax to index n + 2.
+    The data are normalized linearly between vmin and vmax or with a scaled norm (see norms).
+
+    Parameters
+    ----------
+    block: numpy.ndarray
+        block of data
+    vmin, vmax: number
+        data range mapped to the colors of the lookup table
+    n: int
+        number of colors in the lookup table
+    nodata: number, optional
+        value marking invalid data
+    mask: numpy.ndarray, optional
+        boolean array of the shape of the block, True marks invalid data
+    extended: bool, optional
+        if True, the indices of an extended lookup table with under and over colors are returned
+    norm: Normalize, optional
+        scaled norm used instead of the linear normalization between vmin and vmax
+
+    Returns
+    -------
+    numpy.ndarray
+        array of indices with the shape of the block
+    """
+    # float32 for small integers and float32 data, float64 otherwise (same as matplotlib.colors.Normalize)
+    dtype = np.promote_types(block.dtype, np.float32)
+    if norm is not None:
+        x = norm(block)
+        x *= n
+    elif vmin == vmax:
+        x = np.zeros(block.shape, dtype=dtype)
+    else:
+        x = np.subtract(block, vmin, dtype=dtype)
+        x /= (vmax - vmin)
+        x *= n
+    # same out of range test as matplotlib: x == 1 (n after scaling) is the last color
+    under = x < 0 if extended else None
+    over = x > n if extended else None
+    np.clip(x, 0, n - 1, out=x)
+    if extended:
+        x[under] = n + 1
+        x[over] = n + 2
+    if norm is not None:
+        # values outside of the domain of the norm, e.g. values <= 0 of a logarithmic norm
+        x[np.isnan(x)] = n
+    if block.dtype.kind == 'f':
+        x[np.isnan(block)] = n
+    if nodata is not None:
+        x[block == nodata] = n
+    if mask is not None:
+        x[mask] = n
+    return x.astype(np.intp)
+
+
+def _map_chunks(blocks, process, n_threads=1, chunk_size=None, block_size=BLOCK_SIZE):
+    """
+    Calls process(start, stop) for blocks of rows of the data, chunks of rows are processed in a thread pool
+
+    Parameters
+    ----------
+    blocks: numpy.ndarray
+        data array with at least one dimension
+    process: callable
+        function processing the rows start to stop of the data
+    n_threads: int, optional
+        number of threads processing the chunks, if None the number of CPUs is used, default = 1
+    chunk_size: int, optional
+        number of rows (first axis) per chunk, default is the number of rows of one block
+    block_size: int, optional
+        number of elements of the blocks passed to process, default = 2 ** 16
+    """
+    rows = block_rows(blocks, block_size)
+    if chunk_size is None:
+        chunk_size = rows
+    elif chunk_size < 1:
+        raise ValueError('Argument chunk_size must be at least 1')
+
+    def process_chunk(start):
+        stop = min(start + chunk_size, blocks.shape[0])
+        for block_start in range(start, stop, rows):
+            process(block_start, min(block_start + rows, stop))
+
+    starts = range(0, blocks.shape[0], chunk_size)
+    n_threads = os.cpu_count() if n_threads is None else n_threads
+    if n_threads > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=min(n_threads, len(starts))) as executor:
+            for _ in executor.map(process_chunk, starts):
+                pass
+    else:
+        for start in starts:
+            process_chunk(start)
+
+
+def colorize(data, lut, vmin=None, vmax=None, out=None, nodata=None, mask=None, extended=False, norm=None,
+             n_threads=1, chunk_size=None):
+    """
+    Maps data to colors of a lookup table
+
+    Parameters
+    ----------
+    data: numpy.ndarray or numpy.ma.MaskedArray
+        data array of any shape, masked values are colored like NaN
+    lut: numpy.ndarray
+        uint8 lookup table of shape (N + 1, C) as returned by build_lut, the entry N is used for NaN
+    vmin, vmax: number, optional
+        data range mapped to the colors, default are the limits of the norm, else the minimum and maximum of the
+        valid data
+    out: numpy.ndarray, optional
+        uint8 array of shape data.shape + (C,) in which the colors are written
+    nodata: number, optional
+        value marking invalid data, colored like NaN
+    mask: numpy.ndarray, optional
+        boolean array broadcastable to the shape of the data, True marks invalid data colored like NaN
+    extended: bool, optional
+        if True, lut is an extended lookup table of shape (N + 3, C) with the under and over colors
+    norm: Normalize, optional
+        norm of the data (see norms), default is the linear normalization between vmin and vmax
+    n_threads: int, optional
+        number of threads processing the chunks, if None the number of CPUs is used, default = 1
+    chunk_size: int, optional
+        number of rows (first axis) per chunk, default is the number of rows of one block
+
+    Returns
+    -------
+    numpy.ndarray
+        uint8 array of shape data.shape + (C,)
+    """
+    data, mask = split_mask(data, mask)
+    shape = data.shape + (lut.shape[1],)
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    elif out.shape != shape or out.dtype != np.uint8:
+        raise ValueError('Argument out must be a uint8 array of shape {0}'.format(shape))
+    if data.size == 0:
+        return out
+
+    if norm is None:
+        vmin, vmax = data_range(data, vmin, vmax, nodata=nodata, mask=mask)
+    else:
+        norm = norm.autoscaled(data, vmin, vmax, nodata=nodata, mask=mask)
+    n = lut.shape[0] - (3 if extended else 1)
+    blocks = data.reshape((1,) + shape[:-1]) if data.ndim == 0 else data
+    masks = None if mask is None else mask.reshape(blocks.shape)
+    colors = out.reshape((1,) + shape[-1:]) if data.ndim == 0 else out
+
+    def colorize_block(start, stop):
+        idx = lut_indices(blocks[start:stop], vmin, vmax, n, nodata=nodata,
+                          mask=None if masks is None else masks[start:stop], extended=extended, norm=norm)
+        np.take(lut, idx, axis=0, out=colors[start:stop], mode='clip')
+
+    _map_chunks(blocks, colorize_block, n_threads=n_threads, chunk_size=chunk_size)
+    return out
+
+
+def quantize(data, n, vmin=None, vmax=None, out=None, nodata=None, mask=None, dtype=np.uint8, norm=None,
+             n_threads=1, chunk_size=None, extended=False):
+    """
+    Maps data to the indices of a palette with n colors. Values below vmin (above vmax) are mapped to the
+    first (last) color, NaN, nodata and masked values to the reserved index n. For an extended palette
+    (build_lut with under or over colors) values below vmin are mapped to index n + 1 and values above vmax
+    to index n + 2.
+
+    Parameters
+    ----------
+    data: numpy.ndarray or numpy.ma.MaskedArray
+        data array of any shape
+    n: int
+        number of colors of the palette
+    vmin, vmax: number, optional
+        data range mapped to the colors, default is the minimum and maximum of the valid data
+    out: numpy.ndarray, optional
+        array of shape data.shape and type dtype in which the indices are written
+    nodata: number, optional
+        value marking invalid data, mapped to index n like NaN
+    mask: numpy.ndarray, optional
+        boolean array broadcastable to the shape of the data, True marks invalid data mapped to index n
+    dtype: numpy.dtype, optional
+        numpy.uint8 (n <= 255) or numpy.uint16 (n <= 65535), default = numpy.uint8
+    norm: Normalize, optional
+        norm of the data (see norms), default is the linear normalization between vmin and vmax
+    n_threads: int, optional
+        number of threads processing the chunks, if None the number of CPUs is used, default = 1
+    chunk_size: int, optional
+        number of rows (first axis) per chunk, default is the number of rows of one block
+    extended: bool, optional
+        if True, the indices of an extended palette with under and over colors are returned
+
+    Returns
+    -------
+    numpy.ndarray
+        array of indices of shape data.shape
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.uint8, np.uint16):
+        raise ValueError('Argument dtype must be numpy.uint8 or numpy.uint16')
+    max_colors = np.iinfo(dtype).max - (2 if extended else 0)
+    if not 1 <= n <= max_colors:
+        raise ValueError('A {0} palette supports 1 to {1} colors and a nodata index{2}'.format(
+            dtype.name, max_colors, ', under and over index' if extended else ''))
+    data, mask = split_mask(data, mask)
+    if out is None:
+        out = np.empty(data.shape, dtype=dtype)
+    elif out.shape != data.shape or out.dtype != dtype:
+        raise ValueError('Argument out must be a {0} array of shape {1}'.format(dtype.name, data.shape))
+    if data.size == 0:
+        return out
+
+    if norm is None:
+        vmin, vmax = data_range(data, vmin, vmax, nodata=nodata, mask=mask)
+    else:
+        norm = norm.autoscaled(data, vmin, vmax, nodata=nodata, mask=mask)
+    blocks = data.reshape(1) if data.ndim == 0 else data
+    masks = None if mask is None else mask.reshape(blocks.shape)
+    indices = out.reshape(1) if data.ndim == 0 else out
+
+    def quantize_block(start, stop):
+        indices[start:stop] = lut_indices(blocks[start:stop], vmin, vmax, n, nodata=nodata,
+                                          mask=None if masks is None else masks[start:stop], extended=extended,
+                                          norm=norm)
+
+    _map_chunks(blocks, quantize_block, n_threads=n_threads, chunk_size=chunk_size)
+    return out
+
+
+def class_indices(block, boundaries, nodata=None, mask=None):
+    """
+    Maps a block of data to the indices of a classified lookup table with the entries under, K classes, over
+    and bad: values below boundaries[0] are mapped to 0, values in [boundaries[i], boundaries[i + 1]) to i + 1,
+    values at or above boundaries[K] to K + 1 and NaN, nodata and masked values to K + 2 (same bins as
+    matplotlib's BoundaryNorm).
+
+    Parameters
+    ----------
+    block: numpy.ndarray
+        block of data
+    boundaries: numpy.ndarray
+        K + 1 increasing class boundaries
+    nodata: number, optional
+        value marking invalid data
+    mask: numpy.ndarray, optional
+        boolean array of the shape of the block, True marks invalid data
+
+    Returns
+    -------
+    numpy.ndarray
+        array of indices with the shape of the block
+    """
+    idx = np.searchsorted(boundaries, block, side='right')
+    n_bad = boundaries.shape[0] + 1
+    if block.dtype.kind == 'f':
+        idx[np.isnan(block)] = n_bad
+    if nodata is not None:
+        idx[block == nodata] = n_bad
+    if mask is not None:
+        idx[mask] = n_bad
+    return idx
+
+
+def classify(data, boundaries, lut, out=None, nodata=None, mask=None, n_threads=1, chunk_size=None):
+    """
+    Maps data to the colors of classes defined by boundaries
+
+    Parameters
+    ----------
+    data: numpy.ndarray or numpy.ma.MaskedArray
+        data array of any shape, masked values are colored like NaN
+    boundaries: numpy.ndarray
+        K + 1 increasing class boundaries
+    lut: numpy.ndarray
+        uint8 lookup table of shape (K + 3, C) with the under color, the K class colors, the over color and the
+        color for NaN and nodata
+    out: numpy.ndarray, optional
+        uint8 array of shape data.shape + (C,) in which the colors are written
+    nodata: number, optional
+        value marking invalid data, colored like NaN
+    mask: numpy.ndarray, optional
+        boolean array broadcastable to the shape of the data, True marks invalid data colored like NaN
+    n_threads: int, optional
+        number of threads processing the chunks, if None the number of CPUs is used, default = 1
+    chunk_size: int, optional
+        number of rows (first axis) per chunk, default is the number of rows of one block
+
+    Returns
+    -------
+    numpy.ndarray
+        uint8 array of shape data.shape + (C,)
+    """
+    if lut.shape[0] != boundaries.shape[0] + 2:
+        raise ValueError('Lookup table must have an entry for every class, under, over and bad')
+    data, mask = split_mask(data, mask)
+    shape = data.shape + (lut.shape[1],)
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    elif out.shape != shape or out.dtype != np.uint8:
+        raise ValueError('Argument out must be a uint8 array of shape {0}'.format(shape))
+    if data.size == 0:
+        return out
+
+    blocks = data.reshape((1,) + shape[:-1]) if data.ndim == 0 else data
+    masks = None if mask is None else mask.reshape(blocks.shape)
+    colors = out.reshape((1,) + shape[-1:]) if data.ndim == 0 else out
+
+    def classify_block(start, stop):
+        idx = class_indices(blocks[start:stop], boundaries, nodata=nodata,
+                            mask=None if masks is None else masks[start:stop])
+        np.take(lut, idx, axis=0, out=colors[start:stop], mode='clip')
+
+    _map_chunks(blocks, classify_block, n_threads=n_threads, chunk_size=chunk_size)
+    return out
+
+
+def open_input(src, shape=None, dtype=None):
+    """
+    Opens the input of colorize_file as read-only memory map
+
+    Parameters
+    ----------
+    src: str or numpy.ndarray
+        array, .npy file or raw binary file
+    shape: tuple, optional
+        shape of a raw binary file
+    dtype: numpy.dtype, optional
+        data type of a raw binary file
+
+    Returns
+    -------
+    numpy.ndarray or numpy.memmap
+    """
+    if not isinstance(src, str):
+        return np.asarray(src)
+    if not os.path.exists(src):
+        raise ImportError("file ", src, "not found")
+    if os.path.splitext(src)[1] == '.npy':
+        return np.load(src, mmap_mode='r')
+    if shape is None or dtype is None:
+        raise ValueError('Arguments shape and dtype are required to read the raw binary file {0}'.format(src))
+    return np.memmap(src, dtype=dtype, mode='r', shape=shape)
+
+
+def open_output(dst, shape):
+    """
+    Creates the uint8 output of colorize_file
+
+    Parameters
+    ----------
+    dst: str or numpy.ndarray
+        array, .npy file or raw binary file
+    shape: tuple
+        shape of the output
+
+    Returns
+    -------
+    numpy.ndarray or numpy.memmap
+    """
+    if not isinstance(dst, str):
+        return dst
+    if os.path.splitext(dst)[1] == '.npy':
+        return np.lib.format.open_memmap(dst, mode='w+', dtype=np.uint8, shape=shape)
+    return np.memmap(dst, dtype=np.uint8, mode='w+', shape=shape)
+
+
+def colorize_file(src, dst, lut, vmin=None, vmax=None, nodata=None, shape=None, dtype=None, extended=False,
+                  norm=None, n_threads=1, chunk_size=None):
+    """
+    Maps data to colors of a lookup table chunk by chunk, without loading the whole input or output into memory
+
+    Parameters
+    ----------
+    src: str or numpy.ndarray
+        input data, a (memory mapped) array, a .npy file or a raw binary file
+    dst: str or numpy.ndarray
+        output colors, a (memory mapped) uint8 array of shape src.shape + (C,), a .npy file or a raw binary file
+    lut: numpy.ndarray
+        uint8 lookup table of shape (N + 1, C) as returned by build_lut, the entry N is used for NaN and nodata
+    vmin, vmax: number, optional
+        data range mapped to the colors, default is the minimum and maximum of the valid data
+    nodata: number, optional
+        value marking invalid data
+    shape: tuple, optional
+        shape of a raw binary input file
+    dtype: numpy.dtype, optional
+        data type of a raw binary input file
+    extended: bool, optional
+        if True, lut is an extended lookup table of shape (N + 3, C) with the under and over colors
+    norm: Normalize, optional
+        norm of the data (see norms), scaled on the whole input before the first chunk is colorized
+    n_threads: int, optional
+        number of threads colorizing each chunk, default = 1
+    chunk_size: int, optional
+        number of rows (first axis) read and written at once, default are rows of about 4 million values
+
+    Returns
+    -------
+    numpy.ndarray or numpy.memmap
+        the output array
+    """
+    data = open_input(src, shape=shape, dtype=dtype)
+    if data.ndim == 0:
+        raise ValueError('Input data must have at least one dimension')
+    out = open_output(dst, data.shape + (lut.shape[1],))
+    if norm is None:
+        vmin, vmax = data_range(data, vmin, vmax, nodata=nodata)
+    else:
+        norm = norm.autoscaled(data, vmin, vmax, nodata=nodata)
+        vmin = vmax = None
+    if chunk_size is None:
+        chunk_size = block_rows(data, CHUNK_SIZE)
+
+    for start in range(0, data.shape[0], chunk_size):
+        colorize(data[start:start + chunk_size], lut, vmin=vmin, vmax=vmax, out=out[start:start + chunk_size],
+                 nodata=nodata, extended=extended, norm=norm, n_threads=n_threads)
+        if isinstance(out, np.memmap):
+            out.flush()
+
+    return out
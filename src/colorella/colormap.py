@@ -31,30 +31,172 @@ classmethods allow the following functions:
 - view a colormap as plot
 - load or convert to gdal colortable objects
 - create a list or dictionary object contaning all the colors from a colormap
+- recover data values from images rendered with a colormap
+ClassifiedColorMap maps values to the colors of classes between explicit boundaries
 
 '''''
 import os
 import json
+import threading
+from collections import OrderedDict
+from collections.abc import Sized
 import numpy as np
 import matplotlib as mpl
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
 import matplotlib.colors as col
-import colorcet as cc
 import warnings
-from colorella.conversions import cptfile2dict, ctfile2list, json2list
+from colorella.conversions import cptfile2dict, ctfile2list, json2list, json2classified, npy2dict, dict2npy, \
+    array2ctfile
+from colorella.catalog import default_catalog
+from colorella.colorize import build_lut, classify, colorize, colorize_file, quantize
+from colorella.geotiff import colorize_geotiff, lut2colortable
+from colorella.inverse import InverseColorMap
+from colorella.transforms import GREYSCALE_OPTIONS, greyscale
 
 gdal_warning = 'No GDAL Installation found. Without gdal the following functions are not available: from_gdal, to_gdal'
-try:
-    from osgeo import gdal
-    GDAL_INSTALLED = True
-except:
-    GDAL_INSTALLED = False
+
+CHANNELS = ('red', 'green', 'blue', 'alpha')
+NO_EXTREMES = (None, None, None)
+LUT_CACHE_SIZE = 8
+# guards the lookup table caches of all colormaps, which are shared by threads (e.g. aio, tiles)
+_LUT_LOCK = threading.Lock()
+
+
+def _import_gdal():
+    """
+    Imports gdal on first use, importing it at module load slows down the import of colorella
+
+    Returns
+    -------
+    gdal module, None if gdal is not installed
+    """
+    try:
+        from osgeo import gdal
+    except ImportError:
+        warnings.warn(gdal_warning)
+        return None
+    return gdal
+
+
+def _cpt_extremes(extensions):
+    """
+    Returns the colors of the B (below range), F (above range) and N (NaN) lines of a .cpt file as
+    (under, over, bad) tuple
+    """
+    return tuple(None if extensions.get(key) is None else tuple(extensions[key]) for key in ('B', 'F', 'N'))
+
+
+def _segments2lut(segments, N):
+    """
+    Samples the segments of a LinearSegmented Colormap at N colors, the same way matplotlib builds the lookup
+    table of a LinearSegmentedColormap (gamma = 1)
+
+    Parameters
+    ----------
+    segments: dict
+        channel name -> float64 array of shape (M, 3) with x, y0, y1 rows
+    N: int
+        number of colors
+
+    Returns
+    -------
+    numpy.ndarray
+        float64 array of shape (N, 4)
+    """
+    lut = np.ones((N, 4))
+    xind = (N - 1) * np.linspace(0, 1, N)
+    for i, channel in enumerate(CHANNELS):
+        if channel not in segments:
+            continue
+        x, y0, y1 = segments[channel].T
+        if N == 1:
+            lut[:, i] = y0[-1]
+            continue
+        x = x * (N - 1)
+        ind = np.searchsorted(x, xind)[1:-1]
+        distance = (xind[1:-1] - x[ind - 1]) / (x[ind] - x[ind - 1])
+        lut[0, i] = y1[0]
+        lut[1:-1, i] = distance * (y0[ind] - y1[ind - 1]) + y1[ind - 1]
+        lut[-1, i] = y0[-1]
+    return np.clip(lut, 0., 1., out=lut)
+
+
+def _list2segments(colors):
+    """
+    Creates the segments of a gradient evenly transitioning between a list of colors, alternatively a list of
+    (value, color) tuples can be given (same as matplotlib's LinearSegmentedColormap.from_list)
+    """
+    if isinstance(colors[0], Sized) and len(colors[0]) == 2 and not isinstance(colors[0], str):
+        vals, colors = zip(*colors)
+    elif len(colors) == 1:
+        vals, colors = (0., 1.), [colors[0], colors[0]]
+    else:
+        vals = np.linspace(0, 1, len(colors))
+    rgba = col.to_rgba_array(colors)
+    return {channel: np.column_stack([vals, rgba[:, i], rgba[:, i]]) for i, channel in enumerate(CHANNELS)}
+
+
+def _reverse_segments(channel):
+    """
+    Reverses the x, y0, y1 table of a channel: x is flipped to 1 - x, y0 and y1 are swapped and the rows are
+    taken in reverse order. Rows with equal x are ordered by y0 and y1, as by sorting the reversed rows.
+
+    Parameters
+    ----------
+    channel: numpy.ndarray
+        float64 array of shape (M, 3) with x increasing
+
+    Returns
+    -------
+    numpy.ndarray
+        float64 array of shape (M, 3)
+    """
+    reverse = channel[::-1, [0, 2, 1]]
+    reverse[:, 0] = 1 - reverse[:, 0]
+    if (reverse[1:, 0] == reverse[:-1, 0]).any():
+        reverse = reverse[np.lexsort(reverse.T[::-1])]
+    return reverse
+
+
+def _array(array, copy=True):
+    """
+    Returns a copy or a read-only view of an array
+    """
+    if copy:
+        return array.copy()
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def _greyscale_weights(weights, gamma=None):
+    """
+    Returns the weights and gamma of a greyscale weight option (1 - 3) or of weights given as array
+    """
+    if np.ndim(weights) == 0:
+        if weights not in GREYSCALE_OPTIONS:
+            raise ValueError('Argument weights must be one of {0}, a 3-vector or a 3x3 matrix'.format(
+                sorted(GREYSCALE_OPTIONS)))
+        weights, default_gamma = GREYSCALE_OPTIONS[weights]
+        gamma = default_gamma if gamma is None else gamma
+    return weights, gamma
+
+
+def _to_tuples(array):
+    """
+    Converts a row or an array of rows to a tuple or a list of tuples
+    """
+    if array.ndim == 1:
+        return tuple(array.tolist())
+    return [tuple(row) for row in array.tolist()]
+
 
 class ColorMap:
-    """create a colormap object compatible with matplotlib
+    """create a colormap object compatible with matplotlib. The colors are kept in numpy arrays, a matplotlib
+    colormap object is only created when it is requested with to_matplotlib
         """
 
+    __slots__ = ('_name', '_N', '_lut', '_bytes', '_segments', '_extremes', '_mpl', '_luts')
+
     def __init__(self, arg):
         """
         Constructor of colormap class.
@@ -67,38 +209,133 @@ class ColorMap:
                 cc:Name to load a Colorcet colormap,
                 cl:Name to load a Colorella Colormap from json file
         """
-        self.arg = arg
-
-        if isinstance(self.arg, col.LinearSegmentedColormap) or isinstance(self.arg, col.ListedColormap):
-            self._mpl_cm = self.arg
-        elif isinstance(self.arg, str):
+        if isinstance(arg, col.Colormap):
+            self._set_matplotlib(arg)
+        elif isinstance(arg, str):
             pkg_name, cm_name = arg.split(':')
             if pkg_name == "mpl":
-                if cm_name not in plt.colormaps():
+                if hasattr(mpl, 'colormaps'):
+                    colormaps = mpl.colormaps
+                else:  # matplotlib < 3.5
+                    import matplotlib.cm as cm
+                    colormaps = cm.cmap_d
+                if cm_name not in colormaps:
                     raise ValueError('Input provided {0} is not a Matplotlib Colormap'.format(
                 cm_name))
-                self._mpl_cm = cm.get_cmap(cm_name)
+                self._set_matplotlib(colormaps[cm_name])
             elif pkg_name == "cl":
-                cm_filepath = os.path.join(os.path.dirname(__file__), "colormaps", cm_name + ".json")
-                name, colors, gradient = json2list(cm_filepath)
+                if cm_name not in default_catalog:
+                    raise ValueError('Input provided {0} is not a Colorella Colormap'.format(
+                        cm_name))
+                name, colors, gradient = default_catalog.load(cm_name)
                 if not gradient:
-                    self._mpl_cm = col.ListedColormap(colors=colors, name=name)
+                    self._set_state(name, lut=colors)
                 else:
-                    self._mpl_cm = col.LinearSegmentedColormap(segmentdata=colors, name=name)
+                    self._set_state(name, segments=colors)
             elif pkg_name == 'cc':
+                import colorcet as cc
                 if cm_name not in cc.cm:
                     raise ValueError('Input provided {0} is not a Colorcet Colormap'.format(
                         cm_name))
-                self._mpl_cm = cc.cm[cm_name]
+                self._set_matplotlib(cc.cm[cm_name])
+            else:
+                raise ValueError('Input provided {0} is not a colormap of mpl, cc or cl'.format(arg))
 
         else:
             txt = "Input provided {0} is not recognised".format(
-                self.arg)
+                arg)
             txt += "\n Use mpl:*name* for Matplotlib Colormaps, cc:*name* for Colorcet Colormaps and cl:*name* to open a" \
                    " Colormap from the Colormap directory"
 
             raise ValueError(txt)
 
+    @classmethod
+    def _new(cls, name, lut=None, segments=None, N=256, extremes=NO_EXTREMES, lut_bytes=None):
+        """
+        Creates a ColorMap object from its colors without going through a matplotlib colormap
+        """
+        cmap = cls.__new__(cls)
+        cmap._set_state(name, lut=lut, segments=segments, N=N, extremes=extremes, lut_bytes=lut_bytes)
+        return cmap
+
+    def _set_state(self, name, lut=None, segments=None, N=256, extremes=NO_EXTREMES, lut_bytes=None):
+        """
+        Sets the colors of the colormap
+
+        Parameters
+        ----------
+        name: str
+            name of the colormap
+        lut: array_like, optional
+            colors of a Listed Colormap, stored as float32 array of shape (N, 4)
+        segments: dict, optional
+            x, y0, y1 tables of a LinearSegmented Colormap, stored as float64 arrays of shape (M, 3)
+        N: int, optional
+            number of colors sampled from the segments, default = 256
+        extremes: tuple, optional
+            under, over and bad color, None for the default colors
+        lut_bytes: numpy.ndarray, optional
+            colors of a Listed Colormap quantized to uint8, default is to quantize lut as matplotlib does.
+            The quantization is done before lut is converted to float32, so the uint8 colors stay the same as
+            the ones of a matplotlib colormap with the original colors.
+        """
+        if segments is None:
+            rgba = col.to_rgba_array(lut)
+            lut = rgba.astype(np.float32)
+            lut_bytes = (rgba * 255).astype(np.uint8) if lut_bytes is None else np.asarray(lut_bytes, np.uint8)
+            N = lut.shape[0]
+        else:
+            if not all(channel in segments for channel in CHANNELS[:3]):
+                raise ValueError('Segments require the channels red, green and blue')
+            segments = {channel: np.asarray(segments[channel], dtype=np.float64) for channel in CHANNELS
+                        if channel in segments}
+            for channel, values in segments.items():
+                if values.ndim != 2 or values.shape[1] != 3:
+                    raise ValueError('Segments of channel {0} must be a table of x, y0, y1 rows'.format(channel))
+                if values[0, 0] != 0. or values[-1, 0] != 1.:
+                    raise ValueError('Segments of channel {0} must start with x=0 and end with x=1'.format(channel))
+                if (np.diff(values[:, 0]) < 0).any():
+                    raise ValueError('Segments of channel {0} must have x in increasing order'.format(channel))
+        self._name = name
+        self._N = N
+        self._lut = lut if segments is None else None
+        self._bytes = lut_bytes if segments is None else None
+        self._segments = segments
+        self._extremes = tuple(None if c is None else tuple(float(v) for v in col.to_rgba(c)) for c in extremes)
+        self._mpl = None
+        self._luts = None
+
+    def _set_matplotlib(self, mpl_cm):
+        """
+        Sets the colors of the colormap from a matplotlib colormap object. Segments defined by functions or a
+        gamma different from 1 are sampled at the N colors of the colormap.
+        """
+        extremes = (getattr(mpl_cm, '_rgba_under', None), getattr(mpl_cm, '_rgba_over', None),
+                    getattr(mpl_cm, '_rgba_bad', None))
+        if extremes[2] is not None and tuple(extremes[2]) == (0., 0., 0., 0.):
+            extremes = extremes[:2] + (None,)
+        if isinstance(mpl_cm, col.LinearSegmentedColormap):
+            data = mpl_cm._segmentdata
+            if getattr(mpl_cm, '_gamma', 1.) == 1. and not any(callable(value) for value in data.values()):
+                segments = data
+            else:
+                lut = mpl_cm(np.arange(mpl_cm.N))
+                x = np.linspace(0., 1., mpl_cm.N)
+                segments = {channel: np.c_[x, lut[:, i], lut[:, i]] for i, channel in enumerate(CHANNELS)}
+            self._set_state(mpl_cm.name, segments=segments, N=mpl_cm.N, extremes=extremes)
+        else:
+            self._set_state(mpl_cm.name, lut=mpl_cm(np.arange(mpl_cm.N)), extremes=extremes)
+
+    def _update(self, cmap, inplace):
+        """
+        Replaces the colors of the object by the ones of cmap if inplace is True, else returns cmap
+        """
+        if not inplace:
+            return cmap
+        for slot in self.__slots__:
+            setattr(self, slot, getattr(cmap, slot))
+        return self
+
     @property
     def name(self):
         """
@@ -108,53 +345,76 @@ class ColorMap:
         ---------
         attribute name
         """
-        return self._mpl_cm.name
+        return self._name
+
+    @property
+    def _mpl_cm(self):
+        """
+        Returns the matplotlib colormap object, see to_matplotlib
+        """
+        return self.to_matplotlib()
+
+    @property
+    def gradient(self):
+        """
+        Returns True for a LinearSegmented Colormap and False for a Listed Colormap
+        """
+        return self._segments is not None
 
     @classmethod
     def from_file(cls, filepath, name=None, gradient=True):
         """
-        Function to open colormap objects from .cpt, .ct, .json files
+        Function to open colormap objects from .cpt, .ct, .json and compiled .npy files
 
         Parameters:
         ----------
         filepath: str
             path and filename of the colormap to be opened
         name: str, optional
-            name of the Colormap
+            name of the Colormap, for .npy files containing several colormaps the key of the colormap to be opened
 
         Returns
         ---------
         ColorMap object
         """
 
-        mpl_cm = None
-        extension = os.path.splitext(filepath)[1]
+        extension = os.path.splitext(filepath)[1].lower()
         if '.cpt' == extension:
-            filename, cpt_list, cpt_dict = cptfile2dict(filepath)
+            filename, cpt_list, cpt_dict, cpt_ext = cptfile2dict(filepath, extensions=True)
             name = name if name is not None else filename
             if not gradient:
-                mpl_cm = col.ListedColormap(name=name, colors=cpt_list)
+                return cls._new(name, lut=cpt_list, extremes=_cpt_extremes(cpt_ext))
             else:
-                mpl_cm = col.LinearSegmentedColormap(name=name, segmentdata=cpt_dict)
+                return cls._new(name, segments=cpt_dict, extremes=_cpt_extremes(cpt_ext))
         elif '.ct' == extension:
             filename, gdal_list = ctfile2list(filepath)
             name = name if name is not None else filename
             if not gradient:
-                mpl_cm = col.ListedColormap(name=name, colors=gdal_list)
+                return cls._new(name, lut=gdal_list)
             else:
-                mpl_cm = col.LinearSegmentedColormap.from_list(name=name, colors=gdal_list)
+                return cls._new(name, segments=_list2segments(gdal_list))
         elif '.json' == extension:
             filename, colors, gradient = json2list(filepath)
             name = name if name is not None else filename
-            if not gradient:
-                mpl_cm = col.ListedColormap(colors,  name=name)
+        elif '.npy' == extension:
+            colormaps = npy2dict(filepath)
+            if name in colormaps:
+                key = name
+            elif len(colormaps) == 1:
+                key = next(iter(colormaps))
             else:
-                mpl_cm = col.LinearSegmentedColormap(name=name, segmentdata=colors)
-
+                raise ValueError('File contains several colormaps, select one of {0} with argument name'.format(
+                    sorted(colormaps)))
+            filename, colors, gradient = colormaps[key]
+            name = name if name is not None and name != key else filename
         else:
-            raise ValueError('File extensions is not recognized, supported file extensions are: .cpt, .ct, .json')
+            raise ValueError('File extensions is not recognized, supported file extensions are: .cpt, .ct, .json, '
+                             '.npy')
 
-        return cls(mpl_cm)
+        if not gradient:
+            return cls._new(name, lut=colors)
+        else:
+            return cls._new(name, segments=colors)
 
     @classmethod
     def from_cptfile(cls, filepath, gradient=True):
@@ -170,11 +430,11 @@ class ColorMap:
         -------
         ColorMap object (LinearSegmented Colormap object)
         """
-        name, cpt_list, cpt_dict = cptfile2dict(filepath)
+        name, cpt_list, cpt_dict, cpt_ext = cptfile2dict(filepath, extensions=True)
         if not gradient:
-            return cls.from_list(cpt_list, name=name, gradient=False)
+            return cls._new(name, lut=cpt_list, extremes=_cpt_extremes(cpt_ext))
         else:
-            return cls.from_dict(cpt_dict, name=name)
+            return cls._new(name, segments=cpt_dict, extremes=_cpt_extremes(cpt_ext))
 
 
     @classmethod
@@ -234,12 +494,11 @@ class ColorMap:
         ColorMap object (Listed Colormap object)
 
         """
-        if GDAL_INSTALLED:
-            mpl_arr = [[ct.GetColorEntry[x][0] / 255.0, ct.GetColorEntry[x][1] / 255.0,
-                        ct.GetColorEntry[x][0] / 255.0] for x in ct.GetCount()]
-            return cls.from_list(mpl_arr)
+        gdal = _import_gdal()
+        if gdal is not None:
+            entries = np.array([ct.GetColorEntry(i) for i in range(ct.GetCount())], dtype=np.float64)
+            return cls.from_list(entries.reshape(-1, 4)[:, :3] / 255.)
         else:
-            warnings.warn(gdal_warning)
             return None
 
     @classmethod
@@ -289,8 +548,7 @@ class ColorMap:
         ---------
         ColorMap object (LinearSegmented Colormap object)
         """
-        mpl_cm = col.LinearSegmentedColormap(name=name, segmentdata=cdict)
-        return cls(mpl_cm)
+        return cls._new(name, segments=cdict)
 
     @classmethod
     def from_list(cls, clist, name='default', gradient=False):
@@ -315,62 +573,89 @@ class ColorMap:
         ColorMap object (LinearSegmented or Listed Colormap object)
         """
         if not gradient:
-            mpl_cm = col.ListedColormap(name=name, colors=clist)
+            return cls._new(name, lut=clist)
         else:
-            mpl_cm = col.LinearSegmentedColormap.from_list(name=name, colors=clist)
-        return cls(mpl_cm)
+            return cls._new(name, segments=_list2segments(clist))
 
-    def convert2greyscale(self, weights=1, inplace=True):
+    def convert2greyscale(self, weights=1, inplace=True, gamma=None):
         """
         Return a grayscale version of the given colormap. Luminanance values are calculated using a dot  product of a weight array and the color array of the object
 
         Parameters
         ----------
-        weights: int
+        weights: int or array_like
             weights used to convert RGB values to luminance, default =1
+                1: Rec. 709 luminance (0.2126, 0.7152, 0.0722)
+                2: Rec. 601 luma (0.299, 0.587, 0.114)
+                3: root mean square of the Rec. 601 weighted channels
+            or a 3-vector of weights or a 3x3 matrix mapping RGB to new RGB values
         inplace: bool
             if True the original object is replaced, if False a new ColorMap object is returned
+        gamma: float or str, optional
+            transfer function of the colors, 'srgb' computes the luminance in linear light, see
+            transforms.greyscale, default is the one of the weight option or None
 
         Returns
         -------
         ColorMap object if inpalce = False
 
         """
-        colors = self._mpl_cm(np.arange(self._mpl_cm.N))
+        colors = greyscale(self.lut(), *_greyscale_weights(weights, gamma))
+        cmap = ColorMap._new(self._name + '_grey', segments=_list2segments(colors), N=self._N)
+        return self._update(cmap, inplace)
 
-        if weights == 1:
-            RGB_weights = [0.2126, 0.7152, 0.0722]
-            luminance = np.dot(colors[:, :3], RGB_weights)
-        elif weights == 2:
-            RGB_weights = [0.299, 0.587, 0.114]
-            luminance = np.dot(colors[:, :3], RGB_weights)
-        elif weights == 3:
-            RGB_weights = [0.299, 0.587, 0.114]
-            luminance = np.sqrt(np.dot(colors[:, :3] ** 2, RGB_weights))
-        else:
-            warnings.warn('Argument weight only supports values between 1 and 3')
+    @classmethod
+    def batch_greyscale(cls, cmaps, weights=1, gamma=None, N=256):
+        """
+        Converts many colormaps to greyscale at once. The colormaps are resampled to N colors and transformed as
+        a stack of shape (k, N, 4) in a single vectorized call.
 
-        colors[:, :3] = luminance[:, np.newaxis]
-        mpl_cm = col.LinearSegmentedColormap.from_list(self._mpl_cm.name +'_grey', colors, self._mpl_cm.N)
+        Parameters
+        ----------
+        cmaps: list or dict
+            ColorMap objects, a dict maps keys to ColorMap objects
+        weights: int or array_like
+            weight option (1 - 3), 3-vector or 3x3 matrix, see convert2greyscale
+        gamma: float or str, optional
+            transfer function of the colors, see convert2greyscale
+        N: int, optional
+            number of colors of the greyscale colormaps, default = 256
 
-        if inplace:
-            self._mpl_cm = mpl_cm
-            return self
-        else:
-            return ColorMap(mpl_cm)
+        Returns
+        -------
+        list or dict of ColorMap objects (LinearSegmented Colormap objects)
+        """
+        if N < 2:
+            raise ValueError('Argument N must be at least 2')
+        keys = list(cmaps) if isinstance(cmaps, dict) else None
+        cmap_list = [cmaps[key] for key in keys] if keys is not None else list(cmaps)
+        if not cmap_list:
+            return {} if keys is not None else []
+        stack = np.stack([cmap.lut(N) for cmap in cmap_list])
+        stack = greyscale(stack, *_greyscale_weights(weights, gamma))
+        # x, y0, y1 tables of all colormaps and channels in one array of shape (k, 4, N, 3)
+        segments = np.empty((len(cmap_list), 4, N, 3))
+        segments[..., 0] = np.linspace(0, 1, N)
+        segments[..., 1] = segments[..., 2] = stack.transpose(0, 2, 1)
+        grey = [cls._new(cmap.name + '_grey', segments=dict(zip(CHANNELS, channels)), N=N)
+                for cmap, channels in zip(cmap_list, segments)]
+        return dict(zip(keys, grey)) if keys is not None else grey
 
     def show(self):
         """
         Shows the colormap as a colorbar in a plot
         """
-        colors = self._mpl_cm(np.arange(self._mpl_cm.N))
+        import matplotlib.pyplot as plt
+
+        colors = self.lut()
         plt.imshow([colors], extent=[0, 10, 0, 1])
         plt.axis('off')
         plt.show()
 
     def reverse(self, inplace=True):
         """
-        Reverses a colormap, a.k.a returns the containing colors in reverse direction. Class type remains the same
+        Reverses a colormap, a.k.a returns the containing colors in reverse direction. Class type remains the same.
+        The under and over colors are swapped.
 
         Parameters
         ----------
@@ -379,89 +664,403 @@ class ColorMap:
 
         Returns
         -------
-        ColorMap object if inplace = False
+        matplotlib colormap object of the reversed colormap if inplace = True, ColorMap object if inplace = False
+        """
+        under, over, bad = self._extremes
+        if self._segments is None:
+            cmap = ColorMap._new(self._name + '_reversed', lut=self._lut[::-1], extremes=(over, under, bad),
+                                 lut_bytes=self._bytes[::-1])
+        else:
+            revdict = {key: _reverse_segments(channel) for key, channel in self._segments.items()}
+            cmap = ColorMap._new(self._name + '_reversed', segments=revdict, N=self._N, extremes=(over, under, bad))
+
+        if inplace:
+            return self._update(cmap, inplace).to_matplotlib()
+        return cmap
+
+    def lut(self, n=None, dtype=np.float64):
+        """
+        Returns the colors of the colormap resampled to n colors, the same colors as the lookup table of
+        matplotlib's Colormap.resampled(n). The lookup tables are memoized per (n, dtype) in a small cache,
+        which is cleared by in-place operations (reverse, convert2greyscale, to_gradient).
+
+        Parameters
+        ----------
+        n: int, optional
+            number of colors, default is the number of colors N of the colormap
+        dtype: numpy.dtype, optional
+            a float type for colors between 0 and 1 or numpy.uint8 for colors quantized as in matplotlib
+            (colormap(x, bytes=True)), default = numpy.float64
+
+        Returns
+        -------
+        numpy.ndarray
+            read-only RGBA array of shape (n, 4)
+        """
+        n = self._N if n is None else int(n)
+        dtype = np.dtype(dtype)
+        key = (n, dtype.str)
+        with _LUT_LOCK:
+            if self._luts is None:
+                self._luts = OrderedDict()
+            luts = self._luts
+            if key in luts:
+                luts.move_to_end(key)
+                return luts[key]
+        if n < 1:
+            raise ValueError('Argument n must be at least 1')
+        if dtype != np.uint8 and dtype.kind != 'f':
+            raise ValueError('Argument dtype must be a float type or numpy.uint8')
+
+        if self._segments is None:
+            # Listed Colormaps are resampled by picking colors, as matplotlib's ListedColormap.resampled
+            x = np.linspace(0., 1., n) * self._N
+            x[x == self._N] = self._N - 1
+            indices = np.clip(x, 0, self._N - 1).astype(int)
+            colors = self._bytes if dtype == np.uint8 else self._lut
+            lut = colors[indices].astype(dtype, copy=False)
+        else:
+            lut = _segments2lut(self._segments, n)
+            lut = (lut * 255).astype(np.uint8) if dtype == np.uint8 else lut.astype(dtype, copy=False)
+        lut.flags.writeable = False
+
+        with _LUT_LOCK:
+            # another thread may have computed the same lookup table meanwhile
+            lut = luts.setdefault(key, lut)
+            luts.move_to_end(key)
+            while len(luts) > LUT_CACHE_SIZE:
+                luts.popitem(last=False)
+        return lut
+
+    def _bad(self):
+        """
+        Returns the color of invalid values (NaN), transparent black by default
         """
+        bad = self._extremes[2]
+        return (0., 0., 0., 0.) if bad is None else bad
 
-        if isinstance(self._mpl_cm, col.ListedColormap):
-            mpl_cm = col.ListedColormap(self._mpl_cm.colors[::-1])
+    def _apply_lut(self, alpha=True):
+        """
+        Returns the uint8 lookup table of apply with the bad color and, if set, the under and over colors and
+        whether it is an extended lookup table
+        """
+        under, over, _ = self._extremes
+        lut = build_lut(self.lut(dtype=np.uint8), bad=self._bad(), alpha=alpha, under=under, over=over)
+        return lut, under is not None or over is not None
 
-        elif isinstance(self._mpl_cm, col.LinearSegmentedColormap):
-            reverse = []
-            keys = []
+    def apply(self, data, vmin=None, vmax=None, out=None, alpha=True, nodata=None, mask=None, norm=None,
+              n_threads=1, chunk_size=None):
+        """
+        Maps data to uint8 colors of the colormap. The colors are looked up in a precomputed lookup table,
+        the data is normalized and indexed block by block without creating a full-size float image.
+        Values outside of the data range get the under and over colors if they are set, invalid values the
+        bad color. The result equals matplotlib's colormap(norm(data), bytes=True) with the matplotlib norm of the
+        same name (default Normalize(vmin, vmax)).
 
-            for key in self._mpl_cm._segmentdata:
-                keys.append(key)
-                channel = self._mpl_cm._segmentdata[key]
-                data = []
+        Parameters
+        ----------
+        data: numpy.ndarray or numpy.ma.MaskedArray
+            data array of any shape, the data and mask of a masked array are used without copying
+        vmin, vmax: number, optional
+            data range mapped to the colors, default are the limits of the norm, else the minimum and maximum of
+            the valid data
+        out: numpy.ndarray, optional
+            uint8 array of shape data.shape + (4,) (or (3,) if alpha is False) in which the colors are written
+        alpha: bool, optional
+            if True RGBA colors are returned, if False RGB colors
+        nodata: number, optional
+            value marking invalid data, which is colored like NaN and excluded from the default data range
+        mask: numpy.ndarray, optional
+            boolean array broadcastable to the shape of the data, True marks invalid data colored like NaN
+        norm: norms.Normalize, optional
+            normalization of the data, e.g. norms.LogNorm(), norms.PowerNorm(0.5) or norms.HistogramNorm(),
+            default is the linear normalization between vmin and vmax
+        n_threads: int, optional
+            number of threads colorizing chunks of rows in parallel, if None the number of CPUs is used, default = 1
+        chunk_size: int, optional
+            number of rows (first axis of data) per chunk
 
-                for c in channel:
-                    data.append((1 - c[0], c[2], c[1]))
-                reverse.append(sorted(data))
+        Returns
+        -------
+        numpy.ndarray
+            uint8 array of shape data.shape + (4,) or data.shape + (3,)
+        """
+        lut, extended = self._apply_lut(alpha=alpha)
+        return colorize(data, lut, vmin=vmin, vmax=vmax, out=out, nodata=nodata, mask=mask, extended=extended,
+                        norm=norm, n_threads=n_threads, chunk_size=chunk_size)
 
-            revdict = dict(zip(keys, reverse))
-            mpl_cm = mpl.colors.LinearSegmentedColormap(segmentdata=revdict, name=self._mpl_cm.name + '_reversed')
+    def apply_file(self, src, dst, vmin=None, vmax=None, nodata=None, alpha=True, shape=None, dtype=None,
+                   norm=None, n_threads=1, chunk_size=None):
+        """
+        Maps data larger than memory to uint8 colors of the colormap. The input is read from a memory map and
+        the colors are written to a memory-mapped output chunk by chunk.
 
-        if inplace:
-            self._mpl_cm = mpl_cm
-            return self._mpl_cm
-        else:
-            return ColorMap(mpl_cm)
+        Parameters
+        ----------
+        src: str or numpy.ndarray
+            input data, a numpy.memmap (or array), a .npy file or a raw binary file
+        dst: str or numpy.ndarray
+            output colors, a numpy.memmap (or array) of shape src.shape + (4,) (or (3,) if alpha is False),
+            a .npy file or a raw binary file
+        vmin, vmax: number, optional
+            data range mapped to the colors, default is the minimum and maximum of the valid data
+        nodata: number, optional
+            value marking invalid data, which is colored like NaN and excluded from the default data range
+        alpha: bool, optional
+            if True RGBA colors are written, if False RGB colors
+        shape: tuple, optional
+            shape of a raw binary input file
+        dtype: numpy.dtype, optional
+            data type of a raw binary input file
+        norm: norms.Normalize, optional
+            normalization of the data, scaled on the whole input (a histogram is accumulated chunk by chunk)
+        n_threads: int, optional
+            number of threads colorizing each chunk, default = 1
+        chunk_size: int, optional
+            number of rows (first axis) read and written at once
+
+        Returns
+        -------
+        numpy.memmap or numpy.ndarray
+            the output colors
+        """
+        lut, extended = self._apply_lut(alpha=alpha)
+        return colorize_file(src, dst, lut, vmin=vmin, vmax=vmax, nodata=nodata, shape=shape, dtype=dtype,
+                             extended=extended, norm=norm, n_threads=n_threads, chunk_size=chunk_size)
+
+    def apply_geotiff(self, src, dst, vmin=None, vmax=None, nodata=None, paletted=False, alpha=True, band=1,
+                      block_size=None, creation_options=None):
+        """
+        Colorizes a single band raster window by window and writes a GeoTIFF, memory use is bounded by the
+        window size. Geotransform and projection of the input are kept.
+
+        Parameters
+        ----------
+        src: str
+            filepath of the input raster
+        dst: str
+            filepath of the output GeoTIFF
+        vmin, vmax: number, optional
+            data range mapped to the colors, default is the minimum and maximum of the valid data
+        nodata: number, optional
+            value marking invalid data, default is the nodata value of the band
+        paletted: bool, optional
+            if True a paletted Byte GeoTIFF with a color table of at most 255 colors (253 with under or over
+            color) and a transparent nodata entry is written, if False an RGB(A) GeoTIFF
+        alpha: bool, optional
+            if True RGBA colors are written, if False RGB colors
+        band: int, optional
+            band number of the input raster, default = 1
+        block_size: tuple, optional
+            window size in pixels (x, y), default are strips over the full raster width
+        creation_options: list of str, optional
+            GTiff creation options, default is a tiled, deflate compressed (Big)TIFF
+
+        Returns
+        -------
+        filepath of the output GeoTIFF, None if gdal is not installed
+        """
+        gdal = _import_gdal()
+        if gdal is None:
+            return None
+        under, over, _ = self._extremes
+        extended = under is not None or over is not None
+        colors = self.lut(min(self._N, 253 if extended else 255) if paletted else None, dtype=np.uint8)
+        lut = build_lut(colors, bad=self._bad(), alpha=alpha, under=under, over=over)
+        return colorize_geotiff(gdal, src, dst, lut, paletted=paletted, vmin=vmin, vmax=vmax, nodata=nodata,
+                                band=band, block_size=block_size, creation_options=creation_options,
+                                extended=extended)
+
+    def palette(self, n_colors=None):
+        """
+        Returns the palette of quantize: the colors of the colormap resampled to n_colors, the nodata (bad)
+        color appended at index n_colors and, if the under or over color is set, the under and over colors at
+        the indices n_colors + 1 and n_colors + 2
+
+        Parameters
+        ----------
+        n_colors: int, optional
+            number of colors, default is N
+
+        Returns
+        -------
+        numpy.ndarray
+            uint8 RGBA array of shape (n_colors + 1, 4), (n_colors + 3, 4) with under or over color
+        """
+        under, over, _ = self._extremes
+        return build_lut(self.lut(n_colors, dtype=np.uint8), bad=self._bad(), under=under, over=over)
+
+    def quantize(self, data, vmin=None, vmax=None, nodata=None, dtype=np.uint8, n_colors=None, out=None,
+                 mask=None, norm=None, n_threads=1, chunk_size=None):
+        """
+        Maps data to palette indices instead of RGBA colors, e.g. to write a paletted PNG (png.write_png) or
+        GeoTIFF (see to_gdal). The indices need a quarter (uint8) or half (uint16) of the memory of RGBA colors,
+        palette[indices] equals apply(data) if the palette has the N colors of the colormap. If the under or over
+        color is set, values outside of the data range are mapped to the under and over entries of the palette.
+
+        Parameters
+        ----------
+        data: numpy.ndarray or numpy.ma.MaskedArray
+            data array of any shape, masked values are mapped like NaN to the reserved index n_colors
+        vmin, vmax: number, optional
+            data range mapped to the colors, default is the minimum and maximum of the valid data
+        nodata: number, optional
+            value marking invalid data, which is mapped like NaN to the reserved index n_colors
+        dtype: numpy.dtype, optional
+            numpy.uint8 or numpy.uint16, default = numpy.uint8
+        n_colors: int, optional
+            number of colors of the palette, default is N, for uint8 indices at most 255 (253 with under or over
+            color)
+        out: numpy.ndarray, optional
+            array of shape data.shape and type dtype in which the indices are written
+        mask: numpy.ndarray, optional
+            boolean array broadcastable to the shape of the data, True marks invalid data
+        norm: norms.Normalize, optional
+            normalization of the data, default is the linear normalization between vmin and vmax
+        n_threads: int, optional
+            number of threads processing chunks of rows in parallel, if None the number of CPUs is used, default = 1
+        chunk_size: int, optional
+            number of rows (first axis of data) per chunk
+
+        Returns
+        -------
+        numpy.ndarray
+            palette indices of shape data.shape
+        numpy.ndarray
+            uint8 RGBA palette (see palette), the nodata color is at index n_colors
+        """
+        extended = self._extremes[0] is not None or self._extremes[1] is not None
+        if n_colors is None:
+            n_colors = min(self._N, np.iinfo(dtype).max - (2 if extended else 0))
+        indices = quantize(data, n_colors, vmin=vmin, vmax=vmax, out=out, nodata=nodata, mask=mask, dtype=dtype,
+                           norm=norm, n_threads=n_threads, chunk_size=chunk_size, extended=extended)
+        return indices, self.palette(n_colors)
+
+    def inverse(self, image, vmin=0., vmax=1., norm=None, space='rgb', max_distance=None, n_threads=1,
+                chunk_size=None):
+        """
+        Recovers data values from an image rendered with the colormap, e.g. a PNG quicklook. Every pixel is
+        matched to the nearest color of the colormap, pixels far from all colors are marked as not confident.
+        To invert many images, create an inverse.InverseColorMap once and call it for every image.
+
+        Parameters
+        ----------
+        image: numpy.ndarray
+            uint8 RGB or RGBA image of shape (..., 3) or (..., 4), transparent pixels are invalid
+        vmin, vmax: number, optional
+            data range of the image, default = 0 and 1
+        norm: norms.Normalize, optional
+            scaled norm the image was rendered with, replaces vmin and vmax
+        space: str, optional
+            color space of the distances, 'rgb' or 'lab' (CIELAB), default = 'rgb'
+        max_distance: float, optional
+            maximum distance to the nearest color of confident pixels, default is 8 in RGB (values between 0 and
+            255) and 5 (delta E) in CIELAB
+        n_threads: int, optional
+            number of threads processing chunks of rows in parallel, if None the number of CPUs is used, default = 1
+        chunk_size: int, optional
+            number of rows (first axis of the image) per chunk
+
+        Returns
+        -------
+        numpy.ndarray
+            float64 values of shape image.shape[:-1], NaN for transparent pixels
+        numpy.ndarray
+            boolean confidence mask of shape image.shape[:-1]
+        """
+        inverse = InverseColorMap.from_colormap(self, vmin=vmin, vmax=vmax, norm=norm, space=space)
+        return inverse(image, max_distance=max_distance, n_threads=n_threads, chunk_size=chunk_size)
 
     def to_matplotlib(self):
         """
-        Returns the matplotlib colormap object
+        Returns the matplotlib colormap object. It is created on the first call and reused afterwards, changes
+        made to the matplotlib object are not applied to the ColorMap object.
 
         Returns
         -------
         matplotlib colormap object
 
         """
-        return self._mpl_cm
-
-    def to_dict(self):
+        if self._mpl is None:
+            if self._segments is None:
+                mpl_cm = col.ListedColormap(self._lut.astype(np.float64), name=self._name)
+            else:
+                mpl_cm = col.LinearSegmentedColormap(self._name, dict(self._segments), N=self._N)
+            under, over, bad = self._extremes
+            if under is not None:
+                mpl_cm.set_under(under)
+            if over is not None:
+                mpl_cm.set_over(over)
+            if bad is not None:
+                mpl_cm.set_bad(bad)
+            self._mpl = mpl_cm
+        return self._mpl
+
+    def to_dict(self, as_array=False, copy=True):
         """
         Creates a dictionary of colors from a colormap object
 
+        Parameters
+        ----------
+        as_array: bool, optional
+            if True the values are numpy arrays instead of lists and tuples
+        copy: bool, optional
+            if False (and as_array is True) the arrays are read-only views of the colors of the object
+
         Returns
         -------
         dict object
+            for a Listed Colormap the R, G, B and A values (float32 arrays of shape (N,)), for a LinearSegmented
+            Colormap the x, y0, y1 tuples of every channel (float64 arrays of shape (n, 3))
 
         """
-        if isinstance(self._mpl_cm, col.ListedColormap):
-            col_list = self._mpl_cm._lut
-            red = []
-            green = []
-            blue = []
-            alpha = []
+        if as_array:
+            if self._segments is None:
+                return dict(zip('RGBA', (_array(self._lut[:, i], copy) for i in range(4))))
+            return {key: _array(value, copy) for key, value in self._segments.items()}
 
-            for i in range(len(col_list)):
-                red.append(col_list[i][0])
-                green.append(col_list[i][1])
-                blue.append(col_list[i][2])
-                alpha.append(col_list[i][3])
+        if self._segments is None:
+            red, green, blue, alpha = self._lut.T.tolist()
             col_dct = {'R': red, 'G': green, 'B': blue, 'A': alpha}
             return col_dct
+        else:
+            return {key: tuple(_to_tuples(value)) for key, value in self._segments.items()}
 
-        elif isinstance(self._mpl_cm, col.LinearSegmentedColormap):
-            return self._mpl_cm._segmentdata
-
-    def to_list(self):
+    def to_list(self, as_array=False, copy=True):
         """
         Creates a list of colors from a colormap object
 
+        Parameters
+        ----------
+        as_array: bool, optional
+            if True the colors are returned as numpy arrays instead of lists of tuples
+        copy: bool, optional
+            if False (and as_array is True) the arrays are read-only views of the colors of the object
+
         Returns
         -------
         List object
+            for a Listed Colormap RGB tuples (RGBA tuples if the colormap contains transparent colors), as array of
+            shape (N, 3) or (N, 4), for a LinearSegmented Colormap [channel, segments] pairs
         """
-        if isinstance(self._mpl_cm, col.ListedColormap):
-            return self._mpl_cm.colors
-
-        elif isinstance(self._mpl_cm, col.LinearSegmentedColormap):
+        if self._segments is None:
+            if as_array:
+                return _array(self._listed_colors(), copy)
+            return _to_tuples(self._listed_colors())
+        else:
             dic_list = []
-            for key, value in self._mpl_cm._segmentdata.items():
+            for key, value in self.to_dict(as_array=as_array, copy=copy).items():
                 temp = [key, value]
                 dic_list.append(temp)
-            return  dic_list
+            return dic_list
+
+    def _listed_colors(self):
+        """
+        Returns the colors of a Listed Colormap, RGB if all colors are opaque, else RGBA
+        """
+        if (self._lut[:, 3] == 1).all():
+            return self._lut[:, :3]
+        return self._lut
 
     def to_gradient(self, inplace=True):
         """
@@ -478,52 +1077,55 @@ class ColorMap:
         -------
         ColorMap object is inplace = False
         """
-        if isinstance(self._mpl_cm, col.LinearSegmentedColormap):
+        if self._segments is not None:
             warnings.warn("Colormap is already a Segmented Colormap. Listed Colormap required")
             return self
         else:
-            mpl_cm = col.LinearSegmentedColormap.from_list(name=self._mpl_cm.name+'_gradient', colors=self._mpl_cm.colors)
+            cmap = ColorMap._new(self._name + '_gradient', segments=_list2segments(self._lut),
+                                 extremes=self._extremes)
 
-        if inplace:
-            self._mpl_cm = mpl_cm
-            return self
-        else:
-            return ColorMap(mpl_cm)
+        return self._update(cmap, inplace)
 
-    def to_gdal(self, accelerate=1):
+    def to_gdal(self, accelerate=1, n_colors=None):
         """
         Converts a ColorMap object to a gdal colortable object
 
         Parameters
         ----------
         accelerate: int
-            scale factor applied to Colors
+            stride applied to the colors, every accelerate-th color is used
+        n_colors: int, optional
+            if given, the color table is the palette of quantize(..., n_colors=n_colors): n_colors colors, the
+            nodata color at index n_colors and the under and over colors if set, accelerate is ignored
 
         Returns
         -------
         Gdal color table object
         """
-        if GDAL_INSTALLED:
-            gdal_ct = gdal.ColorTable()
-            if isinstance(self._mpl_cm, col.ListedColormap):
-                mpl_ct = self._mpl_cm.colors
-
-                for i in range(0, len(mpl_ct), accelerate):
-                    gdal_ct.SetColorEntry(int(i / accelerate), tuple(np.rint(np.multiply(mpl_ct[i], 256)).astype(np.byte)) + (0,))
-                for i in range(256 // accelerate, 256):
-                    gdal_ct.SetColorEntry(i, tuple((255, 255, 255)) + (0,))
-            elif isinstance(self._mpl_cm, col.LinearSegmentedColormap):
-                mpl_ct = (self._mpl_cm(np.linspace(0., 1., 255))[:, :3] * 255).astype(int)
-                for i in range(0, mpl_ct.shape[0], accelerate):
-                    gdal_ct.SetColorEntry(int(i / accelerate),
-                                          tuple(np.rint(np.multiply(mpl_ct[i], 256)).astype(np.byte)) + (0,))
-                for i in range(256 // accelerate, 256):
-                    gdal_ct.SetColorEntry(i, tuple((255, 255, 255)) + (0,))
-            return gdal_ct
+        gdal = _import_gdal()
+        if gdal is not None:
+            if n_colors is not None:
+                return lut2colortable(gdal, self.palette(n_colors))
+            return lut2colortable(gdal, self._gdal_colors(accelerate))
         else:
-            warnings.warn(gdal_warning)
             return None
 
+    def _gdal_colors(self, accelerate=1):
+        """
+        Returns the entries of the gdal color table as uint8 RGBA array. Listed Colormaps use their colors,
+        LinearSegmented Colormaps are sampled at 255 colors. Every accelerate-th color is used, the remaining
+        entries up to 256 are filled with transparent white.
+        """
+        if int(accelerate) != accelerate or accelerate < 1:
+            raise ValueError('Argument accelerate must be a positive integer')
+        colors = self.lut(None if self._segments is None else 255)
+        colors = colors[::int(accelerate)]
+
+        entries = np.empty((max(256, colors.shape[0]), 4), dtype=np.uint8)
+        entries[:] = (255, 255, 255, 0)
+        entries[:colors.shape[0]] = np.rint(np.clip(colors, 0., 1.) * 255)
+        return entries
+
     def save_as_cpt(self, outpath=None, **kwargs):
         """
         Saves a acolormap.object as a .cpt file
@@ -532,25 +1134,28 @@ class ColorMap:
         ----------
         outname: str, optional
             outname for the file
-        keyword arguments: int
-            Vmin, Vmax, N (Number of colorsteps)
+        keyword arguments: tuple
+            B, F, N colors (RGB values between 0 and 1) of values below and above the range and of NaN values,
+            default are the under, over and bad colors of the colormap, else the first and last color and black
         """
         if outpath is None:
-            outpath = os.path.join(self.dirpath, self._mpl_cm.name+'.cpt')
+            outpath = os.path.join(self.dirpath, self._name+'.cpt')
 
         vmin=0
         vmax=1
         N=255
         #create string for upper, lower colors
-        b = np.array(kwargs.get("B", self._mpl_cm(0.)))
-        f = np.array(kwargs.get("F", self._mpl_cm(1.)))
-        na = np.array(kwargs.get("N", (0, 0, 0))).astype(float)
+        lut = self.lut()
+        under, over, bad = self._extremes
+        b = np.array(kwargs.get("B", lut[0] if under is None else under))
+        f = np.array(kwargs.get("F", lut[-1] if over is None else over))
+        na = np.array(kwargs.get("N", (0, 0, 0) if bad is None else bad)).astype(float)
         ext = (np.c_[b[:3], f[:3], na[:3]].T * 255).astype(int)
         # Creating footer
         extstr = "B {:3d} {:3d} {:3d}\nF {:3d} {:3d} {:3d}\nN {:3d} {:3d} {:3d}"
         footer = extstr.format(*list(ext.flatten()))
         # create colormap
-        colors = (self._mpl_cm(np.linspace(0., 1., N))[:, :3] * 255).astype(int)
+        colors = (self.lut(N)[:, :3] * 255).astype(int)
         vals = np.linspace(vmin, vmax, N)
         col_arr = np.c_[vals[:-1], colors[:-1], vals[1:], colors[1:]]
 
@@ -560,7 +1165,7 @@ class ColorMap:
                    header="# COLOR_MODEL = RGB",
                    footer=footer, comments="")
 
-    def save_as_ct(self, outpath=None):
+    def save_as_ct(self, outpath=None, N=None):
         """
         Saves a colormap.object as a gdal .ct file
 
@@ -568,23 +1173,19 @@ class ColorMap:
         ----------
         outname: str, optional
             outname for the file
+        N: int, optional
+            number of colors, default are the colors of a Listed Colormap or 255 colors sampled from a
+            LinearSegmented Colormap
         """
         if outpath is None:
-            outpath = os.path.join(self.dirpath, self._mpl_cm.name+'.cpt')
-
-        arr = np.zeros((255, 3), dtype=int)
+            outpath = os.path.join(self.dirpath, self._name+'.ct')
 
-        if isinstance(self._mpl_cm, col.ListedColormap):
-            for i in range(len(self._mpl_cm.colors)):
-                arr[i, :] = [int(self._mpl_cm.colors[i][0] * 255), int(self._mpl_cm.colors[i][1] * 255),
-                                          int(self._mpl_cm.colors[i][2] * 255)]
-        elif isinstance(self._mpl_cm, col.LinearSegmentedColormap):
-            colors = (self._mpl_cm(np.linspace(0., 1., 255))[:, :3] * 255).astype(int)
-            for i in range(len(colors)):
-                arr[i, :] = [int(colors[i][0]), int(colors[i][1]), int(colors[i][2])]
+        if N is None and self._segments is None:
+            colors = self.lut()
+        else:
+            colors = self.lut(255 if N is None else N)
 
-        fmt = "%3d %3d %3d"
-        np.savetxt(outpath, arr, fmt=fmt)
+        array2ctfile(np.rint(colors[:, :3] * 255).astype(np.uint8), outpath)
 
     def save_as_json(self, outpath=None):
         """
@@ -596,20 +1197,16 @@ class ColorMap:
             outname for the file
         """
         if outpath is None:
-            outpath = os.path.join(self.dirpath, self._mpl_cm.name+'.json')
+            outpath = os.path.join(self.dirpath, self._name+'.json')
 
         cmap_dict = {}
         cmap_dict["ColorSpace"] = "RGB"
-        cmap_dict['Name'] = self._mpl_cm.name
-        rgb_points = []
-        if isinstance(self._mpl_cm, col.ListedColormap):
-            for i in range(len(self._mpl_cm.colors)):
-                rgb_points.append((self._mpl_cm.colors[i][0], self._mpl_cm.colors[i][1],
-                                          self._mpl_cm.colors[i][2]))
+        cmap_dict['Name'] = self._name
+        if self._segments is None:
+            rgb_points = self._lut[:, :3].tolist()
             cmap_dict["Type"] = "Listed"
-        elif isinstance(self._mpl_cm, col.LinearSegmentedColormap):
-            segmnetdata = self._mpl_cm._segmentdata
-            rgb_points = [segmnetdata]
+        else:
+            rgb_points = [{key: value.tolist() for key, value in self._segments.items()}]
             cmap_dict["Type"] = "Segmented"
         cmap_dict['RGBPoints'] = rgb_points
         cmap_list = []
@@ -618,25 +1215,44 @@ class ColorMap:
         with open(outpath, 'w') as file:
             file.write(json.dumps(cmap_list))
 
+    def save_as_npy(self, outpath=None):
+        """
+        Saves a colormap.object as a compiled .npy file, which can be memory mapped when it is opened again
+
+        Parameters
+        ----------
+        outname: str, optional
+            outname for the file, an .idx file containing the layout is written next to it
+        """
+        if outpath is None:
+            outpath = os.path.join(self.dirpath, self._name+'.npy')
+
+        key = os.path.splitext(os.path.basename(outpath))[0]
+        if self._segments is None:
+            colormap = (self._name, self._lut, False)
+        else:
+            colormap = (self._name, self._segments, True)
+        dict2npy({key: colormap}, outpath)
+
     def __len__(self):
         """
         Returns number of colors in the colormap
         - for Segmented Colormap: Number of Segments
         - for Listed Colormap: total number of colors
         """
-        if isinstance(self._mpl_cm, col.LinearSegmentedColormap):
-            return len(self._mpl_cm._segmentdata.get('red'))
-        elif isinstance(self._mpl_cm, col.ListedColormap):
-            return self._mpl_cm.N
+        if self._segments is not None:
+            return len(self._segments['red'])
+        else:
+            return self._N
 
     def __getitem__(self, item):
         """
         Returns the xth color of the colormap
         """
-        if isinstance(self._mpl_cm, col.LinearSegmentedColormap):
-            return {'red':self._mpl_cm._segmentdata.get('red')[item], 'green':self._mpl_cm._segmentdata.get('green')[item], 'blue': self._mpl_cm._segmentdata.get('blue')[item], 'alpha': self._mpl_cm._segmentdata.get('alpha')[item]}
-        elif isinstance(self._mpl_cm, col.ListedColormap):
-            return self._mpl_cm.colors[item]
+        if self._segments is not None:
+            return {key: _to_tuples(value[item]) for key, value in self._segments.items()}
+        else:
+            return _to_tuples(self._listed_colors()[item])
 
     def __str__(self):
         """
@@ -644,7 +1260,201 @@ class ColorMap:
         - for Segmented Colormap: Start and end color
         - for a Listed Colormap: all colors
         """
-        if isinstance(self._mpl_cm, col.LinearSegmentedColormap):
-            return str(self._mpl_cm._segmentdata.values())
-        elif isinstance(self._mpl_cm, col.ListedColormap):
-            return str(self._mpl_cm.colors[0]+self._mpl_cm.colors[-1])
\ No newline at end of file
+        if self._segments is not None:
+            return str(self.to_dict().values())
+        else:
+            return str(self[0] + self[-1])
+
+
+class ClassifiedColorMap:
+    """classified colormap assigning one color to every class of values between two boundaries
+        """
+
+    __slots__ = ('_cmap', '_boundaries', '_lut')
+
+    def __init__(self, colors, boundaries, name='default', under=None, over=None, bad=None):
+        """
+        Constructor of the classified colormap class.
+
+        Parameters
+        ----------
+        colors : list
+            K colors of the classes, given as RGB(A) tuples
+        boundaries : array_like
+            K + 1 increasing class boundaries, class i contains the values in [boundaries[i], boundaries[i + 1])
+        name : str, optional
+            name of the colormap
+        under, over : tuple, optional
+            colors of values below the first boundary and at or above the last boundary, default are the colors
+            of the first and the last class
+        bad : tuple, optional
+            color of NaN and nodata values, default is transparent black
+        """
+        boundaries = np.array(boundaries, dtype=np.float64)
+        if boundaries.ndim != 1 or boundaries.shape[0] != len(colors) + 1:
+            raise ValueError('Number of boundaries must be the number of colors + 1')
+        if (np.diff(boundaries) <= 0).any():
+            raise ValueError('Boundaries must be strictly increasing')
+        boundaries.flags.writeable = False
+        self._cmap = ColorMap._new(name, lut=colors, extremes=(under, over, bad))
+        self._boundaries = boundaries
+        self._lut = None
+
+    @classmethod
+    def from_colormap(cls, cmap, boundaries, name=None):
+        """
+        Creates a classified colormap with colors sampled evenly from a colormap
+
+        Parameters
+        ----------
+        cmap: ColorMap
+            colormap from which the class colors are taken, its under, over and bad colors are kept
+        boundaries: array_like
+            K + 1 increasing class boundaries
+        name: str, optional
+            name of the colormap, default is the name of cmap
+
+        Returns
+        -------
+        ClassifiedColorMap object
+        """
+        under, over, bad = cmap._extremes
+        return cls(cmap.lut(len(boundaries) - 1), boundaries, name=cmap.name if name is None else name,
+                   under=under, over=over, bad=bad)
+
+    @classmethod
+    def from_jsonfile(cls, filepath):
+        """
+        Creates a classified colormap from a .json file written by save_as_json
+
+        Parameters
+        ----------
+        filepath: str
+            absolute filepath including filename and extension of the json file
+
+        Returns
+        -------
+        ClassifiedColorMap object
+        """
+        name, colors, boundaries, extremes = json2classified(filepath)
+        return cls(colors, boundaries, name=name, **extremes)
+
+    @property
+    def name(self):
+        """
+        Returns attribute name
+        """
+        return self._cmap.name
+
+    @property
+    def boundaries(self):
+        """
+        Returns the (read-only) class boundaries
+        """
+        return self._boundaries
+
+    @property
+    def colormap(self):
+        """
+        Returns the class colors as Listed ColorMap object
+        """
+        return self._cmap
+
+    def lut(self, alpha=True):
+        """
+        Returns the uint8 lookup table of the classes: under color, the K class colors, over color and the color
+        of NaN and nodata values. The colors are quantized as in matplotlib.
+
+        Parameters
+        ----------
+        alpha: bool, optional
+            if True the lookup table contains RGBA colors, if False RGB colors
+
+        Returns
+        -------
+        numpy.ndarray
+            read-only array of shape (K + 3, 4) or (K + 3, 3)
+        """
+        if self._lut is None:
+            colors = self._cmap.lut(dtype=np.uint8)
+            under, over, bad = self._cmap._extremes
+            lut = np.empty((colors.shape[0] + 3, 4), dtype=np.uint8)
+            lut[1:-2] = colors
+            lut[0] = colors[0] if under is None else (np.array(under) * 255).astype(np.uint8)
+            lut[-2] = colors[-1] if over is None else (np.array(over) * 255).astype(np.uint8)
+            lut[-1] = (np.array(self._cmap._bad()) * 255).astype(np.uint8)
+            lut.flags.writeable = False
+            self._lut = lut
+        return self._lut if alpha else self._lut[:, :3]
+
+    def apply(self, data, out=None, alpha=True, nodata=None, mask=None, n_threads=1, chunk_size=None):
+        """
+        Maps data to the uint8 colors of their classes. The classes are found with np.searchsorted on the
+        boundaries, block by block without creating a full-size float image. The result equals
+        matplotlib's colormap(BoundaryNorm(boundaries, K)(data), bytes=True).
+
+        Parameters
+        ----------
+        data: numpy.ndarray or numpy.ma.MaskedArray
+            data array of any shape, the data and mask of a masked array are used without copying
+        out: numpy.ndarray, optional
+            uint8 array of shape data.shape + (4,) (or (3,) if alpha is False) in which the colors are written
+        alpha: bool, optional
+            if True RGBA colors are returned, if False RGB colors
+        nodata: number, optional
+            value marking invalid data, which is colored like NaN
+        mask: numpy.ndarray, optional
+            boolean array broadcastable to the shape of the data, True marks invalid data colored like NaN
+        n_threads: int, optional
+            number of threads colorizing chunks of rows in parallel, if None the number of CPUs is used, default = 1
+        chunk_size: int, optional
+            number of rows (first axis of data) per chunk
+
+        Returns
+        -------
+        numpy.ndarray
+            uint8 array of shape data.shape + (4,) or data.shape + (3,)
+        """
+        return classify(data, self._boundaries, self.lut(alpha=alpha), out=out, nodata=nodata, mask=mask,
+                        n_threads=n_threads, chunk_size=chunk_size)
+
+    def to_matplotlib(self):
+        """
+        Returns the matplotlib colormap object and the matching BoundaryNorm
+
+        Returns
+        -------
+        matplotlib ListedColormap, matplotlib BoundaryNorm
+        """
+        return self._cmap.to_matplotlib(), col.BoundaryNorm(self._boundaries, len(self))
+
+    def save_as_json(self, outpath=None):
+        """
+        Saves the classified colormap as .json file with class colors, boundaries and under, over and bad colors
+
+        Parameters
+        ----------
+        outpath: str, optional
+            outname for the file, default is the name of the colormap in the current directory
+        """
+        if outpath is None:
+            outpath = self.name + '.json'
+
+        cmap_dict = {}
+        cmap_dict["ColorSpace"] = "RGB"
+        cmap_dict['Name'] = self.name
+        cmap_dict["Type"] = "Classified"
+        cmap_dict['RGBPoints'] = self._cmap.to_list()
+        cmap_dict['Boundaries'] = self._boundaries.tolist()
+        for key, color in zip(('Under', 'Over', 'Bad'), self._cmap._extremes):
+            if color is not None:
+                cmap_dict[key] = list(color)
+
+        with open(outpath, 'w') as file:
+            file.write(json.dumps([cmap_dict]))
+
+    def __len__(self):
+        """
+        Returns the number of classes
+        """
+        return self._boundaries.shape[0] - 1
@@ -0,0 +1,390 @@
+'''
+Vectorized conversions between color spaces operating on arrays of colors.
+
+Supported color spaces:
+- 'srgb': sRGB encoded values between 0 and 1
+- 'linear': linear light sRGB values between 0 and 1
+- 'xyz': CIE XYZ tristimulus values (D65 white point, Y = 1 for white)
+- 'lab': CIELAB (D65 white point)
+- 'cam02ucs': CAM02-UCS (J', a', b'), the uniform color space of CIECAM02 (Luo et al. 2006) under the
+  viewing conditions of sRGB (as colorspacious and viscm)
+
+All functions accept colors of any shape (..., 3), e.g. the (N, 3) lookup table of a colormap or an
+(H, W, 3) image, without loops over the colors. An alpha channel (..., 4) is ignored by the conversions
+of three channels. float32 colors are converted in float32, all other colors in float64.
+
+'''
+import numpy as np
+
+SPACES = ('srgb', 'linear', 'xyz', 'lab', 'cam02ucs')
+
+# linear sRGB to CIE XYZ (D65) and the D65 white point
+SRGB2XYZ = np.array([[0.4124564, 0.3575761, 0.1804375],
+                     [0.2126729, 0.7151522, 0.0721750],
+                     [0.0193339, 0.1191920, 0.9503041]])
+XYZ2SRGB = np.linalg.inv(SRGB2XYZ)
+WHITE_D65 = (0.95047, 1., 1.08883)
+
+# CIECAM02 chromatic adaptation and Hunt-Pointer-Estevez matrices
+M_CAT02 = np.array([[0.7328, 0.4296, -0.1624],
+                    [-0.7036, 1.6975, 0.0061],
+                    [0.0030, 0.0136, 0.9834]])
+M_HPE = np.array([[0.38971, 0.68898, -0.07868],
+                  [-0.22981, 1.18340, 0.04641],
+                  [0.00000, 0.00000, 1.00000]])
+M_CAT02_INV = np.linalg.inv(M_CAT02)
+M_HPE_CAT02_INV = M_HPE @ M_CAT02_INV
+M_CAT02_HPE_INV = M_CAT02 @ np.linalg.inv(M_HPE)
+# post-adaptation signals (p2, a, b) to the responses of the cones R'a, G'a, B'a
+M_P2AB = np.array([[460., 451., 288.],
+                   [460., -891., -261.],
+                   [460., -220., -6300.]]) / 1403.
+
+
+def _viewing_conditions(white=WHITE_D65, y_b=20., l_a=64. / np.pi / 5., f=1., c=0.69, n_c=1.):
+    """
+    Returns the parameters of CIECAM02 for viewing conditions, default are the conditions of sRGB: D65
+    white point, background luminance 20, adapting luminance of 64 lux and an average surround
+    """
+    white = np.asarray(white, dtype=np.float64) * 100.
+    rgb_w = M_CAT02 @ white
+    d = np.clip(f * (1. - (1. / 3.6) * np.exp((-l_a - 42.) / 92.)), 0., 1.)
+    k = 1. / (5. * l_a + 1.)
+    f_l = 0.2 * k ** 4 * (5. * l_a) + 0.1 * (1. - k ** 4) ** 2 * (5. * l_a) ** (1. / 3.)
+    n = y_b / white[1]
+    n_bb = 0.725 * (1. / n) ** 0.2
+    vc = {'d_rgb': d * white[1] / rgb_w + 1. - d, 'f_l': f_l, 'n': n, 'z': 1.48 + np.sqrt(n),
+          'n_bb': n_bb, 'c': c, 'n_c': n_c}
+    rgb_aw = _compress(M_HPE_CAT02_INV @ (vc['d_rgb'] * rgb_w), f_l)
+    vc['a_w'] = (np.dot([2., 1., 1. / 20.], rgb_aw) - 0.305) * n_bb
+    return vc
+
+
+def _compress(rgb, f_l):
+    """
+    Returns the post-adaptation cone responses of CIECAM02 (nonlinear compression)
+    """
+    tmp = (f_l * np.abs(rgb) / 100.) ** 0.42
+    return np.sign(rgb) * 400. * tmp / (tmp + 27.13) + 0.1
+
+
+def _expand(rgb_a, f_l):
+    """
+    Returns the cone responses of post-adaptation cone responses, the inverse of _compress
+    """
+    x = np.abs(rgb_a - 0.1)
+    return np.sign(rgb_a - 0.1) * (100. / f_l) * (27.13 * x / (400. - x)) ** (1. / 0.42)
+
+
+SRGB_VIEWING = _viewing_conditions()
+# coefficients of CAM02-UCS
+CAM02UCS = {'k_l': 1., 'c1': 0.007, 'c2': 0.0228}
+
+
+def _float(colors):
+    """
+    Returns colors as float32 array if they are float32, else as float64 array
+    """
+    colors = np.asarray(colors)
+    return colors.astype(np.float32 if colors.dtype == np.float32 else np.float64, copy=False)
+
+
+def _matmul(colors, matrix):
+    """
+    Multiplies the color vectors of shape (..., 3) with a matrix in the precision of the colors
+    """
+    return colors @ matrix.T.astype(colors.dtype)
+
+
+def srgb2linear(colors):
+    """
+    Converts sRGB encoded color values to linear light
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        sRGB values between 0 and 1
+
+    Returns
+    -------
+    numpy.ndarray
+        linear values between 0 and 1
+    """
+    colors = _float(colors)
+    return np.where(colors <= 0.04045, colors / 12.92, ((colors + 0.055) / 1.055) ** 2.4).astype(colors.dtype)
+
+
+def linear2srgb(colors):
+    """
+    Converts linear light color values to sRGB encoded values, values outside of [0, 1] are clipped
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        linear values between 0 and 1
+
+    Returns
+    -------
+    numpy.ndarray
+        sRGB values between 0 and 1
+    """
+    colors = np.clip(_float(colors), 0., 1.)
+    return np.where(colors <= 0.0031308, colors * 12.92, 1.055 * colors ** (1 / 2.4) - 0.055).astype(colors.dtype)
+
+
+def linear2xyz(colors):
+    """
+    Converts linear light sRGB colors to CIE XYZ
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        linear sRGB values of shape (..., 3)
+
+    Returns
+    -------
+    numpy.ndarray
+        X, Y and Z values of shape (..., 3)
+    """
+    return _matmul(_float(colors)[..., :3], SRGB2XYZ)
+
+
+def xyz2linear(colors):
+    """
+    Converts CIE XYZ colors to linear light sRGB, colors outside of the sRGB gamut are not clipped
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        X, Y and Z values of shape (..., 3)
+
+    Returns
+    -------
+    numpy.ndarray
+        linear sRGB values of shape (..., 3)
+    """
+    return _matmul(_float(colors)[..., :3], XYZ2SRGB)
+
+
+def xyz2lab(colors):
+    """
+    Converts CIE XYZ colors to CIELAB
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        X, Y and Z values of shape (..., 3)
+
+    Returns
+    -------
+    numpy.ndarray
+        L*, a* and b* values of shape (..., 3)
+    """
+    xyz = _float(colors)[..., :3]
+    xyz = xyz / np.asarray(WHITE_D65, dtype=xyz.dtype)
+    delta = 6. / 29.
+    f = np.where(xyz > delta ** 3, np.cbrt(xyz), xyz / (3 * delta ** 2) + 4. / 29.).astype(xyz.dtype)
+    return np.stack((116. * f[..., 1] - 16., 500. * (f[..., 0] - f[..., 1]), 200. * (f[..., 1] - f[..., 2])),
+                    axis=-1)
+
+
+def lab2xyz(colors):
+    """
+    Converts CIELAB colors to CIE XYZ
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        L*, a* and b* values of shape (..., 3)
+
+    Returns
+    -------
+    numpy.ndarray
+        X, Y and Z values of shape (..., 3)
+    """
+    lab = _float(colors)
+    f_y = (lab[..., 0] + 16.) / 116.
+    f = np.stack((f_y + lab[..., 1] / 500., f_y, f_y - lab[..., 2] / 200.), axis=-1)
+    delta = 6. / 29.
+    xyz = np.where(f > delta, f ** 3, 3 * delta ** 2 * (f - 4. / 29.)).astype(lab.dtype)
+    return xyz * np.asarray(WHITE_D65, dtype=lab.dtype)
+
+
+def xyz2cam02ucs(colors):
+    """
+    Converts CIE XYZ colors to CAM02-UCS under the viewing conditions of sRGB. Colors with a negative
+    achromatic signal (far outside of the sRGB gamut) are mapped to J' = 0.
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        X, Y and Z values of shape (..., 3)
+
+    Returns
+    -------
+    numpy.ndarray
+        J', a' and b' values of shape (..., 3)
+    """
+    xyz = _float(colors)[..., :3]
+    dtype = xyz.dtype
+    vc = SRGB_VIEWING
+    # chromatic adaptation and cone responses
+    rgb = _matmul(xyz * dtype.type(100.), M_CAT02) * vc['d_rgb'].astype(dtype)
+    rgb_a = _compress(_matmul(rgb, M_HPE_CAT02_INV), vc['f_l']).astype(dtype)
+    a = rgb_a[..., 0] - 12. / 11. * rgb_a[..., 1] + rgb_a[..., 2] / 11.
+    b = (rgb_a[..., 0] + rgb_a[..., 1] - 2. * rgb_a[..., 2]) / 9.
+    h = np.arctan2(b, a)
+    # lightness J and colorfulness M
+    achromatic = np.maximum((2. * rgb_a[..., 0] + rgb_a[..., 1] + rgb_a[..., 2] / 20. - 0.305) * vc['n_bb'], 0.)
+    j = 100. * (achromatic / vc['a_w']) ** (vc['c'] * vc['z'])
+    e_t = 12500. / 13. * vc['n_c'] * vc['n_bb'] * (np.cos(h + 2.) + 3.8)
+    t = e_t * np.hypot(a, b) / (rgb_a[..., 0] + rgb_a[..., 1] + 21. / 20. * rgb_a[..., 2])
+    m = t ** 0.9 * np.sqrt(j / 100.) * (1.64 - 0.29 ** vc['n']) ** 0.73 * vc['f_l'] ** 0.25
+    # uniform color space
+    c1, c2 = CAM02UCS['c1'], CAM02UCS['c2']
+    m_ucs = np.log1p(c2 * m) / c2
+    return np.stack(((1. + 100. * c1) * j / (1. + c1 * j) / CAM02UCS['k_l'], m_ucs * np.cos(h),
+                     m_ucs * np.sin(h)), axis=-1).astype(dtype)
+
+
+def cam02ucs2xyz(colors):
+    """
+    Converts CAM02-UCS colors to CIE XYZ under the viewing conditions of sRGB
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        J', a' and b' values of shape (..., 3)
+
+    Returns
+    -------
+    numpy.ndarray
+        X, Y and Z values of shape (..., 3)
+    """
+    jab = _float(colors)
+    dtype = jab.dtype
+    vc = SRGB_VIEWING
+    c1, c2 = CAM02UCS['c1'], CAM02UCS['c2']
+    j_ucs = jab[..., 0] * CAM02UCS['k_l']
+    j = -j_ucs / (c1 * j_ucs - 100. * c1 - 1.)
+    m = np.expm1(c2 * np.hypot(jab[..., 1], jab[..., 2])) / c2
+    h = np.arctan2(jab[..., 2], jab[..., 1])
+    # CIECAM02 correlates J, M, h to the post-adaptation cone responses
+    chroma = m / vc['f_l'] ** 0.25
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.nan_to_num((chroma / (np.sqrt(j / 100.) * (1.64 - 0.29 ** vc['n']) ** 0.73)) ** (1. / 0.9))
+    p_1 = 50000. / 13. * vc['n_c'] * vc['n_bb'] * 0.25 * (np.cos(h + 2.) + 3.8)
+    p_2 = vc['a_w'] * (j / 100.) ** (1. / (vc['c'] * vc['z'])) / vc['n_bb'] + 0.305
+    cos_h, sin_h = np.cos(h), np.sin(h)
+    gamma = 23. * p_2 * t / (23. * p_1 + 11. * t * cos_h + 108. * t * sin_h)
+    rgb_a = _matmul(np.stack((p_2, gamma * cos_h, gamma * sin_h), axis=-1), M_P2AB)
+    # inverse adaptation
+    rgb = _expand(rgb_a, vc['f_l']).astype(dtype)
+    rgb = _matmul(rgb, M_CAT02_HPE_INV) / vc['d_rgb'].astype(dtype)
+    return _matmul(rgb, M_CAT02_INV) / dtype.type(100.)
+
+
+# conversions to and from XYZ, the hub of convert
+_TO_XYZ = {'srgb': (srgb2linear, linear2xyz), 'linear': (linear2xyz,), 'xyz': (), 'lab': (lab2xyz,),
+           'cam02ucs': (cam02ucs2xyz,)}
+_FROM_XYZ = {'srgb': (xyz2linear, linear2srgb), 'linear': (xyz2linear,), 'xyz': (), 'lab': (xyz2lab,),
+             'cam02ucs': (xyz2cam02ucs,)}
+
+
+def convert(colors, src, dst):
+    """
+    Converts colors between two color spaces
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        colors of shape (..., 3), an alpha channel is ignored
+    src, dst: str
+        color spaces of the colors and of the result: 'srgb', 'linear', 'xyz', 'lab' or 'cam02ucs'
+
+    Returns
+    -------
+    numpy.ndarray
+        converted colors of shape (..., 3)
+    """
+    for space in (src, dst):
+        if space not in SPACES:
+            raise ValueError('Unknown color space {0}, use one of {1}'.format(space, ', '.join(SPACES)))
+    colors = _float(colors)[..., :3]
+    if src == dst:
+        return colors.copy()
+    if (src, dst) == ('srgb', 'linear'):
+        return srgb2linear(colors)
+    if (src, dst) == ('linear', 'srgb'):
+        return linear2srgb(colors)
+    for func in _TO_XYZ[src] + _FROM_XYZ[dst]:
+        colors = func(colors)
+    return colors
+
+
+def srgb2lab(colors):
+    """
+    Converts sRGB colors to CIELAB
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        sRGB values between 0 and 1 of shape (..., 3), an alpha channel is ignored
+
+    Returns
+    -------
+    numpy.ndarray
+        L*, a* and b* values of shape (..., 3)
+    """
+    return convert(colors, 'srgb', 'lab')
+
+
+def lab2srgb(colors):
+    """
+    Converts CIELAB colors to sRGB, colors outside of the sRGB gamut are clipped
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        L*, a* and b* values of shape (..., 3)
+
+    Returns
+    -------
+    numpy.ndarray
+        sRGB values between 0 and 1 of shape (..., 3)
+    """
+    return convert(colors, 'lab', 'srgb')
+
+
+def srgb2cam02ucs(colors):
+    """
+    Converts sRGB colors to CAM02-UCS
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        sRGB values between 0 and 1 of shape (..., 3), an alpha channel is ignored
+
+    Returns
+    -------
+    numpy.ndarray
+        J', a' and b' values of shape (..., 3)
+    """
+    return convert(colors, 'srgb', 'cam02ucs')
+
+
+def cam02ucs2srgb(colors):
+    """
+    Converts CAM02-UCS colors to sRGB, colors outside of the sRGB gamut are clipped
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        J', a' and b' values of shape (..., 3)
+
+    Returns
+    -------
+    numpy.ndarray
+        sRGB values between 0 and 1 of shape (..., 3)
+    """
+    return convert(colors, 'cam02ucs', 'srgb')
@@ -1,11 +1,45 @@
 import numpy as np
-import colorsys
 import os
 import json
+import argparse
+import re
 
-def cptfile2dict(filepath):
+CPT_HSV = re.compile(r"\s*#.*COLOR_MODEL\s*=\s*\+?HSV", re.IGNORECASE)
+CPT_EXTENSIONS = ("B", "F", "N")
+
+
+def hsv2rgb(h, s, v):
+    """
+    Converts HSV colors to RGB colors
+
+    Parameters
+    ----------
+    h: numpy.ndarray
+        hue in degrees
+    s, v: numpy.ndarray
+        saturation and value between 0 and 1
+
+    Returns
+    -------
+    numpy.ndarray
+        RGB colors between 0 and 1, of shape h.shape + (3,)
     """
-    Extracts a color dictionary and list for a colormap object from a .cpt file
+    h = np.mod(np.asarray(h, dtype=np.float64) / 60., 6.)
+    s = np.asarray(s, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    sector = np.floor(h)
+    f = h - sector
+    p = v * (1. - s)
+    q = v * (1. - s * f)
+    t = v * (1. - s * (1. - f))
+    sector = sector.astype(int)[..., np.newaxis]
+    choices = [np.stack(c, axis=-1) for c in ((v, t, p), (q, v, p), (p, v, t), (p, q, v), (t, p, v), (v, p, q))]
+    return np.choose(sector, choices)
+
+
+def read_cpt(filepath):
+    """
+    Reads the segments and the background, foreground and NaN colors of a .cpt file
 
     Parameters
     ----------
@@ -14,81 +48,88 @@ def cptfile2dict(filepath):
 
     Returns
     -------
-    colormap name, list containing all colors, dictionary containing all colors
+    colormap name, segment boundaries of shape (n + 1,), RGB colors at the start and end of every segment
+    as arrays of shape (n, 3) between 0 and 1, dictionary containing the RGB colors of the B, F and N lines
     """
     if not os.path.exists(filepath):
         raise ImportError("file ", filepath, "not found")
-    file = open(filepath)
     name = os.path.splitext(os.path.basename(filepath))[0]
-    lines = file.readlines()
-    file.close()
+    with open(filepath) as file:
+        text = file.read()
 
-    x = []
-    r = []
-    g = []
-    b = []
+    lines = text.replace("/", " ").splitlines()
+    if ";" in text:
+        lines = [line.split(";")[0] for line in lines]
     color_model = "RGB"
-    for l in lines:
-        ls = l.split()
-        if l.strip():
-            if l[0] == "#":
-                if ls[-1] == "HSV":
-                    color_model = "HSV"
-                continue
-            if ls[0] == "B" or ls[0] == "F" or ls[0] == "N":
-                pass
-            else:
-                x.append(float(ls[0]))
-                r.append(float(ls[1]))
-                g.append(float(ls[2]))
-                b.append(float(ls[3]))
-                xtemp = float(ls[4])
-                rtemp = float(ls[5])
-                gtemp = float(ls[6])
-                btemp = float(ls[7])
-        else:
-            continue
-
-    x.append(xtemp)
-    r.append(rtemp)
-    g.append(gtemp)
-    b.append(btemp)
+    extension_lines = {}
+    segment_lines = []
+    for line in lines:
+        first = line.lstrip()[:1]
+        if first in CPT_EXTENSIONS:
+            values = line.split()
+            extension_lines[values[0]] = values[1:]
+        elif first == "#":
+            if CPT_HSV.match(line):
+                color_model = "HSV"
+        elif first:
+            segment_lines.append(line)
+    segments = np.loadtxt(segment_lines, usecols=range(8), ndmin=2, dtype=np.float64)
+    x = np.append(segments[:, 0], segments[-1, 4])
+    start = segments[:, 1:4]
+    end = segments[:, 5:8]
+
+    extensions = {}
+    for key, values in extension_lines.items():
+        if len(values) >= 3:
+            extensions[key] = np.array(values[:3], dtype=np.float64)
 
-    x = np.array(x, dtype=np.float64)
-    r = np.array(r, dtype=np.float64)
-    g = np.array(g, dtype=np.float64)
-    b = np.array(b, dtype=np.float64)
     if color_model == "HSV":
-        for i in range(r.shape[0]):
-            rr, gg, bb = colorsys.hsv_to_rgb(r[i] / 360., g[i], b[i])
-            r[i] = rr
-            g[i] = gg
-            b[i] = bb
-    if color_model == "RGB":
-        r = r/255
-        g = g/255
-        b = b/255
-    x_norm = (x - x[0])/(x[-1] - x[0])
+        start = hsv2rgb(start[:, 0], start[:, 1], start[:, 2])
+        end = hsv2rgb(end[:, 0], end[:, 1], end[:, 2])
+        extensions = {key: hsv2rgb(*value) for key, value in extensions.items()}
+    else:
+        start = start / 255.
+        end = end / 255.
+        extensions = {key: value / 255. for key, value in extensions.items()}
 
-    col_list = [(r[i], g[i], b[i]) for i in range(len(r))]
+    return name, x, start, end, extensions
 
-    red = []
-    green = []
-    blue = []
 
-    for i in range(len(x)):
-        red.append([x_norm[i], r[i], r[i]])
-        green.append([x_norm[i], g[i], g[i]])
-        blue.append([x_norm[i], b[i], b[i]])
+def cptfile2dict(filepath, extensions=False):
+    """
+    Extracts a color dictionary and list for a colormap object from a .cpt file. Discontinuities between
+    segments are kept in the dictionary, at every boundary y0 is the end color of the lower and y1 the start
+    color of the upper segment.
 
-    color_dict = {"red": red, "green": green, "blue": blue}
+    Parameters
+    ----------
+    filepath: str
+        filepath of a .cpt file including file extension
+    extensions: bool, optional
+        if True the colors of the B, F and N lines are returned as well
 
+    Returns
+    -------
+    colormap name, array containing all colors of shape (n + 1, 3), dictionary containing all colors as
+    arrays of shape (n + 1, 3) and if extensions is True a dictionary with the RGB colors of the B, F and N lines
+    """
+    name, x, start, end, ext = read_cpt(filepath)
+    x_norm = (x - x[0])/(x[-1] - x[0])
+
+    col_list = np.concatenate([start, end[-1:]])
+    y0 = np.concatenate([start[:1], end])
+    y1 = np.concatenate([start, end[-1:]])
+    color_dict = {key: np.stack([x_norm, y0[:, i], y1[:, i]], axis=1)
+                  for i, key in enumerate(("red", "green", "blue"))}
+
+    if extensions:
+        return name, col_list, color_dict, ext
     return name, col_list, color_dict
 
 
-def ctfile2list(filepath):
+def ctfile2array(filepath):
     """
-    Extracts a color list and dictionary for a colormap object from a .ct file
+    Reads the colors of a .ct file
 
     Parameters
     ----------
@@ -97,41 +138,48 @@ def ctfile2list(filepath):
 
     Returns
     -------
-    colormap name, list containing all colors, dictionary containing all colors
+    colormap name, uint8 array of shape (N, 3) containing all colors
     """
-
     if not os.path.exists(filepath):
         raise ImportError("file ", filepath, "not found")
-    f = open(filepath)
     name = os.path.splitext(os.path.basename(filepath))[0]
+    colors = np.loadtxt(filepath, usecols=(0, 1, 2), ndmin=2, dtype=np.float64)
 
-    lines = f.readlines()
-    f.close()
-    red = []
-    green = []
-    blue = []
+    return name, np.rint(np.clip(colors, 0, 255)).astype(np.uint8)
 
-    for l in lines:
-        ls = l.split()
-        if l.strip():
-            red.append(float(ls[0]))
-            green.append(float(ls[1]))
-            blue.append(float(ls[2]))
 
-        else:
-            continue
+def array2ctfile(colors, outpath):
+    """
+    Writes colors to a .ct file
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        array of shape (N, 3) containing RGB colors between 0 and 255
+    outpath: str
+        filepath of the .ct file
+    """
+    colors = np.asarray(colors).reshape(-1, 3)
+    with open(outpath, "w") as file:
+        file.write(("%3d %3d %3d\n" * colors.shape[0]) % tuple(colors.ravel().tolist()))
 
-    red = np.array(red, dtype=np.float64)
-    green = np.array(green, dtype=np.float64)
-    blue = np.array(blue, dtype=np.float64)
 
-    red = red/255
-    green = green/255
-    blue = blue/255
+def ctfile2list(filepath):
+    """
+    Extracts a color list for a colormap object from a .ct file
+
+    Parameters
+    ----------
+    filepath: str
+        filepath of a .ct file including file extension
 
-    col_list = [(red[i], green[i], blue[i]) for i in range(len(red))]
+    Returns
+    -------
+    colormap name, array of shape (N, 3) containing all colors between 0 and 1
+    """
+    name, colors = ctfile2array(filepath)
 
-    return name, col_list
+    return name, colors / 255.
 
 
 def json2list(filepath):
@@ -172,6 +220,32 @@ def json2list(filepath):
 
         return name, colors, gradient
 
+def json2classified(filepath):
+    """
+    Reads a classified colormap from a .json file as written by ClassifiedColorMap.save_as_json
+
+    Parameters
+    ----------
+    filepath: str
+        filepath of a .json file including file extension
+
+    Returns
+    -------
+    colormap name, list of class colors, list of class boundaries, dictionary with the under, over and bad
+    colors (None if not defined)
+    """
+    if not os.path.exists(filepath):
+        raise ImportError("file ", filepath, "not found")
+    with open(filepath, "r") as fidin:
+        cmap_dict = json.load(fidin)[0]
+    if cmap_dict.get('Type') != 'Classified':
+        raise ValueError('File {0} does not contain a classified colormap'.format(filepath))
+    name = cmap_dict.get('Name', os.path.splitext(os.path.basename(filepath))[0])
+    colors = [tuple(color) for color in cmap_dict['RGBPoints']]
+    extremes = {key: cmap_dict.get(key.capitalize()) for key in ('under', 'over', 'bad')}
+    return name, colors, cmap_dict['Boundaries'], extremes
+
+
 def add_alpha(colors):
     """
     Add the default alpha value 1 to every color in a list or dictionary of colors
@@ -193,4 +267,148 @@ def add_alpha(colors):
     if colors is type(list):
         for i in range(len(colors)):
             colors[i].append(1)
-    return colors
\ No newline at end of file
+    return colors
+
+def read_npy_index(filepath):
+    """
+    Reads the index of a compiled .npy colormap file
+
+    Parameters
+    ----------
+    filepath: str
+        filepath of a compiled .npy file including file extension, the index is read from the .idx file next to it
+
+    Returns
+    -------
+    dictionary containing name, type and layout of every colormap stored in the file
+    """
+    idx_filepath = os.path.splitext(filepath)[0] + '.idx'
+    if not os.path.exists(filepath) or not os.path.exists(idx_filepath):
+        raise ImportError("file ", filepath, "not found")
+    with open(idx_filepath, "r") as fidin:
+        return json.load(fidin)['Colormaps']
+
+
+def npy2dict(filepath):
+    """
+    Creates the color dictionaries or lists of all colormaps in a compiled .npy file. The file is memory mapped,
+    all colors are read-only views on the file and no data is copied.
+
+    Parameters
+    ----------
+    filepath: str
+        filepath of a compiled .npy file including file extension
+
+    Returns
+    -------
+    dictionary mapping the key of each colormap to a tuple of
+    colormap name, dictionary or array containing all colors, gradient defining colormap type
+    """
+    index = read_npy_index(filepath)
+    data = np.load(filepath, mmap_mode='r')
+
+    colormaps = {}
+    for key, entry in index.items():
+        blocks = {}
+        for channel, offset, rows, cols in entry['Blocks']:
+            blocks[channel] = data[offset:offset + rows * cols].reshape(rows, cols)
+        gradient = entry['Type'] == 'Segmented'
+        colors = blocks if gradient else blocks['colors']
+        colormaps[key] = (entry['Name'], colors, gradient)
+
+    return colormaps
+
+
+def dict2npy(colormaps, outpath):
+    """
+    Writes colormaps to a compiled .npy file. All colors are concatenated to a single float64 array, the layout
+    is stored in an .idx file (json) next to it.
+
+    Parameters
+    ----------
+    colormaps: dict
+        dictionary mapping a key to a tuple of colormap name, dictionary or list of colors, gradient
+        as returned by json2list
+    outpath: str
+        filepath of the .npy file
+    """
+    arrays = []
+    index = {}
+    offset = 0
+    for key, (name, colors, gradient) in colormaps.items():
+        if gradient:
+            channels = colors.items()
+        else:
+            channels = [('colors', colors)]
+        blocks = []
+        for channel, values in channels:
+            if callable(values):
+                raise ValueError('Colormap {0} is defined by a function and can not be compiled'.format(name))
+            values = np.asarray(values, dtype=np.float64)
+            if values.ndim != 2:
+                raise ValueError('Colors of colormap {0} can not be compiled'.format(name))
+            blocks.append([channel, offset, values.shape[0], values.shape[1]])
+            arrays.append(values.ravel())
+            offset += values.size
+        index[key] = {'Name': name, 'Type': 'Segmented' if gradient else 'Listed', 'Blocks': blocks}
+
+    data = np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.float64)
+    np.save(outpath, data)
+    with open(os.path.splitext(outpath)[0] + '.idx', 'w') as file:
+        file.write(json.dumps({'Version': 1, 'Colormaps': index}))
+
+
+def compile_colormaps(dirpath, outpath=None):
+    """
+    Compiles all .json, .cpt and .ct colormaps of a directory into a single .npy file
+
+    Parameters
+    ----------
+    dirpath: str
+        directory containing the colormap files
+    outpath: str, optional
+        filepath of the compiled file, default is colormaps.npy in dirpath
+
+    Returns
+    -------
+    filepath of the compiled file
+    """
+    if outpath is None:
+        outpath = os.path.join(dirpath, 'colormaps.npy')
+
+    colormaps = {}
+    for filename in sorted(os.listdir(dirpath)):
+        key, extension = os.path.splitext(filename)
+        filepath = os.path.join(dirpath, filename)
+        if extension == '.json':
+            colormaps[key] = json2list(filepath)
+        elif extension == '.cpt':
+            name, _, cpt_dict = cptfile2dict(filepath)
+            colormaps[key] = (name, cpt_dict, True)
+        elif extension == '.ct':
+            name, gdal_list = ctfile2list(filepath)
+            colormaps[key] = (name, gdal_list, False)
+
+    dict2npy(colormaps, outpath)
+    return outpath
+
+
+def main(args=None):
+    """
+    Command line entry point compiling a colormap directory, by default the colormap directory of colorella
+
+    Parameters
+    ----------
+    args: list of str, optional
+        command line arguments, default is sys.argv
+    """
+    parser = argparse.ArgumentParser(description="Compile .json, .cpt and .ct colormaps to a memory mappable .npy file")
+    parser.add_argument("dirpath", nargs="?", default=os.path.join(os.path.dirname(__file__), "colormaps"),
+                        help="directory containing the colormap files")
+    parser.add_argument("-o", "--outpath", default=None, help="filepath of the compiled file")
+    args = parser.parse_args(args)
+    print(compile_colormaps(args.dirpath, args.outpath))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+'''
+Windowed colorization of single-band GeoTIFF files through GDAL.
+
+The input band is read in windows (strips of rows over the full width by default) with
+ReadAsArray, every window is colorized through a lookup table and written to the output, so
+memory use is bounded by the window size. The output is either an RGBA GeoTIFF or a paletted
+Byte GeoTIFF with a GDAL color table attached; geotransform and projection are kept.
+The gdal module is passed in by the caller, so importing this module does not import gdal.
+
+'''
+import numpy as np
+from colorella.colorize import CHUNK_SIZE, data_range, colorize, quantize
+
+GTIFF_OPTIONS = ['TILED=YES', 'COMPRESS=DEFLATE', 'BIGTIFF=IF_SAFER']
+
+
+def windows(xsize, ysize, block_size):
+    """
+    Generates the windows covering a raster
+
+    Parameters
+    ----------
+    xsize, ysize: int
+        raster size in pixels
+    block_size: tuple
+        window size in pixels (x, y)
+
+    Returns
+    -------
+    generator of (xoff, yoff, win_xsize, win_ysize)
+    """
+    bx, by = block_size
+    for yoff in range(0, ysize, by):
+        for xoff in range(0, xsize, bx):
+            yield xoff, yoff, min(bx, xsize - xoff), min(by, ysize - yoff)
+
+
+def default_block_size(band):
+    """
+    Returns a window size of the full raster width and a multiple of the natural block height with about
+    CHUNK_SIZE pixels
+    """
+    block_y = band.GetBlockSize()[1]
+    rows = max(block_y, CHUNK_SIZE // band.XSize // block_y * block_y)
+    return band.XSize, rows
+
+
+def band_range(band, block_size, vmin=None, vmax=None, nodata=None):
+    """
+    Returns the data range of a raster band, missing limits are computed window by window
+
+    Parameters
+    ----------
+    band: gdal.Band
+        raster band
+    block_size: tuple
+        window size in pixels (x, y)
+    vmin, vmax: number, optional
+        lower and upper limit of the data range
+    nodata: number, optional
+        value excluded from the minimum and maximum
+
+    Returns
+    -------
+    vmin, vmax
+    """
+    if vmin is not None and vmax is not None:
+        return data_range(None, vmin, vmax)
+    minima = []
+    maxima = []
+    for window in windows(band.XSize, band.YSize, block_size):
+        try:
+            block_min, block_max = data_range(band.ReadAsArray(*window), nodata=nodata)
+        except ValueError:
+            continue
+        minima.append(block_min)
+        maxima.append(block_max)
+    if not minima:
+        raise ValueError('Raster contains no valid values to determine vmin and vmax')
+    return data_range(None, min(minima) if vmin is None else vmin, max(maxima) if vmax is None else vmax)
+
+
+def lut2colortable(gdal, lut):
+    """
+    Creates a gdal color table from a uint8 lookup table
+
+    Parameters
+    ----------
+    gdal: module
+        the osgeo.gdal module
+    lut: numpy.ndarray
+        uint8 lookup table of shape (N, 3) or (N, 4)
+
+    Returns
+    -------
+    gdal.ColorTable
+    """
+    if lut.shape[1] == 3:
+        lut = np.c_[lut, np.full(lut.shape[0], 255, dtype=np.uint8)]
+    gdal_ct = gdal.ColorTable()
+    for i, color in enumerate(lut.tolist()):
+        gdal_ct.SetColorEntry(i, tuple(color))
+    return gdal_ct
+
+
+def colorize_geotiff(gdal, src, dst, lut, paletted=False, vmin=None, vmax=None, nodata=None, band=1,
+                     block_size=None, creation_options=None, extended=False):
+    """
+    Colorizes a band of a GeoTIFF window by window and writes an RGB(A) or a paletted GeoTIFF
+
+    Parameters
+    ----------
+    gdal: module
+        the osgeo.gdal module
+    src: str
+        filepath of the input raster
+    dst: str
+        filepath of the output GeoTIFF
+    lut: numpy.ndarray
+        uint8 lookup table of shape (N + 1, C) or (N + 3, C) as returned by colorize.build_lut, the entry N is
+        used for nodata
+    paletted: bool, optional
+        if True a paletted Byte GeoTIFF with the lookup table as color table is written (N must not exceed 255,
+        253 for an extended lookup table), if False an RGB(A) GeoTIFF
+    vmin, vmax: number, optional
+        data range mapped to the colors, default is the minimum and maximum of the valid data
+    nodata: number, optional
+        value marking invalid data, default is the nodata value of the band
+    band: int, optional
+        band number of the input raster, default = 1
+    block_size: tuple, optional
+        window size in pixels (x, y), default are strips over the full raster width with about 4 million pixels
+    creation_options: list of str, optional
+        GTiff creation options, default is a tiled, deflate compressed (Big)TIFF
+    extended: bool, optional
+        if True lut is an extended lookup table with the under and over colors at N + 1 and N + 2, which are
+        used for values below and above the data range
+
+    Returns
+    -------
+    str
+        filepath of the output GeoTIFF
+    """
+    n_colors = lut.shape[0] - (3 if extended else 1)
+    if paletted and lut.shape[0] > 256:
+        raise ValueError('A paletted Byte GeoTIFF supports at most 256 entries including nodata, under and over')
+
+    src_ds = gdal.Open(src, gdal.GA_ReadOnly)
+    if src_ds is None:
+        raise ImportError("file ", src, "not found")
+    src_band = src_ds.GetRasterBand(band)
+    if nodata is None:
+        nodata = src_band.GetNoDataValue()
+    if block_size is None:
+        block_size = default_block_size(src_band)
+    vmin, vmax = band_range(src_band, block_size, vmin, vmax, nodata=nodata)
+
+    options = list(GTIFF_OPTIONS if creation_options is None else creation_options)
+    if paletted:
+        n_bands = 1
+    else:
+        n_bands = lut.shape[1]
+        options += ['PHOTOMETRIC=RGB', 'ALPHA=YES'] if n_bands == 4 else ['PHOTOMETRIC=RGB']
+
+    driver = gdal.GetDriverByName('GTiff')
+    dst_ds = driver.Create(dst, src_ds.RasterXSize, src_ds.RasterYSize, n_bands, gdal.GDT_Byte, options=options)
+    dst_ds.SetGeoTransform(src_ds.GetGeoTransform())
+    dst_ds.SetProjection(src_ds.GetProjection())
+    dst_bands = [dst_ds.GetRasterBand(i + 1) for i in range(n_bands)]
+    if paletted:
+        dst_bands[0].SetRasterColorTable(lut2colortable(gdal, lut))
+        dst_bands[0].SetRasterColorInterpretation(gdal.GCI_PaletteIndex)
+        dst_bands[0].SetNoDataValue(n_colors)
+
+    for xoff, yoff, win_xsize, win_ysize in windows(src_band.XSize, src_band.YSize, block_size):
+        block = src_band.ReadAsArray(xoff, yoff, win_xsize, win_ysize)
+        if paletted:
+            indices = quantize(block, n_colors, vmin=vmin, vmax=vmax, nodata=nodata, extended=extended)
+            dst_bands[0].WriteArray(indices, xoff, yoff)
+        else:
+            colors = colorize(block, lut, vmin=vmin, vmax=vmax, nodata=nodata, extended=extended)
+            for i, dst_band in enumerate(dst_bands):
+                dst_band.WriteArray(colors[..., i], xoff, yoff)
+
+    dst_ds.FlushCache()
+    dst_bands = None
+    dst_ds = None
+    src_ds = None
+    return dst
@@ -0,0 +1,265 @@
+'''
+Inverse colormap lookup: recovers data values from images rendered with a colormap.
+
+Every pixel is matched to the nearest color of the lookup table of the colormap, in RGB or in
+CIELAB. The nearest color is found with a precomputed lookup grid over the RGB cube (32 x 32 x 32
+cells by default): each cell holds the lookup table entries which can be nearest to a color of the
+cell (at most 32, ordered by their distance to the cell center), a pixel is only compared with the
+candidates of its cell. Colors of the lookup table are matched exactly. Alternatively a KD-tree
+(scipy) gives the nearest color. Every distinct color of an image is looked up once, rendered images
+have few distinct colors.
+The distance to the nearest color gives a confidence mask: pixels whose color is far from all
+colors of the colormap (e.g. labels, coastlines, other colormaps) are marked as not confident.
+Images are processed block by block, optionally in a thread pool, like the colorization.
+
+'''
+import numpy as np
+from colorella.colorize import _map_chunks
+from colorella.colorspaces import srgb2lab
+
+SPACES = ('rgb', 'lab')
+# default maximum distance of confident pixels: 8 levels of 255 in RGB, delta E 5 in CIELAB
+MAX_DISTANCE = {'rgb': 8., 'lab': 5.}
+# pixels per block, larger blocks share the lookup of their distinct colors
+BLOCK_SIZE = 2 ** 20
+
+
+def to_space(colors, space='rgb'):
+    """
+    Converts uint8 RGB colors to the coordinates of a color space
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        uint8 RGB colors of shape (..., 3)
+    space: str, optional
+        'rgb' (values between 0 and 255) or 'lab' (CIELAB), default = 'rgb'
+
+    Returns
+    -------
+    numpy.ndarray
+        float64 coordinates of shape (..., 3)
+    """
+    if space == 'rgb':
+        return np.asarray(colors, dtype=np.float64)
+    if space == 'lab':
+        return srgb2lab(np.asarray(colors, dtype=np.float64) / 255.)
+    raise ValueError('Argument space must be one of {0}'.format(', '.join(SPACES)))
+
+
+class InverseColorMap:
+    """Spatial index over the colors of a lookup table, mapping colors to lookup table entries and values
+        """
+
+    def __init__(self, colors, values=None, space='rgb', method='grid', grid_size=32, candidates=32):
+        """
+        Constructor of the inverse colormap class.
+
+        Parameters
+        ----------
+        colors : numpy.ndarray
+            uint8 RGB(A) colors of the lookup table of shape (N, 3) or (N, 4)
+        values : numpy.ndarray, optional
+            values of the N entries, default are the centers of the N bins of [0, 1], entries with the same
+            color get the mean value of these entries
+        space : str, optional
+            color space of the distances, 'rgb' or 'lab', default = 'rgb'
+        method : str, optional
+            'grid' for the lookup grid or 'kdtree' for a KD-tree (requires scipy), default = 'grid'
+        grid_size : int, optional
+            number of grid cells per RGB channel, a power of 2 up to 256, default = 32
+        candidates : int, optional
+            maximum number of lookup table entries per grid cell compared with a pixel, default = 32
+        """
+        colors = np.asarray(colors)[:, :3].astype(np.uint8)
+        if grid_size not in (2 ** i for i in range(9)):
+            raise ValueError('Argument grid_size must be a power of 2 up to 256')
+        self.space = space
+        self.method = method
+        self.grid_size = grid_size
+        self.candidates = candidates
+        self._colors = colors
+        self._points = to_space(colors, space)
+
+        # exact matches: sorted 24 bit color keys
+        keys = _color_keys(colors)
+        order = np.argsort(keys, kind='stable')
+        self._keys = keys[order]
+        self._order = order
+
+        if values is None:
+            values = (np.arange(len(colors)) + 0.5) / len(colors)
+        values = np.asarray(values, dtype=np.float64)
+        # entries with the same color are not distinguishable, they get the mean of their values
+        unique, inverse = np.unique(keys, return_inverse=True)
+        sums = np.bincount(inverse, weights=values, minlength=len(unique))
+        self._values = (sums / np.bincount(inverse, minlength=len(unique)))[inverse]
+
+        if method == 'grid':
+            self._grid = self._build_grid()
+        elif method == 'kdtree':
+            try:
+                from scipy.spatial import cKDTree
+            except ImportError:
+                raise ImportError("The kdtree method requires scipy, use method='grid' instead")
+            self._tree = cKDTree(self._points)
+        else:
+            raise ValueError("Argument method must be 'grid' or 'kdtree'")
+
+    @classmethod
+    def from_colormap(cls, cmap, vmin=0., vmax=1., norm=None, n_colors=None, **kwargs):
+        """
+        Creates the inverse of a colormap as rendered by ColorMap.apply
+
+        Parameters
+        ----------
+        cmap: ColorMap
+            colormap of the images
+        vmin, vmax: number, optional
+            data range of the images, default = 0 and 1
+        norm: norms.Normalize, optional
+            scaled norm of the images, replaces vmin and vmax
+        n_colors: int, optional
+            number of colors of the lookup table, default is N
+        kwargs:
+            keyword arguments of InverseColorMap
+
+        Returns
+        -------
+        InverseColorMap object
+        """
+        colors = cmap.lut(n_colors, dtype=np.uint8)
+        x = (np.arange(len(colors)) + 0.5) / len(colors)
+        values = vmin + x * (vmax - vmin) if norm is None else norm.inverse(x)
+        return cls(colors, values=values, **kwargs)
+
+    def _build_grid(self):
+        """
+        Returns the candidates of every grid cell: the lookup table entries within the distance of the nearest
+        entry to the cell center plus twice the cell radius (the largest distance of the center to a corner),
+        ordered by distance. Cells with fewer candidates repeat their nearest entry.
+        """
+        size = self.grid_size
+        width = 256. / size
+        levels = (np.arange(size) + 0.5) * width
+        centers = np.stack(np.meshgrid(levels, levels, levels, indexing='ij'), axis=-1).reshape(-1, 3)
+        corners = np.stack(np.meshgrid(*[(-0.5, 0.5)] * 3, indexing='ij'), axis=-1).reshape(-1, 3) * width
+        if self.space == 'lab':
+            corners = srgb2lab(np.clip(centers[:, np.newaxis] + corners, 0., 255.) / 255.)
+            centers = srgb2lab(centers / 255.)
+            radius = np.sqrt(((corners - centers[:, np.newaxis]) ** 2).sum(axis=-1)).max(axis=1)
+        else:
+            radius = np.full(len(centers), np.sqrt(3.) * width / 2.)
+
+        n_candidates = min(self.candidates, len(self._points))
+        grid = np.empty((len(centers), n_candidates), dtype=np.intp)
+        rows = max(1, 2 ** 22 // (3 * len(self._points)))
+        for start in range(0, len(centers), rows):
+            diff = centers[start:start + rows, np.newaxis, :] - self._points[np.newaxis]
+            distance = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+            order = np.argpartition(distance, n_candidates - 1, axis=1)[:, :n_candidates]
+            ordered = np.take_along_axis(distance, order, axis=1)
+            by_distance = np.argsort(ordered, axis=1, kind='stable')
+            order = np.take_along_axis(order, by_distance, axis=1)
+            ordered = np.take_along_axis(ordered, by_distance, axis=1)
+            outside = ordered > ordered[:, :1] + 2 * radius[start:start + rows, np.newaxis]
+            grid[start:start + rows] = np.where(outside, order[:, :1], order)
+        # drop the columns which only repeat the nearest entries
+        used = (grid != grid[:, :1]).any(axis=0)
+        n_used = np.nonzero(used)[0].max() + 1 if used.any() else 1
+        return np.ascontiguousarray(grid[:, :n_used])
+
+    def nearest(self, colors):
+        """
+        Returns the nearest lookup table entries of colors and their distances
+
+        Parameters
+        ----------
+        colors: numpy.ndarray
+            uint8 RGB colors of shape (..., 3)
+
+        Returns
+        -------
+        numpy.ndarray
+            indices of the lookup table entries of shape (...)
+        numpy.ndarray
+            float64 distances in the color space of shape (...)
+        """
+        colors = np.asarray(colors, dtype=np.uint8)
+        shape = colors.shape[:-1]
+        # rendered images have few distinct colors, every distinct color is looked up once
+        keys, pixels = np.unique(_color_keys(colors.reshape(-1, 3)), return_inverse=True)
+        colors = np.stack(((keys >> 16) & 255, (keys >> 8) & 255, keys & 255), axis=-1).astype(np.uint8)
+        points = to_space(colors, self.space)
+        if self.method == 'kdtree':
+            distance, idx = self._tree.query(points)
+        else:
+            shift = 8 - int(np.log2(self.grid_size))
+            cells = colors >> shift
+            cell = (cells[:, 0].astype(np.intp) * self.grid_size + cells[:, 1]) * self.grid_size + cells[:, 2]
+            candidates = self._grid[cell]
+            diff = self._points[candidates] - points[:, np.newaxis, :]
+            squared = np.einsum('ijk,ijk->ij', diff, diff)
+            best = squared.argmin(axis=1)
+            idx = candidates[np.arange(len(candidates)), best]
+            distance = np.sqrt(squared[np.arange(len(candidates)), best])
+
+        # colors of the lookup table are matched exactly
+        pos = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        exact = self._keys[pos] == keys
+        idx[exact] = self._order[pos[exact]]
+        distance[exact] = 0.
+        return idx[pixels].reshape(shape), distance[pixels].reshape(shape)
+
+    def __call__(self, image, max_distance=None, n_threads=1, chunk_size=None):
+        """
+        Maps an image to the values of its colors
+
+        Parameters
+        ----------
+        image: numpy.ndarray
+            uint8 RGB or RGBA image of shape (..., 3) or (..., 4), transparent pixels are invalid
+        max_distance: float, optional
+            maximum distance to the nearest color of confident pixels, default is 8 in RGB (values between 0 and
+            255) and 5 (delta E) in CIELAB
+        n_threads: int, optional
+            number of threads processing chunks of rows in parallel, if None the number of CPUs is used, default = 1
+        chunk_size: int, optional
+            number of rows (first axis of the image) per chunk
+
+        Returns
+        -------
+        numpy.ndarray
+            float64 values of shape image.shape[:-1], NaN for transparent pixels
+        numpy.ndarray
+            boolean confidence mask of shape image.shape[:-1], True if the pixel color is a color of the colormap
+            within max_distance
+        """
+        image = np.asarray(image)
+        if image.dtype != np.uint8 or image.ndim < 2 or image.shape[-1] not in (3, 4):
+            raise ValueError('Image must be a uint8 array of shape (..., 3) or (..., 4)')
+        if max_distance is None:
+            max_distance = MAX_DISTANCE[self.space]
+        values = np.empty(image.shape[:-1], dtype=np.float64)
+        confident = np.empty(image.shape[:-1], dtype=bool)
+
+        def invert_block(start, stop):
+            block = image[start:stop]
+            idx, distance = self.nearest(block[..., :3])
+            values[start:stop] = self._values[idx]
+            confident[start:stop] = distance <= max_distance
+            if block.shape[-1] == 4:
+                transparent = block[..., 3] == 0
+                values[start:stop][transparent] = np.nan
+                confident[start:stop][transparent] = False
+
+        _map_chunks(image[..., 0], invert_block, n_threads=n_threads, chunk_size=chunk_size, block_size=BLOCK_SIZE)
+        return values, confident
+
+
+def _color_keys(colors):
+    """
+    Returns 24 bit integer keys of uint8 RGB colors
+    """
+    colors = colors.astype(np.int64)
+    return (colors[..., 0] << 16) | (colors[..., 1] << 8) | colors[..., 2]
@@ -0,0 +1,323 @@
+'''
+Normalizations of data to the range [0, 1] of a colormap, evaluated block by block in the colorization
+pass of ColorMap.apply, apply_file and quantize.
+
+Besides the linear normalization (Normalize), data can be stretched logarithmically (LogNorm,
+SymLogNorm), with a power law (PowerNorm) or by histogram equalization (HistogramNorm). LogNorm,
+SymLogNorm and PowerNorm give the same values as the matplotlib norms of the same name. The histogram
+of HistogramNorm is accumulated block by block with a fixed number of bins, so the norm is computed
+from memory maps of arrays larger than memory without sorting the data.
+
+A norm without limits is scaled on the valid data when the data is colorized, the norm object passed
+to apply is not modified.
+
+'''
+import copy
+import numpy as np
+from colorella.colorize import data_range, valid_values
+
+
+def _float_array(block):
+    """
+    Returns a block as float array, float32 for small integers and float32 data, float64 otherwise
+    (same as matplotlib.colors.Normalize)
+    """
+    return np.asarray(block, dtype=np.promote_types(block.dtype, np.float32))
+
+
+class Normalize:
+    """
+    linear normalization of the data between vmin and vmax
+    """
+
+    def __init__(self, vmin=None, vmax=None):
+        """
+        Constructor of the normalization class.
+
+        Parameters
+        ----------
+        vmin, vmax : number, optional
+            data range mapped to [0, 1], default is the minimum and maximum of the valid data
+        """
+        # python floats, differences of integer limits overflow in the dtype of the limits
+        self.vmin = None if vmin is None else float(vmin)
+        self.vmax = None if vmax is None else float(vmax)
+
+    def scaled(self):
+        """
+        Returns True if the norm is ready to normalize data
+        """
+        return self.vmin is not None and self.vmax is not None
+
+    def autoscaled(self, data, vmin=None, vmax=None, nodata=None, mask=None):
+        """
+        Returns the norm scaled on the data: missing limits are taken from the valid data, the norm itself
+        is returned if it is already scaled and no limits are given
+
+        Parameters
+        ----------
+        data: numpy.ndarray
+            data array
+        vmin, vmax: number, optional
+            limits replacing the limits of the norm
+        nodata: number, optional
+            value marking invalid data
+        mask: numpy.ndarray, optional
+            boolean array of the shape of the data, True marks invalid data
+
+        Returns
+        -------
+        Normalize
+            scaled copy of the norm
+        """
+        if vmin is None and vmax is None and self.scaled():
+            return self
+        norm = copy.copy(self)
+        norm.vmin, norm.vmax = data_range(data, self.vmin if vmin is None else vmin,
+                                          self.vmax if vmax is None else vmax, nodata=nodata, mask=mask,
+                                          valid=self._valid)
+        norm._fit(data, nodata=nodata, mask=mask)
+        return norm
+
+    def _valid(self, block):
+        """
+        Returns a boolean array of the values of a block in the domain of the norm, None if all values are valid
+        """
+        return None
+
+    def _fit(self, data, nodata=None, mask=None):
+        """
+        Computes the parameters of the norm depending on the data, called after the limits are set
+        """
+        if self.vmin > self.vmax:
+            raise ValueError("Argument vmin must be less than or equal to vmax")
+
+    def __call__(self, block):
+        """
+        Normalizes a block of data, vmin is mapped to 0 and vmax to 1. Values outside of the domain of the norm
+        are mapped to NaN.
+
+        Parameters
+        ----------
+        block: numpy.ndarray
+            block of data
+
+        Returns
+        -------
+        numpy.ndarray
+            float array of the shape of the block
+        """
+        x = _float_array(block) - self.vmin
+        if self.vmin == self.vmax:
+            x[...] = 0
+        else:
+            x /= (self.vmax - self.vmin)
+        return x
+
+    def inverse(self, x):
+        """
+        Returns the data values of normalized values, the inverse of the norm
+
+        Parameters
+        ----------
+        x: numpy.ndarray
+            normalized values
+
+        Returns
+        -------
+        numpy.ndarray
+            float64 data values
+        """
+        return self.vmin + np.asarray(x, dtype=np.float64) * (self.vmax - self.vmin)
+
+
+class LogNorm(Normalize):
+    """
+    logarithmic normalization of the data between vmin and vmax, values <= 0 and infinite values are invalid
+    """
+
+    def _valid(self, block):
+        return (block > 0) & np.isfinite(block)
+
+    def __call__(self, block):
+        if self.vmin <= 0:
+            raise ValueError("Limits of a logarithmic norm must be positive")
+        x = _float_array(block)
+        if self.vmin == self.vmax:
+            return np.zeros_like(x)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = np.log10(x)
+        x[~np.isfinite(x)] = np.nan
+        t_vmin, t_vmax = np.log10([self.vmin, self.vmax])
+        x -= t_vmin
+        x /= (t_vmax - t_vmin)
+        return x
+
+    def inverse(self, x):
+        t_vmin, t_vmax = np.log10([self.vmin, self.vmax])
+        return 10. ** (t_vmin + np.asarray(x, dtype=np.float64) * (t_vmax - t_vmin))
+
+
+class SymLogNorm(Normalize):
+    """
+    symmetrical logarithmic normalization of the data between vmin and vmax, linear around zero and
+    logarithmic for positive and negative values, infinite values are invalid
+    """
+
+    def __init__(self, linthresh, linscale=1., vmin=None, vmax=None, base=10):
+        """
+        Constructor of the symmetrical logarithmic normalization class.
+
+        Parameters
+        ----------
+        linthresh : float
+            the range (-linthresh, linthresh) is normalized linearly
+        linscale : float, optional
+            length of the linear range (-linthresh, linthresh) in decades (with base 10), default = 1
+        vmin, vmax : number, optional
+            data range mapped to [0, 1], default is the minimum and maximum of the valid data
+        base : float, optional
+            base of the logarithm, default = 10
+        """
+        if base <= 1:
+            raise ValueError("Argument base must be larger than 1")
+        if linthresh <= 0 or linscale <= 0:
+            raise ValueError("Arguments linthresh and linscale must be positive")
+        super().__init__(vmin=vmin, vmax=vmax)
+        self.linthresh = linthresh
+        self.linscale = linscale
+        self.base = base
+
+    def _valid(self, block):
+        return np.isfinite(block)
+
+    def _transform(self, values):
+        """
+        Returns the symmetrical logarithm of the values
+        """
+        linscale_adj = self.linscale / (1. - 1. / self.base)
+        abs_values = np.abs(values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out = np.sign(values) * self.linthresh * (
+                linscale_adj + np.log(abs_values / self.linthresh) / np.log(self.base))
+        inside = abs_values <= self.linthresh
+        out[inside] = values[inside] * linscale_adj
+        return out
+
+    def __call__(self, block):
+        x = _float_array(block)
+        if self.vmin == self.vmax:
+            return np.zeros_like(x)
+        x = self._transform(x)
+        x[~np.isfinite(x)] = np.nan
+        t_vmin, t_vmax = self._transform(np.array([self.vmin, self.vmax], dtype=np.float64))
+        x -= t_vmin
+        x /= (t_vmax - t_vmin)
+        return x
+
+    def inverse(self, x):
+        t_vmin, t_vmax = self._transform(np.array([self.vmin, self.vmax], dtype=np.float64))
+        t = t_vmin + np.asarray(x, dtype=np.float64) * (t_vmax - t_vmin)
+        linscale_adj = self.linscale / (1. - 1. / self.base)
+        abs_t = np.abs(t)
+        out = np.sign(t) * self.linthresh * np.power(self.base, abs_t / self.linthresh - linscale_adj)
+        inside = abs_t <= self.linthresh * linscale_adj
+        out[inside] = t[inside] / linscale_adj
+        return out
+
+
+class PowerNorm(Normalize):
+    """
+    power law normalization ((x - vmin) / (vmax - vmin)) ** gamma, as in matplotlib values below vmin are
+    mapped to 0
+    """
+
+    def __init__(self, gamma, vmin=None, vmax=None):
+        """
+        Constructor of the power law normalization class.
+
+        Parameters
+        ----------
+        gamma : float
+            exponent of the power law, values < 1 stretch the low values, values > 1 the high values
+        vmin, vmax : number, optional
+            data range mapped to [0, 1], default is the minimum and maximum of the valid data
+        """
+        super().__init__(vmin=vmin, vmax=vmax)
+        self.gamma = gamma
+
+    def __call__(self, block):
+        x = _float_array(block) - self.vmin
+        if self.vmin == self.vmax:
+            x[...] = 0
+            return x
+        x[x < 0] = 0
+        np.power(x, self.gamma, out=x)
+        x /= (self.vmax - self.vmin) ** self.gamma
+        return x
+
+    def inverse(self, x):
+        x = np.clip(np.asarray(x, dtype=np.float64), 0., None)
+        return self.vmin + x ** (1. / self.gamma) * (self.vmax - self.vmin)
+
+
+class HistogramNorm(Normalize):
+    """
+    histogram equalization: the data are mapped to the cumulative distribution of the valid values between
+    vmin and vmax, so every color of the colormap covers about the same number of values. The distribution
+    is taken from a histogram with a fixed number of bins, which is accumulated block by block.
+    """
+
+    def __init__(self, vmin=None, vmax=None, bins=4096):
+        """
+        Constructor of the histogram equalization class.
+
+        Parameters
+        ----------
+        vmin, vmax : number, optional
+            data range mapped to [0, 1], default is the minimum and maximum of the valid data
+        bins : int, optional
+            number of histogram bins between vmin and vmax, default = 4096
+        """
+        if bins < 1:
+            raise ValueError("Argument bins must be at least 1")
+        super().__init__(vmin=vmin, vmax=vmax)
+        self.bins = bins
+        self._cdf = None
+
+    def scaled(self):
+        return super().scaled() and self._cdf is not None
+
+    @property
+    def cdf(self):
+        """
+        Returns the cumulative distribution at the bins + 1 edges of the histogram
+        """
+        return self._cdf
+
+    def _fit(self, data, nodata=None, mask=None):
+        super()._fit(data, nodata=nodata, mask=mask)
+        counts = np.zeros(self.bins, dtype=np.int64)
+        if self.vmin < self.vmax:
+            scale = self.bins / (self.vmax - self.vmin)
+            for values in valid_values(data, nodata=nodata, mask=mask):
+                values = values[(values >= self.vmin) & (values <= self.vmax)]
+                idx = np.subtract(values, self.vmin, dtype=np.float64)
+                idx *= scale
+                counts += np.bincount(np.minimum(idx.astype(np.intp), self.bins - 1), minlength=self.bins)
+        cdf = np.zeros(self.bins + 1, dtype=np.float64)
+        np.cumsum(counts, out=cdf[1:])
+        if cdf[-1] > 0:
+            cdf /= cdf[-1]
+        self._cdf = cdf
+
+    def __call__(self, block):
+        if self.vmin == self.vmax:
+            return np.zeros(block.shape, dtype=np.float64)
+        edges = np.linspace(self.vmin, self.vmax, self.bins + 1)
+        # values outside of the range are mapped to -inf and inf, i.e. to the under and over colors
+        return np.interp(block, edges, self._cdf, left=-np.inf, right=np.inf)
+
+    def inverse(self, x):
+        edges = np.linspace(self.vmin, self.vmax, self.bins + 1)
+        return np.interp(x, self._cdf, edges)
@@ -0,0 +1,92 @@
+'''
+Minimal writer of paletted (indexed color) PNG images, e.g. of the palette indices returned by
+ColorMap.quantize, without creating RGBA colors and without an imaging library.
+
+The indices are stored with 8 bits per pixel, the palette in a PLTE chunk and its alpha values
+in a tRNS chunk, the image data is deflate compressed with zlib.
+
+'''
+import struct
+import zlib
+import numpy as np
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _chunk(chunk_type, data):
+    """
+    Returns a PNG chunk (length, type, data, crc)
+    """
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def encode_png(indices, palette, compression=6):
+    """
+    Encodes palette indices as paletted PNG
+
+    Parameters
+    ----------
+    indices: numpy.ndarray
+        2-D array of palette indices (values 0 - 255)
+    palette: numpy.ndarray
+        uint8 colors of shape (n, 3) or (n, 4) with n <= 256
+    compression: int, optional
+        zlib compression level 0 - 9, default = 6
+
+    Returns
+    -------
+    bytes
+        the PNG file content
+    """
+    indices = np.asarray(indices)
+    palette = np.asarray(palette, dtype=np.uint8)
+    if indices.ndim != 2:
+        raise ValueError('Indices must be a 2-D array')
+    if palette.ndim != 2 or palette.shape[1] not in (3, 4) or not 1 <= palette.shape[0] <= 256:
+        raise ValueError('Palette must be an array of 1 to 256 RGB or RGBA colors')
+    if indices.dtype != np.uint8:
+        if indices.size and (indices.min() < 0 or indices.max() > 255):
+            raise ValueError('A paletted PNG supports at most 256 colors, indices must be between 0 and 255')
+        indices = indices.astype(np.uint8)
+
+    height, width = indices.shape
+    # every row starts with the filter type byte 0 (no filter)
+    raw = np.zeros((height, width + 1), dtype=np.uint8)
+    raw[:, 1:] = indices
+
+    png = [PNG_SIGNATURE,
+           _chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)),
+           _chunk(b'PLTE', palette[:, :3].tobytes())]
+    if palette.shape[1] == 4:
+        alpha = palette[:, 3]
+        translucent = np.nonzero(alpha != 255)[0]
+        if translucent.size:
+            png.append(_chunk(b'tRNS', alpha[:translucent[-1] + 1].tobytes()))
+    png.append(_chunk(b'IDAT', zlib.compress(raw.tobytes(), compression)))
+    png.append(_chunk(b'IEND', b''))
+    return b''.join(png)
+
+
+def write_png(filepath, indices, palette, compression=6):
+    """
+    Writes palette indices as paletted PNG file
+
+    Parameters
+    ----------
+    filepath: str
+        filepath of the PNG file
+    indices: numpy.ndarray
+        2-D array of palette indices (values 0 - 255)
+    palette: numpy.ndarray
+        uint8 colors of shape (n, 3) or (n, 4) with n <= 256
+    compression: int, optional
+        zlib compression level 0 - 9, default = 6
+
+    Returns
+    -------
+    str
+        filepath of the PNG file
+    """
+    with open(filepath, 'wb') as file:
+        file.write(encode_png(indices, palette, compression=compression))
+    return filepath
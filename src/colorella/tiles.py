@@ -0,0 +1,286 @@
+'''
+Rendering of colorized XYZ map tiles from a 2-D array or memory map and a local tile server.
+
+The array is treated as the pixel grid of the highest (native) zoom level, at which one data pixel
+is one tile pixel. Lower zoom levels are subsampled by powers of two, higher zoom levels repeat the
+pixels of the native level. Only the pixels of the requested tile are read, so rasters larger than
+memory are served from memory maps.
+Tiles are mapped to palette indices (colorize.quantize) and encoded as paletted PNG (png.encode_png),
+the norm of the data is scaled once on the whole array, so neighbouring tiles match. Encoded tiles
+are kept in a bounded LRU cache keyed by colormap, norm and z/x/y, ColorMap objects are identified by a
+hash of their colors, so different colormaps of the same name do not share tiles.
+TileServer serves the tiles at /{z}/{x}/{y}.png (default colormap) and /{colormap}/{z}/{x}/{y}.png
+(e.g. /cl:vik/3/2/5.png) from a threaded HTTP server, bound to localhost by default.
+
+'''
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from colorella.colorize import quantize, split_mask
+from colorella.colormap import ColorMap
+from colorella.norms import Normalize
+from colorella.png import encode_png
+
+TILE_SIZE = 256
+
+
+class TileRenderer:
+    """Renders PNG tiles of a 2-D array with a bounded cache of encoded tiles
+        """
+
+    def __init__(self, data, cmap='cl:vik', vmin=None, vmax=None, norm=None, nodata=None, tile_size=TILE_SIZE,
+                 max_zoom=None, cache_size=4096, compression=6):
+        """
+        Constructor of the tile renderer class. The norm is scaled on the valid data of the whole array.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            2-D array, numpy.memmap or masked array of the data, the first axis are the rows (y)
+        cmap : str or ColorMap, optional
+            default colormap of the tiles, a ColorMap object or a specification like 'cl:vik', default = 'cl:vik'
+        vmin, vmax : number, optional
+            data range mapped to the colors, default are the limits of the norm, else the minimum and maximum of
+            the valid data
+        norm : norms.Normalize, optional
+            normalization of the data, default is the linear normalization between vmin and vmax
+        nodata : number, optional
+            value marking invalid data, rendered with the bad color of the colormap
+        tile_size : int, optional
+            width and height of the tiles in pixels, default = 256
+        max_zoom : int, optional
+            highest zoom level served, default is the native zoom level
+        cache_size : int, optional
+            maximum number of encoded tiles kept in the cache, default = 4096
+        compression : int, optional
+            zlib compression level of the PNG tiles, default = 6
+        """
+        if np.ndim(data) != 2:
+            raise ValueError('Data must be a 2-D array')
+        if cache_size < 1:
+            raise ValueError('Argument cache_size must be at least 1')
+        values, mask = split_mask(data)
+        norm = Normalize() if norm is None else norm
+        self.data = data
+        self.cmap = cmap
+        self.nodata = nodata
+        self.tile_size = tile_size
+        self.native_zoom = max(0, math.ceil(math.log2(max(values.shape) / tile_size)))
+        self.max_zoom = self.native_zoom if max_zoom is None else max_zoom
+        self.cache_size = cache_size
+        self.compression = compression
+        self._norm = norm.autoscaled(values, vmin, vmax, nodata=nodata, mask=mask)
+        self._norm_key = (type(self._norm).__name__,) + tuple(
+            sorted((key, value) for key, value in vars(self._norm).items() if not key.startswith('_')))
+        self._colormaps = {}
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.RLock()
+
+    @property
+    def norm(self):
+        """
+        Returns the scaled norm of the tiles
+        """
+        return self._norm
+
+    def _palette(self, cmap):
+        """
+        Returns the cache key, the palette and the number of colors of a colormap and whether the palette has
+        under and over colors: at most 254 colors (252 with under and over colors), the bad color, the under
+        and over colors if set and a transparent entry for pixels outside of the data
+        """
+        if isinstance(cmap, ColorMap):
+            key = (cmap.name, hashlib.blake2b(cmap.palette().tobytes(), digest_size=16).hexdigest())
+        else:
+            key = cmap
+        with self._lock:
+            if key not in self._colormaps:
+                if not isinstance(cmap, ColorMap):
+                    cmap = ColorMap(cmap)
+                extended = cmap.palette(1).shape[0] > 2
+                n_colors = min(cmap.lut(dtype=np.uint8).shape[0], 252 if extended else 254)
+                palette = np.concatenate((cmap.palette(n_colors), np.zeros((1, 4), dtype=np.uint8)))
+                self._colormaps[key] = (palette, n_colors, extended)
+            return (key,) + self._colormaps[key]
+
+    def _window(self, z, x, y):
+        """
+        Returns the data of a tile, at most tile_size x tile_size pixels (less at the right and bottom border)
+        """
+        if not 0 <= z <= self.max_zoom or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError('Tile {0}/{1}/{2} out of range'.format(z, x, y))
+        size = self.tile_size
+        shift = self.native_zoom - z
+        if shift >= 0:
+            step = 1 << shift
+            return self.data[y * size * step:(y + 1) * size * step:step,
+                             x * size * step:(x + 1) * size * step:step]
+        pixels = np.arange(size)
+        rows = (y * size + pixels) >> -shift
+        cols = (x * size + pixels) >> -shift
+        rows = rows[rows < self.data.shape[0]]
+        cols = cols[cols < self.data.shape[1]]
+        return self.data[np.ix_(rows, cols)]
+
+    def render(self, z, x, y, cmap=None):
+        """
+        Renders a tile without using the cache
+
+        Parameters
+        ----------
+        z, x, y: int
+            zoom level, column and row of the tile
+        cmap: str or ColorMap, optional
+            colormap of the tile, default is the colormap of the renderer
+
+        Returns
+        -------
+        bytes
+            the paletted PNG of the tile, pixels outside of the data are transparent
+        """
+        _, palette, n_colors, extended = self._palette(self.cmap if cmap is None else cmap)
+        block = self._window(z, x, y)
+        indices = np.full((self.tile_size, self.tile_size), palette.shape[0] - 1, dtype=np.uint8)
+        if block.size:
+            quantize(block, n_colors, out=indices[:block.shape[0], :block.shape[1]], nodata=self.nodata,
+                     norm=self._norm, extended=extended)
+        return encode_png(indices, palette, compression=self.compression)
+
+    def tile(self, z, x, y, cmap=None):
+        """
+        Returns a tile, served from the cache if available
+
+        Parameters
+        ----------
+        z, x, y: int
+            zoom level, column and row of the tile
+        cmap: str or ColorMap, optional
+            colormap of the tile, default is the colormap of the renderer
+
+        Returns
+        -------
+        bytes
+            the paletted PNG of the tile
+        """
+        cmap_key = self._palette(self.cmap if cmap is None else cmap)[0]
+        key = (cmap_key, self._norm_key, z, x, y)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return self._cache[key]
+            self._misses += 1
+
+        png = self.render(z, x, y, cmap=cmap)
+
+        with self._lock:
+            self._cache[key] = png
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return png
+
+    def invalidate(self):
+        """
+        Removes all tiles from the cache
+        """
+        with self._lock:
+            self._cache.clear()
+
+    def cache_info(self):
+        """
+        Returns the number of cache hits and misses, the number of cached tiles and the cache size limit
+        """
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'currsize': len(self._cache),
+                    'maxsize': self.cache_size}
+
+
+class TileRequestHandler(BaseHTTPRequestHandler):
+    """Handles GET requests of tiles, /{z}/{x}/{y}.png or /{colormap}/{z}/{x}/{y}.png
+        """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        parts = self.path.split('?')[0].strip('/').split('/')
+        try:
+            if len(parts) not in (3, 4) or not parts[-1].endswith('.png'):
+                raise ValueError('Invalid tile path {0}'.format(self.path))
+            z, x, y = (int(part) for part in parts[-3:-1] + [parts[-1][:-4]])
+            cmap = parts[0] if len(parts) == 4 else None
+            png = self.server.renderer.tile(z, x, y, cmap=cmap)
+        except (ValueError, KeyError) as e:
+            self.send_error(404, str(e))
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(png)))
+        self.send_header('Cache-Control', 'max-age=3600')
+        self.end_headers()
+        self.wfile.write(png)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TileServer:
+    """Local HTTP server of the tiles of a TileRenderer, running in a background thread
+        """
+
+    def __init__(self, renderer, host='127.0.0.1', port=0):
+        """
+        Constructor of the tile server class. The server is bound to the address, but does not handle
+        requests before it is started.
+
+        Parameters
+        ----------
+        renderer : TileRenderer
+            renderer of the tiles
+        host : str, optional
+            address of the server, default is localhost
+        port : int, optional
+            port of the server, default = 0 (a free port is chosen)
+        """
+        self.renderer = renderer
+        self._server = ThreadingHTTPServer((host, port), TileRequestHandler)
+        self._server.renderer = renderer
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        Returns the base url of the server
+        """
+        host, port = self._server.server_address[:2]
+        return 'http://{0}:{1}'.format(host, port)
+
+    def start(self):
+        """
+        Starts handling requests in a background thread
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the server and closes its socket
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,75 @@
+'''
+Vectorized color transforms operating on arrays of RGBA colors.
+
+All functions accept colors of any shape (..., 3) or (..., 4) with values between 0 and 1, e.g.
+the (N, 4) lookup table of a single colormap or a (k, N, 4) stack of the lookup tables of many
+colormaps, which are transformed in one call. The alpha channel is left unchanged.
+
+'''
+import numpy as np
+from colorella.colorspaces import srgb2linear, linear2srgb
+
+REC709 = (0.2126, 0.7152, 0.0722)
+REC601 = (0.299, 0.587, 0.114)
+
+# weights and gamma of the options of ColorMap.convert2greyscale
+GREYSCALE_OPTIONS = {1: (REC709, None), 2: (REC601, None), 3: (REC601, 2.)}
+
+
+def greyscale(colors, weights=REC709, gamma=None):
+    """
+    Transforms colors with a weight vector or matrix. A 3-vector computes the luminance as weighted sum of
+    R, G and B, which is written to all three channels. A 3x3 matrix maps RGB to new RGB values
+    (rows are the output channels), e.g. to tint the greyscale.
+
+    Parameters
+    ----------
+    colors: numpy.ndarray
+        float colors of shape (..., 3) or (..., 4) with values between 0 and 1
+    weights: array_like, optional
+        weights of shape (3,) or (3, 3), default are the Rec. 709 luminance weights
+    gamma: float or str, optional
+        transfer function of the color values, the weights are applied to the decoded values and the
+        result is encoded again: 'srgb' for gamma correct luminance in linear light, a number for a power
+        law (e.g. 2. for the root mean square of the weighted channels), default is None, which applies
+        the weights to the encoded values
+
+    Returns
+    -------
+    numpy.ndarray
+        float64 array of the shape of colors
+    """
+    colors = np.asarray(colors, dtype=np.float64)
+    if colors.shape[-1] not in (3, 4):
+        raise ValueError('Colors must be an array of shape (..., 3) or (..., 4)')
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.shape not in ((3,), (3, 3)):
+        raise ValueError('Argument weights must be a 3-vector or a 3x3 matrix, not of shape {0}'.format(
+            weights.shape))
+
+    if gamma is None:
+        decode = encode = None
+    elif gamma == 'srgb':
+        decode, encode = srgb2linear, linear2srgb
+    elif not isinstance(gamma, str) and gamma > 0:
+        def decode(c):
+            return c ** gamma
+
+        def encode(c):
+            return np.clip(c, 0., None) ** (1. / gamma)
+    else:
+        raise ValueError("Argument gamma must be None, 'srgb' or a positive number")
+
+    rgb = colors[..., :3]
+    if decode is not None:
+        rgb = decode(rgb)
+    if weights.ndim == 1:
+        rgb = np.repeat((rgb @ weights)[..., np.newaxis], 3, axis=-1)
+    else:
+        rgb = rgb @ weights.T
+    if encode is not None:
+        rgb = encode(rgb)
+
+    out = colors.copy()
+    out[..., :3] = np.clip(rgb, 0., 1.)
+    return out
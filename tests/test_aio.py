@@ -0,0 +1,174 @@
+# Copyright (c) 2020,Vienna University of Technology,
+# Department of Geodesy and Geoinformation
+# All rights reserved.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL VIENNA UNIVERSITY OF TECHNOLOGY, DEPARTMENT OF
+# GEODESY AND GEOINFORMATION BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Tests for the colorella.aio asyncio interface.
+"""
+import asyncio
+import os
+import shutil
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from colorella.aio import AsyncColorMaps
+from colorella.colormap import ColorMap
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """ Thread pool counting the submitted jobs """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+class BlockingColorMap:
+    """ Colormap stand-in counting the started chunks, which block until they are released """
+
+    def __init__(self):
+        self.chunks = 0
+        self.started = threading.Condition()
+        self.release = threading.Event()
+
+    def apply(self, data, out=None, **kwargs):
+        with self.started:
+            self.chunks += 1
+            self.started.notify_all()
+        self.release.wait()
+        return out
+
+    def wait_started(self, n):
+        with self.started:
+            self.started.wait_for(lambda: self.chunks >= n)
+
+
+class TestAio(unittest.TestCase):
+
+    def setUp(self):
+        """ Set up path and executor """
+        self.output_path = os.path.join(os.path.dirname(__file__), "test_output_aio")
+        if not os.path.exists(self.output_path):
+            os.makedirs(self.output_path)
+        self.executor = CountingExecutor(max_workers=4)
+
+    def tearDown(self):
+        """ Removes all test data """
+        self.executor.shutdown()
+        shutil.rmtree(self.output_path)
+
+    def test_load_coalesced(self):
+        """
+        Tests that concurrent loads of the same colormap run once and return the same object
+        """
+        aio = AsyncColorMaps(self.executor)
+
+        async def main():
+            return await asyncio.gather(aio.load('cl:vik'), aio.load('cl:vik'), aio.load('cl:roma'))
+
+        vik, vik2, roma = asyncio.run(main())
+        self.assertIs(vik, vik2)
+        self.assertEqual(roma.name, 'roma')
+        self.assertEqual(self.executor.submitted, 2)
+
+    def test_apply(self):
+        """
+        Tests that colorizing in chunks gives the colors of ColorMap.apply
+        """
+        aio = AsyncColorMaps(self.executor)
+        cmap = ColorMap('cl:vik')
+        data = np.ma.masked_greater(np.random.normal(0, 1, (101, 37)), 2)
+        colors = asyncio.run(aio.apply('cl:vik', data, vmin=-1, nodata=data[0, 0], chunk_size=10))
+        np.testing.assert_array_equal(colors, cmap.apply(data, vmin=-1, nodata=data[0, 0]))
+        self.assertEqual(self.executor.submitted, 13)
+
+    def test_backpressure_and_cancel(self):
+        """
+        Tests that at most max_concurrency jobs run at once and that cancelled requests stop submitting jobs
+        """
+        aio = AsyncColorMaps(self.executor, max_concurrency=2)
+        lock = threading.Lock()
+        running = [0, 0]
+        # every job waits for a second one, a third one running at the same time breaks the barrier
+        barrier = threading.Barrier(2, timeout=10)
+
+        def job():
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            barrier.wait()
+            with lock:
+                running[0] -= 1
+
+        cmap = BlockingColorMap()
+
+        async def main():
+            await asyncio.gather(*(aio.run(job) for _ in range(10)))
+            task = asyncio.ensure_future(aio.apply(cmap, np.zeros((100, 10)), vmin=0, vmax=1, chunk_size=1))
+            await asyncio.get_running_loop().run_in_executor(None, cmap.wait_started, 2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        cmap.release.set()
+        self.executor.shutdown()
+        self.assertEqual(running[1], 2)
+        self.assertEqual(cmap.chunks, 2)
+
+    def test_event_loops(self):
+        """
+        Tests running jobs with bounded concurrency from successive event loops
+        """
+        aio = AsyncColorMaps(self.executor, max_concurrency=1)
+
+        async def main():
+            return await asyncio.gather(*(aio.run(time.sleep, 0.01) for _ in range(3)))
+
+        for _ in range(2):
+            self.assertEqual(asyncio.run(main()), [None] * 3)
+
+    def test_shared_lut_cache(self):
+        """
+        Tests that threads looking up colors of a shared colormap get the colors of a fresh colormap
+        """
+        cmap = ColorMap('cl:vik')
+        sizes = [n for n in range(2, 40) for _ in range(20)]
+        luts = list(self.executor.map(lambda n: cmap.lut(n, dtype=np.uint8), sizes))
+        for n, lut in zip(sizes, luts):
+            np.testing.assert_array_equal(lut, ColorMap('cl:vik').lut(n, dtype=np.uint8))
+
+    def test_save(self):
+        """
+        Tests saving colormaps without blocking the event loop
+        """
+        aio = AsyncColorMaps()
+        cmap = ColorMap('cl:vik')
+        outpath = os.path.join(self.output_path, 'vik.json')
+        self.assertEqual(asyncio.run(aio.save(cmap, outpath)), outpath)
+        np.testing.assert_array_equal(ColorMap.from_jsonfile(outpath).lut(), cmap.lut())
+        with self.assertRaises(ValueError):
+            asyncio.run(aio.save(cmap, os.path.join(self.output_path, 'vik.txt')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+# Copyright (c) 2020,Vienna University of Technology,
+# Department of Geodesy and Geoinformation
+# All rights reserved.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL VIENNA UNIVERSITY OF TECHNOLOGY, DEPARTMENT OF
+# GEODESY AND GEOINFORMATION BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Tests for the perceptual analysis of colormaps.
+"""
+import csv
+import json
+import os
+import shutil
+import unittest
+from unittest import mock
+import numpy as np
+from colorella import analysis
+from colorella.analysis import COLUMNS, analyze, lightness, lut_metrics, report, simulate_cvd, write_table
+from colorella.catalog import COLORMAP_DIR
+from colorella.colormap import ColorMap
+
+
+class TestAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        """ Set up a directory with copies of bundled colormaps """
+        self.output_path = os.path.join(os.path.dirname(__file__), "test_output_analysis")
+        if os.path.exists(self.output_path):
+            shutil.rmtree(self.output_path)
+        os.makedirs(self.output_path)
+        for name in ('vik', 'swi_ascat', 'Rainbow'):
+            shutil.copy(os.path.join(COLORMAP_DIR, name + '.json'), self.output_path)
+        analysis._cache.clear()
+
+    def tearDown(self):
+        """ Removes all test data """
+        shutil.rmtree(self.output_path)
+
+    def test_metrics(self):
+        """
+        Tests the metrics of colormaps with known properties
+        """
+        viridis = analyze(ColorMap('mpl:viridis'))
+        self.assertEqual(viridis['lightness_shape'], 'increasing')
+        self.assertLess(viridis['delta_e_cv'], 0.05)
+        self.assertLess(viridis['uniformity_error'], 0.01)
+        self.assertEqual(analyze(ColorMap('cl:vik'))['lightness_shape'], 'diverging')
+        rainbow = analyze(ColorMap('cl:Rainbow'))
+        self.assertEqual(rainbow['lightness_shape'], 'non-monotonic')
+        self.assertGreater(rainbow['uniformity_error'], 0.1)
+
+        # greys are not changed by the simulated color vision deficiencies
+        grey = lut_metrics(ColorMap('mpl:gray').lut())
+        for deficiency in ('protan', 'deutan', 'tritan'):
+            self.assertAlmostEqual(grey[deficiency + '_separability'], 1., places=6)
+        np.testing.assert_allclose(simulate_cvd(np.full((3, 3), 0.5), 'protan'), 0.5, atol=1e-6)
+        # red and green are hardly distinguishable with deuteranopia
+        red, green = simulate_cvd(np.array([[0.8, 0.2, 0.2], [0.4, 0.6, 0.2]]), 'deutan')
+        self.assertLess(np.abs(red - green).max(), 0.15)
+
+        self.assertEqual(lightness(ColorMap('mpl:gray'), 10).shape, (10,))
+        self.assertEqual(set(viridis), set(COLUMNS))
+        with self.assertRaises(ValueError):
+            lut_metrics(np.zeros((1, 3)))
+
+    def test_report(self):
+        """
+        Tests the report of a directory in parallel, the cache file and the table output
+        """
+        cache_file = os.path.join(self.output_path, 'cache.json')
+        rows, errors = report(self.output_path, n_workers=2, cache_file=cache_file)
+        self.assertEqual(errors, {})
+        self.assertEqual([row['name'] for row in rows], ['Rainbow', 'swi_ascat', 'vik'])
+        # the worker processes may round differently in the last bit (numpy SIMD loops depend on memory alignment)
+        vik = analyze(ColorMap.from_file(os.path.join(self.output_path, 'vik.json')))
+        self.assertEqual(set(rows[2]), set(vik))
+        for column, value in vik.items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(rows[2][column], value, places=9, msg=column)
+            else:
+                self.assertEqual(rows[2][column], value, msg=column)
+        with open(cache_file) as file:
+            self.assertEqual(len(json.load(file)), 3)
+
+        # the results are read from the cache file, nothing is analyzed again
+        analysis._cache.clear()
+        with mock.patch.object(analysis, '_analyze_lut', side_effect=AssertionError):
+            cached, _ = report(self.output_path, n_workers=1, cache_file=cache_file)
+        self.assertEqual(cached, rows)
+
+        csv_path = write_table(rows, os.path.join(self.output_path, 'report.csv'))
+        with open(csv_path, newline='') as file:
+            table = list(csv.DictReader(file))
+        self.assertEqual(list(table[0]), list(COLUMNS))
+        self.assertEqual(table[1]['name'], 'swi_ascat')
+        self.assertAlmostEqual(float(table[1]['perceptual_length']), rows[1]['perceptual_length'])
+        json_path = write_table(rows, os.path.join(self.output_path, 'report.json'))
+        with open(json_path) as file:
+            self.assertEqual(json.load(file), rows)
+        with self.assertRaises(ValueError):
+            write_table(rows, os.path.join(self.output_path, 'report.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+# Copyright (c) 2020,Vienna University of Technology,
+# Department of Geodesy and Geoinformation
+# All rights reserved.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL VIENNA UNIVERSITY OF TECHNOLOGY, DEPARTMENT OF
+# GEODESY AND GEOINFORMATION BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Tests for the ColorMapCatalog().
+"""
+import json
+import os
+import shutil
+import unittest
+import numpy as np
+from colorella.catalog import ColorMapCatalog, default_catalog, load_colormaps, COLORMAP_DIR
+from colorella.conversions import compile_colormaps, json2list, npy2dict
+from colorella.colormap import ColorMap
+
+
+class TestCatalog(unittest.TestCase):
+
+    def setUp(self):
+        """ Set up path and a catalog on a copy of the test data """
+        self.data_path = os.path.join(os.path.dirname(__file__), "test_data")
+        self.output_path = os.path.join(os.path.dirname(__file__), "test_output_catalog")
+        if os.path.exists(self.output_path):
+            shutil.rmtree(self.output_path)
+        shutil.copytree(self.data_path, self.output_path)
+        shutil.copy(os.path.join(self.output_path, 'Rainbow.json'), os.path.join(self.output_path, 'Rainbow2.json'))
+        self.catalog = ColorMapCatalog(self.output_path, maxsize=1)
+
+    def tearDown(self):
+        """ Removes all test data """
+        shutil.rmtree(self.output_path)
+
+    def test_index(self):
+        """
+        Tests the index of the catalog
+        """
+        self.assertEqual(self.catalog.names(), ['Rainbow', 'Rainbow2'])
+        entry = self.catalog.index['Rainbow']
+        self.assertEqual(entry['format'], 'json')
+        self.assertEqual(entry['size'], os.path.getsize(os.path.join(self.data_path, 'Rainbow.json')))
+        self.assertIn('vik', default_catalog)
+
+    def test_cache(self):
+        """
+        Tests that parsed colormaps are served from the cache and evicted in LRU order
+        """
+        first = self.catalog.load('Rainbow')
+        self.assertIs(self.catalog.load('Rainbow'), first)
+        self.catalog.load('Rainbow2')
+        self.assertEqual(self.catalog.cache_info()['currsize'], 1)
+        self.assertIsNot(self.catalog.load('Rainbow'), first)
+
+    def test_invalidate(self):
+        """
+        Tests explicit invalidation of the cache and rescanning of the directory
+        """
+        first = self.catalog.load('Rainbow')
+        self.catalog.invalidate('Rainbow')
+        self.assertIsNot(self.catalog.load('Rainbow'), first)
+        os.remove(os.path.join(self.output_path, 'Rainbow2.json'))
+        self.assertIn('Rainbow2', self.catalog)
+        self.catalog.scan()
+        self.assertNotIn('Rainbow2', self.catalog)
+        self.assertEqual(self.catalog.cache_info()['currsize'], 0)
+        with self.assertRaises(KeyError):
+            self.catalog.load('Rainbow2')
+
+    def test_compiled_colormaps(self):
+        """
+        Tests that compiled colormaps are preferred and equal to the source files
+        """
+        compile_colormaps(self.output_path)
+        self.catalog.scan()
+        self.assertEqual(self.catalog.index['Rainbow']['format'], 'npy')
+        self.assertIn('ETOPO1', self.catalog)
+        name, colors, gradient = self.catalog.load('Rainbow')
+        self.assertEqual(json2list(os.path.join(self.data_path, 'Rainbow.json'))[0], name)
+        self.assertFalse(gradient)
+        self.assertFalse(colors.flags.writeable)
+
+    def test_stale_compiled_colormaps(self):
+        """
+        Tests that source files edited after compiling are loaded instead of the compiled colormaps
+        """
+        compile_colormaps(self.output_path)
+        json_path = os.path.join(self.output_path, 'Rainbow2.json')
+        with open(json_path) as file:
+            content = json.load(file)
+        points = np.reshape(content[0]['RGBPoints'], (-1, 4))
+        points[:, 1:] = points[::-1, 1:]
+        content[0]['RGBPoints'] = points.ravel().tolist()
+        with open(json_path, 'w') as file:
+            json.dump(content, file)
+        mtime = os.path.getmtime(os.path.join(self.output_path, 'colormaps.npy')) + 60
+        os.utime(json_path, (mtime, mtime))
+
+        with self.assertWarns(UserWarning):
+            self.catalog.scan()
+        self.assertEqual(self.catalog.index['Rainbow']['format'], 'npy')
+        self.assertEqual(self.catalog.index['Rainbow2']['format'], 'json')
+        colors = self.catalog.load('Rainbow2')[1]
+        np.testing.assert_array_equal(colors, json2list(json_path)[1])
+        self.assertFalse(np.array_equal(colors, self.catalog.load('Rainbow')[1]))
+
+    def test_bundled_colormaps_compiled(self):
+        """
+        Tests that the compiled bundled colormaps are up to date with the .json files
+        """
+        compiled = npy2dict(os.path.join(COLORMAP_DIR, 'colormaps.npy'))
+        for filename in os.listdir(COLORMAP_DIR):
+            key, extension = os.path.splitext(filename)
+            if extension != '.json':
+                continue
+            name, colors, gradient = json2list(os.path.join(COLORMAP_DIR, filename))
+            self.assertEqual(compiled[key][0], name)
+            self.assertEqual(compiled[key][2], gradient)
+            if gradient:
+                for channel in colors:
+                    np.testing.assert_array_equal(compiled[key][1][channel], colors[channel])
+            else:
+                np.testing.assert_array_equal(compiled[key][1], colors)
+
+    def test_load_colormaps(self):
+        """
+        Tests loading a directory of colormaps with a process pool
+        """
+        with open(os.path.join(self.output_path, 'broken.cpt'), 'w') as file:
+            file.write("0 0 0\n")
+        colormaps, errors = load_colormaps(self.output_path, n_workers=2)
+        self.assertEqual(sorted(colormaps), ['ETOPO1', 'Rainbow', 'Rainbow2', 'sgrt_ct_cont_ssm'])
+        self.assertIsInstance(colormaps['ETOPO1'], ColorMap)
+        self.assertEqual(list(errors), [os.path.join(self.output_path, 'broken.cpt')])
+
+        colormaps, errors = load_colormaps(os.path.join(self.output_path, '*.json'), n_workers=1)
+        self.assertEqual(sorted(colormaps), ['Rainbow', 'Rainbow2'])
+        self.assertEqual(errors, {})
+
+        upper_path = os.path.join(self.output_path, 'upper')
+        os.makedirs(upper_path)
+        shutil.copy(os.path.join(self.output_path, 'ETOPO1.cpt'), os.path.join(upper_path, 'ETOPO1.CPT'))
+        shutil.copy(os.path.join(self.output_path, 'Rainbow.json'), os.path.join(upper_path, 'Rainbow.Json'))
+        colormaps, errors = load_colormaps(upper_path, n_workers=1)
+        self.assertEqual(sorted(colormaps), ['ETOPO1', 'Rainbow'])
+        self.assertEqual(errors, {})
+
+    def test_unknown_cl_colormap(self):
+        """
+        Tests that an unknown colorella colormap name raises a ValueError
+        """
+        with self.assertRaises(ValueError):
+            ColorMap('cl:not_a_colormap')
+
+
+if __name__ == '__main__':
+    unittest.main()
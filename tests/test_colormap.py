@@ -24,9 +24,10 @@ import unittest
 import random
 import matplotlib.pyplot as plt
 import colorcet as cc
-from colorella.colormap import ColorMap
+from colorella.colormap import ColorMap, ClassifiedColorMap
 import matplotlib.colors as col
 import warnings
+import numpy as np
 
 try:
     from osgeo import gdal
@@ -123,6 +124,8 @@ class TestColormap(unittest.TestCase):
         cpt_file = 'ETOPO1.cpt'
         cmap = ColorMap.from_cptfile(os.path.join(self.data_path, cpt_file), gradient=True)
         self.assertIsInstance(cmap, ColorMap)
+        np.testing.assert_allclose(cmap.to_matplotlib().get_under(), (10 / 255., 0., 121 / 255., 1.))
+        np.testing.assert_allclose(cmap.to_matplotlib().get_over(), (1., 1., 1., 1.))
 
     def test_cmap_from_json(self):
         """
@@ -170,6 +173,13 @@ class TestColormap(unittest.TestCase):
         cmap_read.show()
         self.assertIsInstance(cmap_read, ColorMap)
 
+        cmap = ColorMap.from_ctfile(os.path.join(self.data_path, 'sgrt_ct_cont_ssm.ct'), gradient=False)
+        cmap.save_as_ct(output_path)
+        cmap_read = ColorMap.from_ctfile(output_path, gradient=False)
+        np.testing.assert_array_equal(cmap_read.to_list(), cmap.to_list())
+        cmap.save_as_ct(output_path, N=16)
+        self.assertEqual(len(ColorMap.from_ctfile(output_path, gradient=False)), 16)
+
     def test_save_as_json(self):
         """
         Tests save ColorMap as json file
@@ -182,6 +192,17 @@ class TestColormap(unittest.TestCase):
         cmap_read.show()
         self.assertIsInstance(cmap_read, ColorMap)
 
+    def test_save_as_npy(self):
+        """
+        Tests save ColorMap as compiled npy file
+        """
+        cmap = ColorMap('cl:vik')
+        output_path = os.path.join(self.output_path, 'npy_test.npy')
+        cmap.save_as_npy(output_path)
+        cmap_read = ColorMap.from_file(output_path)
+        self.assertEqual(cmap_read.name, cmap.name)
+        self.assertEqual(cmap_read.to_matplotlib()(0.3), cmap.to_matplotlib()(0.3))
+
     def test_convert2greyscale(self):
         """
         Tests conversion to a greyscale ColorMap
@@ -191,6 +212,216 @@ class TestColormap(unittest.TestCase):
         cmap_grey.show()
         self.assertIsInstance(cmap_grey._mpl_cm, col.LinearSegmentedColormap)
 
+    def test_convert2greyscale_weights(self):
+        """
+        Tests the greyscale weight options, custom weights and gamma correct luminance
+        """
+        cmap = ColorMap('cl:vik')
+        colors = cmap.lut()[:, :3]
+        grey = cmap.convert2greyscale(weights=3, inplace=False).lut()
+        np.testing.assert_allclose(grey[:, 0], np.sqrt(np.dot(colors ** 2, [0.299, 0.587, 0.114])), atol=1e-12)
+        np.testing.assert_array_equal(grey[:, 0], grey[:, 2])
+
+        grey = cmap.convert2greyscale(weights=[1., 0., 0.], inplace=False).lut()
+        np.testing.assert_allclose(grey[:, :3], np.repeat(colors[:, :1], 3, axis=1), atol=1e-12)
+        sepia = [[0.393, 0.769, 0.189], [0.349, 0.686, 0.168], [0.272, 0.534, 0.131]]
+        tinted = cmap.convert2greyscale(weights=sepia, inplace=False).lut()
+        np.testing.assert_allclose(tinted[:, :3], np.clip(colors @ np.array(sepia).T, 0, 1), atol=1e-12)
+
+        grey = ColorMap.from_list([(0., 0., 0.), (0., 1., 0.)], gradient=True).convert2greyscale(gamma='srgb')
+        np.testing.assert_allclose(grey.lut()[-1, :3], 1.055 * 0.7152 ** (1 / 2.4) - 0.055)
+        with self.assertRaises(ValueError):
+            cmap.convert2greyscale(weights=4)
+        with self.assertRaises(ValueError):
+            cmap.convert2greyscale(weights=[0.5, 0.5])
+
+    def test_batch_greyscale(self):
+        """
+        Tests converting a stack of colormaps to greyscale in one call
+        """
+        cmaps = {'vik': ColorMap('cl:vik'), 'mpl': ColorMap('mpl:{}'.format(self.default_mpl_cm))}
+        greys = ColorMap.batch_greyscale(cmaps, weights=2, N=128)
+        self.assertEqual(list(greys), ['vik', 'mpl'])
+        for key, cmap in cmaps.items():
+            luminance = np.dot(cmap.lut(128)[:, :3], [0.299, 0.587, 0.114])
+            np.testing.assert_allclose(greys[key].lut()[:, 1], luminance, atol=1e-12)
+            self.assertEqual(greys[key].name, cmap.name + '_grey')
+        self.assertEqual(ColorMap.batch_greyscale([]), [])
+
+    def test_apply(self):
+        """
+        Tests mapping data to uint8 colors
+        """
+        cmap = ColorMap('mpl:{}'.format(self.default_mpl_cm))
+        data = np.random.uniform(-2.5, 2.5, (50, 70))
+        data[0, :5] = [np.nan, -2, 2, -3, 3]
+        rgba = cmap.apply(data, vmin=-2, vmax=2)
+        expected = plt.get_cmap(self.default_mpl_cm)(col.Normalize(-2, 2)(data), bytes=True)
+        np.testing.assert_array_equal(rgba, expected)
+
+        data = np.random.randint(0, 200, (30, 20)).astype(np.uint8)
+        out = np.zeros((30, 20, 3), dtype=np.uint8)
+        rgb = cmap.apply(data, out=out, alpha=False)
+        self.assertIs(rgb, out)
+        expected = plt.get_cmap(self.default_mpl_cm)(col.Normalize(int(data.min()), int(data.max()))(data),
+                                                     bytes=True)
+        np.testing.assert_array_equal(rgb, expected[..., :3])
+
+    def test_apply_integer_range(self):
+        """
+        Tests that integer data spanning more than the range of its dtype and boolean data give the colors of
+        matplotlib
+        """
+        # a listed and a segmented colormap
+        for name in ('viridis', 'RdBu'):
+            cmap = ColorMap('mpl:{}'.format(name))
+            mpl_cm = plt.get_cmap(name)
+            for data in (np.array([[-20000, 0, 20000], [-32768, 5, 32767]], dtype=np.int16),
+                         np.array([[-100, 0, 100]], dtype=np.int8), np.array([[True, False, True]])):
+                err_msg = '{0} {1}'.format(name, data.dtype)
+                expected = mpl_cm(col.Normalize()(data), bytes=True)
+                np.testing.assert_array_equal(cmap.apply(data), expected, err_msg=err_msg)
+                indices, palette = cmap.quantize(data, dtype=np.uint16)
+                np.testing.assert_array_equal(palette[indices], expected, err_msg=err_msg)
+
+    def test_apply_masked(self):
+        """
+        Tests nodata values, masks and masked arrays and the under, over and bad colors, also after a cpt round trip
+        """
+        mpl_cm = plt.get_cmap(self.default_mpl_cm).with_extremes(under='k', over='w', bad=(0.2, 0.4, 0.6, 0.8))
+        cmap = ColorMap(mpl_cm)
+        data = np.random.uniform(-2.5, 2.5, (60, 40))
+        data[0, :6] = [np.nan, -2, 2, -3, 3, -9999]
+        mask = np.random.rand(60, 40) > 0.8
+        masked = np.ma.masked_array(data, mask=mask)
+        invalid = mask | np.isnan(data) | (data == -9999)
+        expected = mpl_cm(col.Normalize(-2, 2)(np.ma.masked_array(data, mask=invalid)), bytes=True)
+        np.testing.assert_array_equal(cmap.apply(masked, vmin=-2, vmax=2, nodata=-9999, chunk_size=7, n_threads=2),
+                                      expected)
+        np.testing.assert_array_equal(cmap.apply(data, vmin=-2, vmax=2, nodata=-9999, mask=mask), expected)
+        indices, palette = cmap.quantize(masked, vmin=-2, vmax=2, nodata=-9999, dtype=np.uint16)
+        np.testing.assert_array_equal(indices[mask], cmap.lut().shape[0])
+        np.testing.assert_array_equal(palette[indices], expected)
+        indices, palette = cmap.quantize(data, vmin=-2, vmax=2, nodata=-9999, mask=mask, n_colors=253)
+        self.assertEqual(palette.shape, (256, 4))
+        np.testing.assert_array_equal(palette[indices[0, :6]], expected[0, :6])
+        valid = data[~invalid]
+        np.testing.assert_array_equal(cmap.apply(masked, nodata=-9999),
+                                      cmap.apply(masked, vmin=valid.min(), vmax=valid.max(), nodata=-9999))
+        self.assertFalse(np.isnan(data[1:]).any())
+
+        output_path = os.path.join(self.output_path, 'extremes.cpt')
+        cmap.save_as_cpt(output_path)
+        cmap_read = ColorMap.from_cptfile(output_path, gradient=False)
+        extremes = cmap_read.apply(data[0, [0, 3, 4]], vmin=-2, vmax=2, alpha=False)
+        np.testing.assert_array_equal(extremes, [(51, 102, 153), (0, 0, 0), (255, 255, 255)])
+
+    def test_quantize(self):
+        """
+        Tests mapping data to palette indices and writing them as paletted PNG
+        """
+        cmap = ColorMap('cl:vik')
+        data = np.random.uniform(-1, 1, (40, 30))
+        data[0, :3] = [np.nan, -9999, 5]
+        indices, palette = cmap.quantize(data, vmin=-0.8, vmax=0.8, nodata=-9999, dtype=np.uint16)
+        self.assertEqual(indices.dtype, np.uint16)
+        self.assertEqual(palette.shape, (len(cmap.lut()) + 1, 4))
+        np.testing.assert_array_equal(palette[indices], cmap.apply(data, vmin=-0.8, vmax=0.8, nodata=-9999))
+        self.assertEqual(indices[0, 1], len(palette) - 1)
+
+        indices, palette = cmap.quantize(data, vmin=-0.8, vmax=0.8, nodata=-9999, n_threads=2, chunk_size=7)
+        self.assertEqual(indices.dtype, np.uint8)
+        self.assertEqual(palette.shape, (256, 4))
+        np.testing.assert_array_equal(indices[0, :3], [255, 255, 254])
+        with self.assertRaises(ValueError):
+            cmap.quantize(data, n_colors=256)
+
+        extremes = ColorMap(plt.get_cmap('viridis').with_extremes(under='r', over='b'))
+        values = np.array([-1, 0.5, 2, np.nan])
+        extreme_indices, extreme_palette = extremes.quantize(values, vmin=0, vmax=1)
+        self.assertEqual(extreme_palette.shape, (256, 4))
+        np.testing.assert_array_equal(extreme_indices[[0, 2, 3]], [254, 255, 253])
+        np.testing.assert_array_equal(extreme_palette[extreme_indices], extremes.apply(values, vmin=0, vmax=1))
+
+        from PIL import Image
+        from colorella.png import write_png
+        output_path = write_png(os.path.join(self.output_path, 'indices.png'), indices, palette)
+        image = Image.open(output_path)
+        self.assertEqual(image.mode, 'P')
+        np.testing.assert_array_equal(np.asarray(image), indices)
+        np.testing.assert_array_equal(np.asarray(image.convert('RGBA')), palette[indices])
+
+    def test_classified(self):
+        """
+        Tests that classified colormaps give the colors of matplotlib's BoundaryNorm and survive a json round trip
+        """
+        boundaries = [0, 1, 2.5, 5, 10, 20]
+        colors = [(1., 0., 0.), (0., 1., 0.), (0., 0., 1.), (1., 1., 0.), (0., 1., 1.)]
+        cmap = ClassifiedColorMap(colors, boundaries, name='classes', under=(0., 0., 0., 1.), over=(1., 1., 1., 1.),
+                                  bad=(0.5, 0.5, 0.5, 0.5))
+        data = np.random.uniform(-5, 25, (64, 33))
+        data[0, :5] = boundaries[:5]
+        data[1, 0] = np.nan
+        mpl_cm, norm = cmap.to_matplotlib()
+        np.testing.assert_array_equal(cmap.apply(data, n_threads=2, chunk_size=7),
+                                      mpl_cm(norm(np.ma.masked_invalid(data)), bytes=True))
+        np.testing.assert_array_equal(cmap.apply(data, nodata=data[2, 0], alpha=False)[2, 0], (127, 127, 127))
+
+        mask = np.random.rand(64, 33) > 0.8
+        expected = mpl_cm(norm(np.ma.masked_array(data, mask=mask | np.isnan(data))), bytes=True)
+        np.testing.assert_array_equal(cmap.apply(np.ma.masked_array(data, mask=mask), n_threads=2, chunk_size=7),
+                                      expected)
+        np.testing.assert_array_equal(cmap.apply(data, mask=mask), expected)
+        self.assertTrue((cmap.apply(data, mask=mask)[mask] == (127, 127, 127, 127)).all())
+
+        outpath = os.path.join(self.output_path, 'classes.json')
+        cmap.save_as_json(outpath)
+        cmap_read = ClassifiedColorMap.from_jsonfile(outpath)
+        self.assertEqual(cmap_read.name, 'classes')
+        np.testing.assert_array_equal(cmap_read.boundaries, boundaries)
+        np.testing.assert_array_equal(cmap_read.lut(), cmap.lut())
+
+        cmap = ClassifiedColorMap.from_colormap(ColorMap('cl:vik'), np.linspace(-1, 1, 11))
+        self.assertEqual(len(cmap), 10)
+        np.testing.assert_array_equal(cmap.lut()[1:-2], ColorMap('cl:vik').lut(10, dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            ClassifiedColorMap(colors, boundaries[:-1])
+        with self.assertRaises(ValueError):
+            ClassifiedColorMap(colors, boundaries[::-1])
+
+    def test_apply_threaded(self):
+        """
+        Tests that colorizing chunks in a thread pool gives the same result as a single thread
+        """
+        cmap = ColorMap('cl:vik')
+        data = np.random.normal(0, 1, (301, 127)).astype(np.float32)
+        rgba = cmap.apply(data, vmin=-2, vmax=2)
+        rgba_threaded = cmap.apply(data, vmin=-2, vmax=2, n_threads=4, chunk_size=16)
+        np.testing.assert_array_equal(rgba, rgba_threaded)
+
+    def test_apply_file(self):
+        """
+        Tests colorizing memory-mapped .npy and raw binary files chunk by chunk
+        """
+        cmap = ColorMap('cl:sgrt_ct_cont_ssm')
+        data = np.random.randint(0, 201, (97, 61)).astype(np.uint8)
+        data[::7, ::3] = 255
+        expected = cmap.apply(data, nodata=255)
+        np.testing.assert_array_equal(expected[0, 0], cmap.to_matplotlib()(np.nan, bytes=True))
+
+        src = os.path.join(self.output_path, 'data.npy')
+        dst = os.path.join(self.output_path, 'rgba.npy')
+        np.save(src, data)
+        cmap.apply_file(src, dst, nodata=255, chunk_size=10)
+        np.testing.assert_array_equal(np.load(dst), expected)
+
+        src = os.path.join(self.output_path, 'data.raw')
+        dst = os.path.join(self.output_path, 'rgba.raw')
+        data.tofile(src)
+        out = cmap.apply_file(src, dst, nodata=255, shape=data.shape, dtype=np.uint8)
+        del out
+        np.testing.assert_array_equal(np.fromfile(dst, dtype=np.uint8).reshape(expected.shape), expected)
+
     def test_to_matplotlib(self):
         """
         Tests creation of a matplotlib ColorMap object
@@ -207,13 +438,38 @@ class TestColormap(unittest.TestCase):
         cdict_out = cmap.to_dict()
         self.assertEqual(self.cdict, cdict_out)
 
+    def test_to_arrays(self):
+        """
+        Tests writing ColorMap colors to arrays and read-only views
+        """
+        cmap = ColorMap.from_list(self.clist)
+        arrays = cmap.to_dict(as_array=True, copy=False)
+        self.assertEqual(list(arrays), ['R', 'G', 'B', 'A'])
+        np.testing.assert_allclose(arrays['G'], [c[1] for c in self.clist], rtol=1e-6)
+        self.assertFalse(arrays['R'].flags.writeable)
+        colors = cmap.to_list(as_array=True)
+        self.assertEqual(colors.shape, (len(self.clist), 3))
+        colors[:] = 0
+        np.testing.assert_allclose(cmap.to_list(), self.clist, rtol=1e-6)
+
+        cmap = ColorMap.from_dict(self.cdict)
+        arrays = cmap.to_dict(as_array=True, copy=False)
+        for key, channel in self.cdict.items():
+            np.testing.assert_array_equal(arrays[key], channel)
+            self.assertEqual(arrays[key].shape, (len(channel), 3))
+        with self.assertRaises(ValueError):
+            arrays['red'][0, 1] = 0.5
+        self.assertEqual([key for key, _ in cmap.to_list(as_array=True)], list(self.cdict))
+
     def test_to_list(self):
         """
         Tests writing ColorMap colors to list
         """
         cmap = ColorMap.from_list(self.clist)
         clist_out = cmap.to_list()
-        self.assertListEqual(self.clist, clist_out)
+        self.assertEqual(len(self.clist), len(clist_out))
+        # colors are stored as float32
+        np.testing.assert_allclose(clist_out, self.clist, rtol=1e-6)
 
     def test_reverse(self):
         """
@@ -223,7 +479,62 @@ class TestColormap(unittest.TestCase):
         cmap = ColorMap.from_list(self.clist)
         cmap_reverse = cmap.reverse(inplace=False)
         cmap = cmap_reverse.reverse(inplace=False)
-        self.assertEqual(cmap._mpl_cm.colors, self.clist)
+        np.testing.assert_allclose(cmap.to_list(), self.clist, rtol=1e-6)
+        np.testing.assert_array_equal(cmap_reverse.to_list(), cmap.to_list()[::-1])
+
+    def test_reverse_segmented(self):
+        """
+        Tests that reversing a LinearSegmented ColorMap equals flipping and sorting its segments
+        """
+        cdict = dict(self.cdict)
+        cdict['red'] = ((0., 0., 0.), (0.5, 0.2, 0.8), (0.5, 0.1, 0.9), (0.5, 0.1, 0.3), (1., 1., 1.))
+        cmap = ColorMap.from_dict(cdict).reverse(inplace=False)
+        for key, channel in cdict.items():
+            expected = sorted((1 - x, y1, y0) for x, y0, y1 in channel)
+            np.testing.assert_array_equal(cmap.to_dict()[key], expected)
+        cmap = cmap.reverse(inplace=False)
+        np.testing.assert_array_equal(cmap.to_dict()['blue'], cdict['blue'])
+
+    def test_array_core(self):
+        """
+        Tests that the colors are kept in arrays and equal the lookup tables of the matplotlib colormaps
+        """
+        cmap = ColorMap('mpl:{}'.format(self.default_mpl_cm))
+        self.assertFalse(hasattr(cmap, '__dict__'))
+        self.assertIsNone(cmap._mpl)
+        mpl_cm = plt.get_cmap(self.default_mpl_cm)
+        np.testing.assert_array_equal(cmap.apply(np.arange(mpl_cm.N), vmin=0, vmax=mpl_cm.N - 1),
+                                      mpl_cm(np.arange(mpl_cm.N), bytes=True))
+        self.assertIs(cmap.to_matplotlib(), cmap.to_matplotlib())
+
+        cmap = ColorMap.from_dict(self.cdict)
+        expected = col.LinearSegmentedColormap('test', self.cdict, N=300)(np.arange(300))
+        np.testing.assert_allclose(cmap.lut(300), expected)
+
+    def test_lut(self):
+        """
+        Tests the resampled lookup tables and their cache
+        """
+        for cmap, mpl_cm in ((ColorMap('cl:vik'), ColorMap('cl:vik').to_matplotlib()),
+                             (ColorMap('mpl:viridis'), plt.get_cmap('viridis'))):
+            for n in (1, 16, 255, 1024):
+                resampled = mpl_cm.resampled(n)
+                np.testing.assert_allclose(cmap.lut(n, np.float32), resampled(np.arange(n)), atol=1e-6)
+                np.testing.assert_array_equal(cmap.lut(n, np.uint8), resampled(np.arange(n), bytes=True))
+
+        cmap = ColorMap('mpl:{}'.format(self.default_mpl_cm))
+        lut = cmap.lut(256)
+        self.assertIs(cmap.lut(256), lut)
+        self.assertFalse(lut.flags.writeable)
+        for n in range(2, 12):
+            cmap.lut(n)
+        self.assertIsNot(cmap.lut(256), lut)
+        self.assertLessEqual(len(cmap._luts), 8)
+
+        lut = cmap.lut()
+        mpl_cm = cmap.reverse()
+        self.assertIsInstance(mpl_cm, col.Colormap)
+        np.testing.assert_allclose(cmap.lut(), lut[::-1], atol=1e-12)
 
     def test_view(self):
         """
@@ -232,6 +543,59 @@ class TestColormap(unittest.TestCase):
         cmap = ColorMap('mpl:{}'.format(self.default_mpl_cm))
         cmap.show()
 
+    def test_apply_geotiff(self):
+        """
+        Tests colorizing a GeoTIFF window by window to an RGBA and a paletted GeoTIFF
+        """
+        if GDAL_INSTALLED:
+            cmap = ColorMap('cl:vik')
+            data = np.random.uniform(0, 1, (120, 90)).astype(np.float32)
+            data[:10, :10] = -9999
+            src = os.path.join(self.output_path, 'data.tif')
+            ds = gdal.GetDriverByName('GTiff').Create(src, 90, 120, 1, gdal.GDT_Float32)
+            ds.SetGeoTransform((16., 0.01, 0., 48., 0., -0.01))
+            ds.GetRasterBand(1).WriteArray(data)
+            ds.GetRasterBand(1).SetNoDataValue(-9999)
+            ds = None
+
+            dst = os.path.join(self.output_path, 'rgba.tif')
+            cmap.apply_geotiff(src, dst, vmin=0, vmax=1, block_size=(32, 16))
+            ds = gdal.Open(dst)
+            rgba = np.dstack([ds.GetRasterBand(i + 1).ReadAsArray() for i in range(4)])
+            self.assertEqual(ds.GetGeoTransform(), (16., 0.01, 0., 48., 0., -0.01))
+            np.testing.assert_array_equal(rgba, cmap.apply(data, vmin=0, vmax=1, nodata=-9999))
+            ds = None
+
+            dst = os.path.join(self.output_path, 'paletted.tif')
+            cmap.apply_geotiff(src, dst, vmin=0, vmax=1, paletted=True)
+            ds = gdal.Open(dst)
+            indices = ds.GetRasterBand(1).ReadAsArray()
+            self.assertIsNotNone(ds.GetRasterBand(1).GetColorTable())
+            self.assertTrue(np.all(indices[:10, :10] == 255))
+            self.assertTrue(np.all(indices[10:] < 255))
+            ds = None
+
+            extremes = ColorMap(plt.get_cmap('viridis').with_extremes(under='r', over='b'))
+            dst = os.path.join(self.output_path, 'extremes.tif')
+            extremes.apply_geotiff(src, dst, vmin=0.2, vmax=0.8, block_size=(32, 16))
+            ds = gdal.Open(dst)
+            rgba = np.dstack([ds.GetRasterBand(i + 1).ReadAsArray() for i in range(4)])
+            np.testing.assert_array_equal(rgba, extremes.apply(data, vmin=0.2, vmax=0.8, nodata=-9999))
+            ds = None
+
+            dst = os.path.join(self.output_path, 'extremes_paletted.tif')
+            extremes.apply_geotiff(src, dst, vmin=0.2, vmax=0.8, paletted=True)
+            ds = gdal.Open(dst)
+            indices = ds.GetRasterBand(1).ReadAsArray()
+            color_table = ds.GetRasterBand(1).GetColorTable()
+            palette = np.array([color_table.GetColorEntry(i) for i in range(color_table.GetCount())])
+            expected_indices, expected_palette = extremes.quantize(data, vmin=0.2, vmax=0.8, nodata=-9999,
+                                                                   n_colors=253)
+            np.testing.assert_array_equal(indices, expected_indices)
+            np.testing.assert_array_equal(palette, expected_palette)
+            self.assertTrue(np.all(palette[indices[(data >= 0) & (data < 0.2)]] == [255, 0, 0, 255]))
+            ds = None
+
     def test_to_gdal(self):
         """
         Tests converting the matplotlib ColorMap to a gdal color table
@@ -240,6 +604,31 @@ class TestColormap(unittest.TestCase):
             cmap = ColorMap('mpl:{}'.format(self.default_mpl_cm))
             g_ct = cmap.to_gdal()
             self.assertIsInstance(g_ct, gdal.ColorTable)
+            g_ct = cmap.to_gdal(n_colors=100)
+            self.assertEqual(g_ct.GetCount(), 101)
+            self.assertEqual(g_ct.GetColorEntry(100), tuple(cmap.palette(100)[100]))
+
+    def test_gdal_colors(self):
+        """
+        Tests the quantization of the gdal color table entries
+        """
+        cmap = ColorMap.from_list([(0., 0., 0.), (0.5, 0.25, 1.), (1., 1., 1.)])
+        entries = cmap._gdal_colors()
+        self.assertEqual(entries.shape, (256, 4))
+        np.testing.assert_array_equal(entries[:3], [[0, 0, 0, 255], [128, 64, 255, 255], [255, 255, 255, 255]])
+        np.testing.assert_array_equal(entries[3:], np.tile([255, 255, 255, 0], (253, 1)))
+        entries = ColorMap('cl:vik')._gdal_colors(accelerate=2)
+        np.testing.assert_array_equal(entries[128:], np.tile([255, 255, 255, 0], (128, 1)))
+
+    def test_from_gdal(self):
+        """
+        Tests converting a gdal color table to a ColorMap
+        """
+        if GDAL_INSTALLED:
+            cmap = ColorMap('cl:sgrt_ct_cont_ssm')
+            cmap_read = ColorMap.from_gdal(cmap.to_gdal())
+            self.assertEqual(len(cmap_read), 256)
+            np.testing.assert_array_equal(cmap_read._gdal_colors(), cmap._gdal_colors())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,84 @@
+# Copyright (c) 2020,Vienna University of Technology,
+# Department of Geodesy and Geoinformation
+# All rights reserved.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL VIENNA UNIVERSITY OF TECHNOLOGY, DEPARTMENT OF
+# GEODESY AND GEOINFORMATION BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Tests for the vectorized color space conversions of colorella.colorspaces.
+"""
+import unittest
+import numpy as np
+from colorella.colorspaces import SPACES, convert, srgb2linear, linear2srgb, linear2xyz, xyz2lab, \
+    xyz2cam02ucs, cam02ucs2xyz, srgb2lab, srgb2cam02ucs
+
+
+class TestColorSpaces(unittest.TestCase):
+
+    def setUp(self):
+        """ Create random sRGB colors """
+        self.colors = np.random.uniform(0, 1, (6, 500, 3))
+
+    def test_reference_values(self):
+        """
+        Tests the conversions against reference values of the sRGB standard (IEC 61966-2-1), CIELAB values
+        of the sRGB primaries (D65, Lindbloom) and CAM02-UCS values of colorspacious
+        """
+        np.testing.assert_allclose(srgb2linear([0., 0.04045, 0.5, 1.]), [0., 0.0031308, 0.2140411, 1.], atol=1e-7)
+        np.testing.assert_allclose(linear2srgb([0., 0.0031308, 0.2140411, 1.]), [0., 0.04045, 0.5, 1.], atol=1e-7)
+        np.testing.assert_allclose(linear2xyz(np.ones(3)), [0.95047, 1., 1.08883], atol=1e-6)
+
+        primaries = np.eye(3)
+        lab = [[53.2408, 80.0925, 67.2032], [87.7347, -86.1827, 83.1793], [32.2970, 79.1875, -107.8602]]
+        np.testing.assert_allclose(srgb2lab(primaries), lab, atol=1e-4)
+        np.testing.assert_allclose(srgb2lab(np.ones(3)), [100., 0., 0.], atol=1e-4)
+        np.testing.assert_allclose(xyz2lab([0.5, 0.0005, 0.2]), [0.451648, 332.715025, -85.324488], atol=1e-5)
+
+        xyz = [[0.2, 0.3, 0.4], [0.4, 0.3, 0.2], [0.95047, 1., 1.08883], [0.05, 0.02, 0.3]]
+        cam02ucs = [[62.601331, -24.125362, -6.982092], [66.607985, 22.621557, 9.672938],
+                    [100., -1.916987, -1.137773], [15.211814, -13.197542, -30.525119]]
+        np.testing.assert_allclose(xyz2cam02ucs(xyz), cam02ucs, atol=1e-5)
+        np.testing.assert_allclose(cam02ucs2xyz(cam02ucs), xyz, atol=1e-6)
+        np.testing.assert_allclose(srgb2cam02ucs(np.zeros(3)), np.zeros(3), atol=1e-9)
+
+    def test_round_trips(self):
+        """
+        Tests that the conversions between all color spaces are invertible and keep the shape of the colors
+        """
+        for src in SPACES:
+            colors = convert(self.colors, 'srgb', src)
+            self.assertEqual(colors.shape, self.colors.shape)
+            for dst in SPACES:
+                converted = convert(colors, src, dst)
+                self.assertEqual(converted.shape, self.colors.shape)
+                np.testing.assert_allclose(convert(converted, dst, 'srgb'), self.colors, atol=1e-9,
+                                           err_msg='{0} -> {1}'.format(src, dst))
+
+    def test_float32(self):
+        """
+        Tests that float32 colors are converted in float32 and other colors in float64
+        """
+        colors = self.colors.astype(np.float32)
+        rgba = np.concatenate((self.colors, np.ones((6, 500, 1))), axis=-1)
+        for dst in SPACES:
+            converted = convert(colors, 'srgb', dst)
+            self.assertEqual(converted.dtype, np.float32)
+            np.testing.assert_allclose(converted, convert(rgba, 'srgb', dst), rtol=1e-4, atol=1e-3)
+        self.assertEqual(convert((self.colors * 255).astype(np.uint8) / 255., 'srgb', 'lab').dtype, np.float64)
+        with self.assertRaises(ValueError):
+            convert(self.colors, 'srgb', 'hsv')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# Copyright (c) 2020,Vienna University of Technology,
+# Department of Geodesy and Geoinformation
+# All rights reserved.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL VIENNA UNIVERSITY OF TECHNOLOGY, DEPARTMENT OF
+# GEODESY AND GEOINFORMATION BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Tests for the colorella.conversions functions.
+"""
+import colorsys
+import os
+import shutil
+import unittest
+import numpy as np
+from colorella.conversions import cptfile2dict, hsv2rgb, ctfile2array, array2ctfile
+
+
+class TestConversions(unittest.TestCase):
+
+    def setUp(self):
+        """ Set up path """
+        self.data_path = os.path.join(os.path.dirname(__file__), "test_data")
+        self.output_path = os.path.join(os.path.dirname(__file__), "test_output_conversions")
+        if not os.path.exists(self.output_path):
+            os.makedirs(self.output_path)
+
+    def tearDown(self):
+        """ Removes all test data """
+        shutil.rmtree(self.output_path)
+
+    def test_hsv2rgb(self):
+        """
+        Tests the vectorized HSV to RGB conversion against colorsys
+        """
+        hsv = np.random.uniform(0, 1, (500, 3))
+        hsv[:, 0] *= 360
+        expected = [colorsys.hsv_to_rgb(h / 360., s, v) for h, s, v in hsv]
+        np.testing.assert_allclose(hsv2rgb(hsv[:, 0], hsv[:, 1], hsv[:, 2]), expected, atol=1e-12)
+
+    def test_cptfile2dict(self):
+        """
+        Tests reading segments, discontinuities and B, F, N lines of a cpt file
+        """
+        filepath = os.path.join(self.output_path, 'hsv.cpt')
+        with open(filepath, 'w') as file:
+            file.write("# COLOR_MODEL = +HSV\n"
+                       "0 0 1 1 1 120 1 1 ; first\n"
+                       "1 240/1/1 3 300 1 0.5\n"
+                       "B 0 0 0\n"
+                       "F 0 0 1\n"
+                       "N 60 1 1\n")
+        name, col_list, col_dict, ext = cptfile2dict(filepath, extensions=True)
+        self.assertEqual(name, 'hsv')
+        np.testing.assert_allclose(col_list, [(1, 0, 0), (0, 0, 1), (0.5, 0, 0.5)], atol=1e-12)
+        np.testing.assert_allclose(col_dict['green'], [[0, 0, 0], [1 / 3., 1, 0], [1, 0, 0]], atol=1e-12)
+        np.testing.assert_allclose(ext['B'], (0, 0, 0))
+        np.testing.assert_allclose(ext['F'], (1, 1, 1))
+        np.testing.assert_allclose(ext['N'], (1, 1, 0), atol=1e-12)
+
+        name, col_list, col_dict = cptfile2dict(os.path.join(self.data_path, 'ETOPO1.cpt'))
+        self.assertEqual(col_dict['red'].shape, (len(col_list), 3))
+        self.assertEqual(col_dict['red'][0, 0], 0.)
+        self.assertEqual(col_dict['red'][-1, 0], 1.)
+
+    def test_ctfile(self):
+        """
+        Tests reading and writing a ct file
+        """
+        filepath = os.path.join(self.data_path, 'sgrt_ct_cont_ssm.ct')
+        name, colors = ctfile2array(filepath)
+        self.assertEqual(name, 'sgrt_ct_cont_ssm')
+        self.assertEqual(colors.dtype, np.uint8)
+        self.assertEqual(colors.shape, (255, 3))
+        np.testing.assert_array_equal(colors[:2], [[255, 255, 255], [170, 0, 30]])
+
+        outpath = os.path.join(self.output_path, 'ct_test.ct')
+        array2ctfile(colors[:17], outpath)
+        np.testing.assert_array_equal(ctfile2array(outpath)[1], colors[:17])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# Copyright (c) 2020,Vienna University of Technology,
+# Department of Geodesy and Geoinformation
+# All rights reserved.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL VIENNA UNIVERSITY OF TECHNOLOGY, DEPARTMENT OF
+# GEODESY AND GEOINFORMATION BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Tests for the colorella.inverse inverse colormap lookup.
+"""
+import unittest
+import numpy as np
+from colorella.colormap import ColorMap
+from colorella.inverse import InverseColorMap, to_space
+from colorella.norms import LogNorm
+
+
+class TestInverse(unittest.TestCase):
+
+    def setUp(self):
+        """ Create random test data """
+        self.data = np.random.uniform(0, 100, (120, 90))
+
+    def test_round_trip(self):
+        """
+        Tests recovering the data from images rendered with bundled colormaps
+        """
+        for name in ('swi_ascat', 'sgrt_ct_cont_ssm', 'vik'):
+            cmap = ColorMap('cl:' + name)
+            image = cmap.apply(self.data, vmin=0, vmax=100)
+            inverse = InverseColorMap.from_colormap(cmap, 0, 100)
+            values, confident = inverse(image, n_threads=2, chunk_size=7)
+            self.assertTrue(confident.all())
+            np.testing.assert_array_equal(values, inverse(image[..., :3])[0])
+            # entries with equal colors can not be distinguished and get the mean of their values
+            idx = np.minimum((self.data / 100 * 256).astype(int), 255)
+            np.testing.assert_allclose(values, inverse._values[idx], err_msg=name)
+            self.assertLess(np.median(np.abs(values - self.data)), 100 / 256, msg=name)
+
+    def test_noise(self):
+        """
+        Tests that noisy colors are matched in RGB and CIELAB and foreign colors are not confident
+        """
+        cmap = ColorMap('cl:vik')
+        image = cmap.apply(self.data, vmin=0, vmax=100, alpha=False).astype(np.int16)
+        image += np.random.randint(-2, 3, image.shape)
+        image = np.clip(image, 0, 255).astype(np.uint8)
+        image[0, :3] = [(255, 0, 255), (0, 255, 0), (255, 255, 0)]
+        for space in ('rgb', 'lab'):
+            values, confident = cmap.inverse(image, vmin=0, vmax=100, space=space)
+            self.assertFalse(confident[0, :3].any())
+            self.assertGreater(confident.mean(), 0.99)
+            self.assertLess(np.median(np.abs(values - self.data)[confident]), 2.)
+        grid = InverseColorMap.from_colormap(cmap, space='lab')
+        lab = grid._points
+        pixels = to_space(image[:20].reshape(-1, 3), 'lab')
+        nearest = ((pixels[:, np.newaxis] - lab[np.newaxis]) ** 2).sum(axis=-1).argmin(axis=1)
+        idx = grid.nearest(image[:20])[0].ravel()
+        np.testing.assert_array_equal(grid._values[idx], grid._values[nearest])
+
+    def test_transparent_and_norm(self):
+        """
+        Tests that transparent pixels are invalid and that values of a norm are recovered
+        """
+        cmap = ColorMap('cl:vik')
+        data = np.random.lognormal(0, 1, (50, 40))
+        norm = LogNorm(0.1, 10)
+        image = cmap.apply(data, norm=norm)
+        image[0, 0, 3] = 0
+        values, confident = cmap.inverse(image, norm=norm)
+        self.assertTrue(np.isnan(values[0, 0]))
+        self.assertFalse(confident[0, 0])
+        inside = (data > 0.1) & (data < 10)
+        inside[0, 0] = False
+        np.testing.assert_allclose(values[inside], data[inside], rtol=0.05)
+        with self.assertRaises(ValueError):
+            cmap.inverse(image.astype(np.float32))
+
+
+if __name__ == '__main__':
+    unittest.main()
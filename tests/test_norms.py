@@ -0,0 +1,101 @@
+# Copyright (c) 2020,Vienna University of Technology,
+# Department of Geodesy and Geoinformation
+# All rights reserved.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL VIENNA UNIVERSITY OF TECHNOLOGY, DEPARTMENT OF
+# GEODESY AND GEOINFORMATION BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Tests for the colorella.norms normalizations.
+"""
+import os
+import shutil
+import unittest
+import numpy as np
+import matplotlib.colors as col
+import matplotlib.pyplot as plt
+from colorella.colormap import ColorMap
+from colorella.norms import Normalize, LogNorm, SymLogNorm, PowerNorm, HistogramNorm
+
+
+class TestNorms(unittest.TestCase):
+
+    def setUp(self):
+        """ Create random test data and set up path """
+        self.output_path = os.path.join(os.path.dirname(__file__), "test_output_norms")
+        if not os.path.exists(self.output_path):
+            os.makedirs(self.output_path)
+        self.cmap = ColorMap('mpl:viridis')
+        self.mpl_cm = plt.get_cmap('viridis').with_extremes(under='k', over='w')
+        self.data = np.random.lognormal(0, 2, (80, 50))
+        self.data[0, :4] = [np.nan, 0, -1, np.inf]
+
+    def tearDown(self):
+        """ Removes all test data """
+        shutil.rmtree(self.output_path)
+
+    def test_matplotlib_norms(self):
+        """
+        Tests that the norms give the colors of the matplotlib norms
+        """
+        data = np.ma.masked_array(self.data, mask=np.isnan(self.data))
+        cmap = ColorMap(self.mpl_cm)
+        norms = ((Normalize(0.5, 20), col.Normalize(0.5, 20)),
+                 (LogNorm(0.01, 100), col.LogNorm(0.01, 100)),
+                 (LogNorm(), col.LogNorm()),
+                 (SymLogNorm(0.1, vmin=-1, vmax=50), col.SymLogNorm(0.1, vmin=-1, vmax=50)),
+                 (SymLogNorm(1, linscale=0.5, base=2), col.SymLogNorm(1, linscale=0.5, base=2)),
+                 (PowerNorm(0.5, 1, 30), col.PowerNorm(0.5, 1, 30)))
+        for norm, mpl_norm in norms:
+            colors = cmap.apply(self.data, norm=norm, n_threads=2, chunk_size=9)
+            np.testing.assert_array_equal(colors, self.mpl_cm(mpl_norm(data), bytes=True),
+                                          err_msg=type(norm).__name__)
+        self.assertIsNone(norms[2][0].vmin)
+        with self.assertRaises(ValueError):
+            cmap.apply(self.data, norm=LogNorm(-1, 10))
+
+    def test_integer_data(self):
+        """
+        Tests that the norms scale integer data spanning more than the range of its dtype and integer limits
+        """
+        data = np.array([-20000, 0, 20000], dtype=np.int16)
+        np.testing.assert_allclose(Normalize().autoscaled(data)(data), [0., 0.5, 1.])
+        np.testing.assert_allclose(Normalize(np.int16(-20000), np.int16(20000))(data), [0., 0.5, 1.])
+        np.testing.assert_allclose(PowerNorm(2.).autoscaled(data)(data), [0., 0.25, 1.])
+        np.testing.assert_allclose(HistogramNorm().autoscaled(data)(data), [0., 1. / 3., 1.])
+        np.testing.assert_allclose(Normalize().autoscaled(data).inverse([0., 1.]), [-20000., 20000.])
+        data = np.array([1, 10, 100], dtype=np.uint8)
+        np.testing.assert_allclose(LogNorm().autoscaled(data)(data), [0., 0.5, 1.], atol=1e-6)
+
+    def test_histogram_norm(self):
+        """
+        Tests that histogram equalization distributes the data evenly over the colors, also out of core
+        """
+        data = np.random.normal(0, 1, (400, 250)).astype(np.float32)
+        norm = HistogramNorm(-3, 3)
+        indices, _ = self.cmap.quantize(data, norm=norm, n_colors=10)
+        counts = np.bincount(indices[np.abs(data) <= 3], minlength=10)
+        np.testing.assert_allclose(counts / counts.sum(), 0.1, atol=0.01)
+        self.assertIsNone(norm.cdf)
+
+        src = os.path.join(self.output_path, 'data.npy')
+        np.save(src, data)
+        dst = self.cmap.apply_file(src, os.path.join(self.output_path, 'colors.npy'), norm=HistogramNorm(),
+                                   nodata=data[0, 0], chunk_size=17)
+        norm = HistogramNorm().autoscaled(data, nodata=data[0, 0])
+        self.assertTrue(norm.scaled())
+        np.testing.assert_array_equal(dst, self.cmap.apply(data, norm=norm, nodata=data[0, 0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# Copyright (c) 2020,Vienna University of Technology,
+# Department of Geodesy and Geoinformation
+# All rights reserved.
+
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL VIENNA UNIVERSITY OF TECHNOLOGY, DEPARTMENT OF
+# GEODESY AND GEOINFORMATION BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR
+# BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER
+# IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Tests for the colorella.tiles tile renderer and server.
+"""
+import io
+import os
+import shutil
+import unittest
+import urllib.error
+import urllib.request
+import numpy as np
+from colorella.colormap import ColorMap
+from colorella.norms import LogNorm
+from colorella.tiles import TileRenderer, TileServer
+
+
+def decode(png):
+    """ Decodes a PNG tile to RGBA colors """
+    from PIL import Image
+    return np.asarray(Image.open(io.BytesIO(png)).convert('RGBA'))
+
+
+class TestTiles(unittest.TestCase):
+
+    def setUp(self):
+        """ Create random test data and set up path """
+        self.output_path = os.path.join(os.path.dirname(__file__), "test_output_tiles")
+        if not os.path.exists(self.output_path):
+            os.makedirs(self.output_path)
+        self.data = np.random.uniform(1, 100, (300, 520)).astype(np.float32)
+        self.data[5, 7] = -9999
+
+    def tearDown(self):
+        """ Removes all test data """
+        shutil.rmtree(self.output_path)
+
+    def test_render(self):
+        """
+        Tests that tiles of all zoom levels show the colors of the data, subsampled or repeated
+        """
+        renderer = TileRenderer(self.data, cmap='cl:vik', nodata=-9999, max_zoom=3)
+        self.assertEqual(renderer.native_zoom, 2)
+        self.assertEqual((renderer.norm.vmin, renderer.norm.vmax), (self.data[self.data > 0].min(), self.data.max()))
+        cmap = ColorMap('cl:vik')
+        indices, palette = cmap.quantize(self.data, nodata=-9999, n_colors=254)
+
+        np.testing.assert_array_equal(decode(renderer.tile(2, 1, 0))[:, :256], palette[indices[:256, 256:512]])
+        tile = decode(renderer.tile(2, 2, 1))
+        np.testing.assert_array_equal(tile[:44, :8], palette[indices[256:, 512:]])
+        self.assertTrue((tile[44:] == 0).all() and (tile[:, 8:] == 0).all())
+        np.testing.assert_array_equal(decode(renderer.tile(0, 0, 0))[:75, :130], palette[indices[::4, ::4]])
+        np.testing.assert_array_equal(decode(renderer.tile(3, 1, 0))[::2, ::2], palette[indices[:128, 128:256]])
+        self.assertEqual(tuple(decode(renderer.tile(2, 0, 0))[5, 7]), (0, 0, 0, 0))
+        with self.assertRaises(ValueError):
+            renderer.tile(2, 4, 0)
+
+    def test_cache(self):
+        """
+        Tests that encoded tiles are served from the cache and evicted in LRU order
+        """
+        data = np.lib.format.open_memmap(os.path.join(self.output_path, 'data.npy'), mode='w+',
+                                         dtype=np.float32, shape=self.data.shape)
+        data[:] = self.data
+        renderer = TileRenderer(data, cmap=ColorMap('cl:vik'), norm=LogNorm(), nodata=-9999, cache_size=2)
+        first = renderer.tile(1, 0, 0)
+        self.assertIs(renderer.tile(1, 0, 0), first)
+        renderer.tile(1, 1, 0)
+        renderer.tile(1, 1, 0, cmap='cl:roma')
+        self.assertEqual(renderer.cache_info(), {'hits': 1, 'misses': 3, 'currsize': 2, 'maxsize': 2})
+        self.assertIsNot(renderer.tile(1, 0, 0), first)
+        self.assertEqual(renderer.tile(1, 0, 0), first)
+
+    def test_same_name(self):
+        """
+        Tests that colormaps of the same name do not share cached tiles
+        """
+        renderer = TileRenderer(self.data, nodata=-9999)
+        reds = ColorMap.from_list([(1., 0., 0.), (0.5, 0., 0.)], name='custom')
+        blues = ColorMap.from_list([(0., 0., 1.), (0., 0., 0.5)], name='custom')
+        red_tile = decode(renderer.tile(1, 0, 0, cmap=reds))
+        blue_tile = decode(renderer.tile(1, 0, 0, cmap=blues))
+        self.assertTrue((red_tile[:150, :, 0] >= 127).all() and (red_tile[:150, :, 2] == 0).all())
+        self.assertTrue((blue_tile[:150, :, 2] >= 127).all() and (blue_tile[:150, :, 0] == 0).all())
+        self.assertEqual(renderer.cache_info()['misses'], 2)
+        self.assertEqual(renderer.tile(1, 0, 0, cmap=ColorMap.from_list([(1., 0., 0.), (0.5, 0., 0.)], name='custom')),
+                         renderer.tile(1, 0, 0, cmap=reds))
+        self.assertEqual(renderer.cache_info()['hits'], 2)
+
+    def test_server(self):
+        """
+        Tests serving tiles from a local HTTP server
+        """
+        renderer = TileRenderer(self.data, nodata=-9999)
+        with TileServer(renderer) as server:
+            with urllib.request.urlopen(server.url + '/1/0/0.png') as response:
+                self.assertEqual(response.headers['Content-Type'], 'image/png')
+                self.assertEqual(response.read(), renderer.tile(1, 0, 0))
+            with urllib.request.urlopen(server.url + '/cl:roma/1/1/0.png') as response:
+                self.assertEqual(response.read(), renderer.tile(1, 1, 0, cmap='cl:roma'))
+            for path in ('/1/2/0.png', '/cl:unknown/1/0/0.png', '/tiles'):
+                with self.assertRaises(urllib.error.HTTPError) as error:
+                    urllib.request.urlopen(server.url + path)
+                self.assertEqual(error.exception.code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()